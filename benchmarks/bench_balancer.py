@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la répartition de charge entre réplicas
+Un serveur amont déclare trois réplicas factices dont un lent (latence
+asymétrique) et un arrêté (écarté par la découverte); les appels tools/call
+relayés par le hub standalone sont répartis avec chaque algorithme de
+routing.load_balancing.algorithm et la latence de queue est comparée.
+
+Usage: python benchmarks/bench_balancer.py [--duration 3] [--concurrency 8] [--slow-ms 50]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+
+from common import run_load, start_in_thread, stop_server
+from stub_upstream import start_stub, stub_server_entry
+
+ALGORITHMS = ("round_robin", "least_requests", "peak_ewma")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--fast-ms", type=float, default=2.0)
+    parser.add_argument("--slow-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    stubs = [start_stub("lb", latency=args.fast_ms / 1000.0),
+             start_stub("lb", latency=args.fast_ms / 1000.0),
+             start_stub("lb", latency=args.slow_ms / 1000.0)]
+    replicas = [{"host": "127.0.0.1", "port": port} for _, port in stubs]
+    # Réplica arrêté : la sonde échoue, il ne doit recevoir aucun appel
+    replicas.append({"host": "127.0.0.1", "port": 1})
+
+    def write_config(path, algorithm):
+        config = {
+            "servers": {"lb": stub_server_entry("lb", stubs[0][1], replicas=replicas, discovery_timeout=1)},
+            "hub": {"name": "MCP Hub Central", "version": "3.1.0", "mode": "standalone"},
+            "routing": {"strategy": "capability_based", "fallback_server": "lb",
+                        "load_balancing": {"enabled": True, "algorithm": algorithm}}
+        }
+        with open(path, "w") as config_file:
+            json.dump(config, config_file)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+        config_path = config_file.name
+    write_config(config_path, ALGORITHMS[0])
+    os.environ["MCP_SERVERS_CONFIG"] = config_path
+
+    import mcp_hub_standalone
+    from mcp_hub_balancer import LOAD_BALANCER
+    from mcp_hub_server import create_server
+
+    mcp_hub_standalone.DISCOVERY.start()
+    httpd = create_server(0, mcp_hub_standalone.MCPHubStandaloneHandler, workers=args.concurrency * 2,
+                          host="127.0.0.1")
+    hub_port = start_in_thread(httpd)
+
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                       "params": {"name": "lb_tool_1", "arguments": {"query": "select 1"}}}).encode()
+    print(f"réplicas: 2 x {args.fast_ms:g} ms, 1 x {args.slow_ms:g} ms, 1 arrêté - concurrence {args.concurrency}")
+    print(f"{'algorithme':<16} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'part du lent':>13}")
+    for algorithm in ALGORITHMS:
+        write_config(config_path, algorithm)
+        mcp_hub_standalone.CONFIG_REGISTRY.reload(force=True)
+        mcp_hub_standalone.DISCOVERY.refresh()
+        before = [stub.requests for stub, _ in stubs]
+        # Les print() par requête du handler ne font pas partie de la mesure
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run_load(hub_port, "/mcp", args.concurrency, args.duration, method="POST", body=body,
+                              keep_alive=True)
+        served = [stub.requests - count for (stub, _), count in zip(stubs, before)]
+        slow_share = served[2] / max(1, sum(served))
+        print(f"{algorithm:<16} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+              f"{result['p99_ms']:>8.2f} {slow_share:>12.1%}")
+
+    dead = [endpoint for endpoint in LOAD_BALANCER.stats()["lb"] if endpoint["url"].endswith(":1")]
+    print(f"réplica arrêté: {dead[0]['requests']} appels (écarté: {not dead[0]['healthy']})")
+    stop_server(httpd)
+    for stub, _ in stubs:
+        stop_server(stub)
+    os.unlink(config_path)
+
+
+if __name__ == "__main__":
+    main()
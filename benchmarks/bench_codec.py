@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark du codec JSON
+Mesure l'encodage et le décodage d'une réponse tools/list réaliste avec
+l'ancien chemin (json.dumps indent=2, décodage via str), le codec stdlib
+compact et orjson quand il est installé.
+
+Usage: python benchmarks/bench_codec.py [--servers 20] [--tools 25] [--seconds 1]
+"""
+
+import argparse
+import json
+import time
+
+import common  # noqa: F401  (racine du dépôt dans sys.path)
+from stub_upstream import make_tools
+
+import mcp_hub_codec
+
+
+class LegacyCodec:
+    """Chemin d'origine des handlers : indentation et aller-retour par str"""
+
+    name = "legacy (indent=2)"
+
+    def dumps(self, obj, pretty=False):
+        return json.dumps(obj, indent=2).encode()
+
+    def loads(self, data):
+        return json.loads(data.decode('utf-8', errors='ignore'))
+
+
+def tools_list_payload(servers, tools):
+    all_tools = []
+    for s in range(servers):
+        for tool in make_tools(f"server{s}", tools):
+            all_tools.append(dict(tool, server=f"server{s}", server_name=f"Serveur MCP n°{s} — démo"))
+    return {"jsonrpc": "2.0", "id": 1, "result": {"tools": all_tools}}
+
+
+def measure(fn, seconds):
+    """Nombre d'appels par seconde pendant `seconds` secondes"""
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while True:
+        fn()
+        count += 1
+        if count % 10 == 0 and time.perf_counter() >= deadline:
+            break
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=20)
+    parser.add_argument("--tools", type=int, default=25)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    payload = tools_list_payload(args.servers, args.tools)
+    codecs = [LegacyCodec(), mcp_hub_codec.StdlibCodec()]
+    if mcp_hub_codec.orjson is not None:
+        codecs.append(mcp_hub_codec.OrjsonCodec())
+    else:
+        print("orjson non installé : pip install orjson pour le comparer")
+
+    print(f"payload tools/list: {args.servers * args.tools} outils")
+    print(f"{'codec':<20} {'taille':>9} {'encode/s':>10} {'decode/s':>10} {'MB/s enc':>9}")
+    for codec in codecs:
+        body = codec.dumps(payload)
+        assert codec.loads(body) == json.loads(body)
+        encode_rate = measure(lambda: codec.dumps(payload), args.seconds)
+        decode_rate = measure(lambda: codec.loads(body), args.seconds)
+        print(f"{codec.name:<20} {len(body):>9} {encode_rate:>10.0f} {decode_rate:>10.0f} "
+              f"{encode_rate * len(body) / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur de service concurrent
+Compare l'ancien HTTPServer mono-thread au pool de workers borné quand chaque
+requête attend une sonde amont lente (simulée par un délai fixe).
+
+Usage: python benchmarks/bench_concurrency.py [--delay-ms 20] [--duration 3]
+"""
+
+import argparse
+import time
+from http.server import HTTPServer
+
+from common import run_load, start_in_thread, stop_server
+
+import mcp_hub_central
+from mcp_hub_server import BoundedThreadPoolHTTPServer
+
+
+def make_handler(delay):
+    """Handler du hub central dont la découverte simule une sonde amont lente"""
+    class SlowDiscoveryHandler(mcp_hub_central.MCPHubHandler):
+        def discover_servers(self):
+            time.sleep(delay)
+            return super().discover_servers()
+
+        def log_message(self, format, *args):
+            pass
+
+    return SlowDiscoveryHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay-ms", type=float, default=20.0)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--concurrency", default="1,4,16,32")
+    args = parser.parse_args()
+
+    handler = make_handler(args.delay_ms / 1000.0)
+    levels = [int(c) for c in args.concurrency.split(",")]
+    engines = {
+        "HTTPServer": lambda: HTTPServer(("127.0.0.1", 0), handler),
+        f"pool({args.workers})": lambda: BoundedThreadPoolHTTPServer(("127.0.0.1", 0), handler, workers=args.workers)
+    }
+
+    print(f"{'moteur':<14} {'clients':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'erreurs':>8}")
+    for name, factory in engines.items():
+        for concurrency in levels:
+            httpd = factory()
+            port = start_in_thread(httpd)
+            result = run_load(port, "/health", concurrency, args.duration)
+            stop_server(httpd)
+            print(f"{name:<14} {concurrency:>7} {result['rps']:>9.1f} {result['p50_ms']:>8.1f} "
+                  f"{result['p99_ms']:>8.1f} {result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
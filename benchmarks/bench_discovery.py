@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la découverte parallèle
+Sonde N serveurs amont factices (latences variées) séquentiellement, comme
+l'ancien discover_servers, puis avec probe_servers en fan-out.
+
+Usage: python benchmarks/bench_discovery.py [--servers 50] [--min-latency-ms 10] [--max-latency-ms 80]
+"""
+
+import argparse
+import random
+import time
+
+from common import stop_server
+from stub_upstream import start_stub, stub_server_entry
+
+import mcp_hub_central_hybrid as hybrid
+
+
+def sequential_discovery(config):
+    """Ancien comportement : santé puis outils, serveur après serveur"""
+    for server_config in config["servers"].values():
+        if hybrid.probe_health(server_config, 5) == 200:
+            hybrid.fetch_tools(server_config, 5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=50)
+    parser.add_argument("--min-latency-ms", type=float, default=10.0)
+    parser.add_argument("--max-latency-ms", type=float, default=80.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    stubs = []
+    servers = {}
+    for i in range(args.servers):
+        latency = rng.uniform(args.min_latency_ms, args.max_latency_ms) / 1000.0
+        httpd, port = start_stub(f"stub{i}", latency)
+        stubs.append(httpd)
+        servers[f"stub{i}"] = stub_server_entry(f"stub{i}", port)
+    config = {"servers": servers, "monitoring": {"discovery_timeout": 10}}
+
+    slowest = max(s.latency for s in stubs) * 1000
+    print(f"{args.servers} serveurs factices, latence la plus lente {slowest:.1f} ms par sonde")
+    for name, fn in (("séquentiel", sequential_discovery), ("fan-out", hybrid.probe_servers)):
+        timings = []
+        for _ in range(args.rounds):
+            started = time.perf_counter()
+            fn(config)
+            timings.append((time.perf_counter() - started) * 1000)
+        print(f"{name:<12} meilleur {min(timings):>9.1f} ms   moyen {sum(timings) / len(timings):>9.1f} ms")
+
+    discovered = hybrid.probe_servers(config)
+    online = sum(1 for s in discovered.values() if s["health_status"] == "online")
+    print(f"serveurs en ligne après fan-out : {online}/{args.servers}")
+    for httpd in stubs:
+        stop_server(httpd)
+
+
+if __name__ == "__main__":
+    main()
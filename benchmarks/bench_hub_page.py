@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark du rendu de la page du hub (/) avec de nombreux serveurs
+Compare le rendu complet à chaque requête (comportement d'origine : page et
+cartes reconstruites à chaque GET) au gabarit précompilé, aux cartes rendues
+une fois par snapshot et à la page servie depuis le cache de réponses.
+
+Usage: python benchmarks/bench_hub_page.py [--servers 100] [--duration 3] [--concurrency 8]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+
+from common import run_load, start_in_thread, stop_server
+
+
+def hub_config(servers):
+    """Configuration standalone avec `servers` serveurs (aucune sonde réseau)"""
+    return {
+        "servers": {
+            f"server{i}": {
+                "name": f"MCP Server {i}",
+                "version": "1.0.0",
+                "description": f"Serveur MCP de démonstration n°{i}",
+                "host": "localhost",
+                "port": 9000 + i,
+                "protocol": "http",
+                "status": "active",
+                "tools_count": 10 + i % 30,
+                "categories": ["database", "auth", "storage", "monitoring", "gaming", "automation"][: 1 + i % 6],
+                "github_url": f"https://github.com/example/server-{i}" if i % 3 else "#",
+                "standalone_mode": True
+            }
+            for i in range(servers)
+        },
+        "hub": {"name": "MCP Hub Central", "version": "3.1.0", "mode": "standalone"}
+    }
+
+
+def timed(fn, seconds):
+    """Durée moyenne d'un appel (µs) mesurée pendant `seconds` secondes"""
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        fn()
+        count += 1
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--servers", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+        json.dump(hub_config(args.servers), config_file)
+    os.environ["MCP_SERVERS_CONFIG"] = config_file.name
+
+    import mcp_hub_standalone
+    from mcp_hub_cache import ResponseCache
+    from mcp_hub_server import create_server
+
+    snapshot = mcp_hub_standalone.DISCOVERY.start().snapshot
+    cache = ResponseCache()
+
+    def full_render():
+        # Avant : compteurs, cartes et page reconstruits à chaque requête
+        servers = snapshot.servers
+        return mcp_hub_standalone.HUB_PAGE.render(
+            server_count=len(servers),
+            total_tools=sum(s.get("available_tools", 0) for s in servers.values()),
+            online_servers=len([s for s in servers.values() if s.get("health_status") == "online"]),
+            cards=mcp_hub_standalone.render_server_cards(servers),
+            last_update=datetime.fromtimestamp(snapshot.discovered_at).strftime('%d/%m/%Y %H:%M')
+        )
+
+    def cached_page():
+        return cache.get("/", snapshot.version, lambda: mcp_hub_standalone.render_hub_page(snapshot), "text/html")
+
+    page = mcp_hub_standalone.render_hub_page(snapshot)
+    print(f"page: {args.servers} serveurs, {len(page)} octets")
+    print(f"{'rendu':<28} {'µs/page':>10}")
+    for name, fn in (
+        ("complet (avant)", full_render),
+        ("cartes en cache", lambda: mcp_hub_standalone.render_hub_page(snapshot)),
+        ("page en cache (bytes)", cached_page),
+        ("page en cache (gzip)", lambda: cached_page().variant("gzip"))
+    ):
+        print(f"{name:<28} {timed(fn, 1.0):>10.1f}")
+
+    class UncachedHandler(mcp_hub_standalone.MCPHubStandaloneHandler):
+        response_cache = None
+
+        def build_hub_page(self):
+            return full_render()
+
+    print(f"\n{'GET / sur le hub':<28} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, handler in (("rendu à chaque GET", UncachedHandler),
+                          ("cache + ETag", mcp_hub_standalone.MCPHubStandaloneHandler)):
+        httpd = create_server(0, handler, workers=args.concurrency * 2, host="127.0.0.1")
+        port = start_in_thread(httpd)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run_load(port, "/", args.concurrency, args.duration, keep_alive=True)
+        print(f"{name:<28} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+        stop_server(httpd)
+
+    os.unlink(config_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Test de charge des connexions persistantes HTTP/1.1
+Compare une connexion TCP par requête (ancien comportement HTTP/1.0) aux
+connexions keep-alive réutilisées, sur le hub standalone.
+
+Usage: python benchmarks/bench_keepalive.py [--duration 3] [--concurrency 8] [--path /mcp]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+
+from common import run_load, start_in_thread, stop_server
+
+import mcp_hub_standalone
+from mcp_hub_server import create_server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--path", default="/mcp")
+    args = parser.parse_args()
+
+    body = None
+    if args.path.startswith("/mcp"):
+        body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "ping"}).encode()
+    method = "POST" if body else "GET"
+
+    httpd = create_server(0, mcp_hub_standalone.MCPHubStandaloneHandler, workers=args.concurrency * 2, host="127.0.0.1")
+    port = start_in_thread(httpd)
+    print(f"{'mode':<12} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'connexions':>11} {'req/conn':>9}")
+    for name, keep_alive in (("close", False), ("keep-alive", True)):
+        # Les print() par requête du handler ne font pas partie de la mesure
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run_load(port, args.path, args.concurrency, args.duration, method=method, body=body,
+                              keep_alive=keep_alive)
+        per_connection = result["requests"] / max(1, result["connections"])
+        print(f"{name:<12} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+              f"{result['connections']:>11} {per_connection:>9.1f}")
+    stop_server(httpd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark du coût des métriques (/api/metrics)
+Mesure le coût par requête de MetricsRegistry.observe() en un et plusieurs
+threads, comparé à un registre protégé par un verrou unique, puis le temps
+d'un scrape et le débit du hub standalone avec et sans métriques.
+
+Usage: python benchmarks/bench_metrics.py [--observations 500000] [--threads 1,8] [--duration 3]
+"""
+
+import argparse
+import bisect
+import random
+import threading
+import time
+
+from common import run_load, start_in_thread, stop_server
+
+import mcp_hub_standalone
+from mcp_hub_metrics import LATENCY_BUCKETS, MetricsRegistry
+from mcp_hub_server import create_server
+
+ROUTES = ["/health", "/mcp", "/api/tools", "/api/servers", "/api/discovery", "/"]
+
+
+class LockedRegistry:
+    """Référence : mêmes compteurs partagés par tous les threads derrière un verrou"""
+
+    def __init__(self):
+        self.requests = {}
+        self.latency = {}
+        self.lock = threading.Lock()
+
+    def observe(self, method, route, status, duration):
+        with self.lock:
+            key = (method, route, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            series = self.latency.get((method, route))
+            if series is None:
+                series = self.latency[(method, route)] = [0] * (len(LATENCY_BUCKETS) + 2)
+            series[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+            series[-1] += duration
+
+
+def run(registry, observations, threads):
+    """Coût moyen (ns) d'un observe() réparti sur `threads` threads"""
+    per_thread = observations // threads
+    samples = [(random.choice(ROUTES), random.choice((200, 200, 200, 304, 429)), random.expovariate(200))
+               for _ in range(1024)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        observe = registry.observe
+        barrier.wait()
+        for i in range(per_thread):
+            route, status, duration = samples[i & 1023]
+            observe("GET", route, status, duration)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--observations", type=int, default=500000)
+    parser.add_argument("--threads", default="1,8")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'registre':<14} {'threads':>7} {'ns/requête':>11}")
+    for name, factory in (("verrou unique", LockedRegistry), ("par thread", MetricsRegistry)):
+        for threads in (int(t) for t in args.threads.split(",")):
+            cost = run(factory(), args.observations, threads)
+            print(f"{name:<14} {threads:>7} {cost:>11.0f}")
+
+    registry = MetricsRegistry()
+    run(registry, args.observations, 16)
+    started = time.perf_counter()
+    body = registry.render()
+    print(f"\nscrape: {(time.perf_counter() - started) * 1000:.2f} ms pour {len(body)} octets (16 threads, "
+          f"{len(ROUTES)} routes)")
+
+    # Débit de bout en bout sur /health, métriques désactivées puis activées
+    handler = mcp_hub_standalone.MCPHubStandaloneHandler
+    httpd = create_server(0, handler, workers=args.concurrency * 2, host="127.0.0.1")
+    port = start_in_thread(httpd)
+    print(f"\n{'métriques':<10} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for name, metrics in (("non", None), ("oui", mcp_hub_standalone.METRICS)):
+        handler.metrics = metrics
+        result = run_load(port, "/health", args.concurrency, args.duration, keep_alive=True)
+        print(f"{name:<10} {result['rps']:>9.1f} {result['p50_ms']:>8.2f} {result['p99_ms']:>8.2f}")
+    stop_server(httpd)
+
+
+if __name__ == "__main__":
+    main()
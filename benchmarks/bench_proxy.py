@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark du proxy tools/call
+Mesure la latence d'un appel d'outil envoyé directement au serveur amont
+factice puis relayé par le hub standalone (routage, session amont, pool
+keep-alive); la différence de p50 est le surcoût du proxy.
+
+Usage: python benchmarks/bench_proxy.py [--duration 3] [--concurrency 1]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import tempfile
+
+from common import run_load, start_in_thread, stop_server
+from stub_upstream import start_stub, stub_server_entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    args = parser.parse_args()
+
+    stub, stub_port = start_stub("proxy")
+    config = {
+        "servers": {"proxy": stub_server_entry("proxy", stub_port)},
+        "hub": {"name": "MCP Hub Central", "version": "3.1.0", "mode": "standalone"},
+        "routing": {"strategy": "capability_based", "fallback_server": "proxy"}
+    }
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+        json.dump(config, config_file)
+    os.environ["MCP_SERVERS_CONFIG"] = config_file.name
+
+    import mcp_hub_standalone
+    from mcp_hub_proxy import MCP_PROXY
+    from mcp_hub_server import create_server
+
+    mcp_hub_standalone.DISCOVERY.start()
+    httpd = create_server(0, mcp_hub_standalone.MCPHubStandaloneHandler, workers=args.concurrency * 2,
+                          host="127.0.0.1")
+    hub_port = start_in_thread(httpd)
+
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "tools/call",
+                       "params": {"name": "proxy_tool_1", "arguments": {"query": "select 1"}}}).encode()
+    print(f"{'chemin':<12} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    results = {}
+    for name, port in (("direct", stub_port), ("via hub", hub_port)):
+        # Les print() par requête du handler ne font pas partie de la mesure
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            result = run_load(port, "/mcp", args.concurrency, args.duration, method="POST", body=body,
+                              keep_alive=True)
+        results[name] = result
+        print(f"{name:<12} {result['rps']:>9.1f} {result['p50_ms']:>8.3f} {result['p95_ms']:>8.3f} "
+              f"{result['p99_ms']:>8.3f}")
+
+    overhead = results["via hub"]["p50_ms"] - results["direct"]["p50_ms"]
+    print(f"surcoût p50 du proxy: {overhead:.3f} ms   proxy: {MCP_PROXY.stats()}")
+    stop_server(httpd)
+    stop_server(stub)
+    os.unlink(config_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark du limiteur de débit (seau à jetons par client)
+Mesure le coût par requête de RateLimiter.acquire() avec 10 000 clients
+distincts, en un et plusieurs threads, avec un verrou unique (1 shard) puis
+avec les shards par défaut; vérifie aussi que les seaux inactifs sont évincés.
+
+Usage: python benchmarks/bench_ratelimit.py [--clients 10000] [--requests 500000] [--threads 1,8]
+"""
+
+import argparse
+import threading
+import time
+
+import common  # noqa: F401 - chemin d'import des modules du hub
+
+from mcp_hub_ratelimit import DEFAULT_SHARDS, RateLimiter
+
+
+def run(limiter, keys, requests, threads):
+    """Coût moyen (ns) d'un acquire() réparti sur `threads` threads"""
+    per_thread = requests // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset):
+        acquire = limiter.acquire
+        count = len(keys)
+        barrier.wait()
+        for i in range(per_thread):
+            acquire(keys[(offset + i) % count])
+
+    workers = [threading.Thread(target=worker, args=(n * 997,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - started) / (per_thread * threads) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=500000)
+    parser.add_argument("--threads", default="1,8")
+    args = parser.parse_args()
+
+    keys = [f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}" for i in range(args.clients)]
+    print(f"{args.clients} clients distincts, {args.requests} requêtes, politique 100/min (rafale 20)")
+    print(f"{'limiteur':<14} {'threads':>7} {'ns/requête':>11} {'refusées':>9} {'seaux':>7}")
+    for shards in (1, DEFAULT_SHARDS):
+        for threads in (int(t) for t in args.threads.split(",")):
+            limiter = RateLimiter(100, 20, enabled=True, shards=shards)
+            cost = run(limiter, keys, args.requests, threads)
+            print(f"{f'{shards} shard(s)':<14} {threads:>7} {cost:>11.0f} {limiter.limited:>9} {len(limiter):>7}")
+
+    # Éviction : après burst / rate secondes d'inactivité, les seaux disparaissent au fil des requêtes
+    limiter = RateLimiter(100, 20, enabled=True)
+    now = time.monotonic()
+    for key in keys:
+        limiter.acquire(key, now)
+    before = len(limiter)
+    later = now + 20 / (100 / 60.0) + 1
+    for i in range(args.clients):
+        limiter.acquire(f"nouveau-{i % 100}", later)
+    print(f"\néviction: {before} seaux -> {len(limiter)} après inactivité "
+          f"(100 clients actifs, {args.clients} requêtes)")
+
+
+if __name__ == "__main__":
+    main()
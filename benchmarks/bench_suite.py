@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Suite de benchmarks de bout en bout des trois points d'entrée du hub
+Démarre des serveurs MCP amont factices, puis chaque point d'entrée
+(mcp_hub_central, mcp_hub_central_hybrid, mcp_hub_standalone) configuré pour
+les utiliser, chacun dans son propre processus; envoie du trafic GET et
+JSON-RPC à plusieurs niveaux de concurrence et écrit débit et latences
+p50/p95/p99 par endpoint dans un fichier JSON.
+
+Usage: python benchmarks/bench_suite.py [--entries central,hybrid,standalone] [--concurrency 1,8,32]
+                                        [--duration 3] [--stubs 2] [--stub-latency-ms 5]
+                                        [--output benchmarks/bench_suite_results.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+from common import ROOT_DIR, run_load
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ENTRY_MODULES = {
+    "central": ("mcp_hub_central", "MCPHubHandler"),
+    "hybrid": ("mcp_hub_central_hybrid", "MCPHubHandler"),
+    "standalone": ("mcp_hub_standalone", "MCPHubStandaloneHandler")
+}
+
+GET_ENDPOINTS = {
+    "central": ["/health", "/api/servers", "/api/tools", "/.well-known/mcp-config", "/"],
+    "hybrid": ["/health", "/api/servers", "/api/tools", "/.well-known/mcp-config", "/"],
+    "standalone": ["/health", "/api/servers", "/api/tools", "/api/discovery", "/"]
+}
+
+
+def jsonrpc_endpoints(stub_names):
+    """Requêtes JSON-RPC du mode standalone : (nom, corps) - tools/call relayé à un amont factice"""
+    def body(method, params=None):
+        message = {"jsonrpc": "2.0", "id": 1, "method": method}
+        if params is not None:
+            message["params"] = params
+        return json.dumps(message).encode()
+
+    return [
+        ("jsonrpc ping", body("ping")),
+        ("jsonrpc tools/list", body("tools/list")),
+        ("jsonrpc tools/call", body("tools/call", {"name": f"{stub_names[0]}_tool_1",
+                                                     "arguments": {"query": "select 1"}}))
+    ]
+
+
+def start_process(args, pattern):
+    """Lancer un processus enfant et attendre la ligne de démarrage contenant son port"""
+    process = subprocess.Popen([sys.executable] + args, cwd=ROOT_DIR, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if pattern not in line:
+        process.kill()
+        raise RuntimeError(f"{' '.join(args)} did not start: {line!r}")
+    return process, int(line.rsplit(" ", 1)[1])
+
+
+def stop_process(process):
+    process.terminate()
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def write_config(stubs):
+    """Configuration de référence du dépôt dont les serveurs sont remplacés par les amonts factices"""
+    from stub_upstream import stub_server_entry
+
+    with open(os.path.join(ROOT_DIR, "mcp_servers_config.json"), "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config["servers"] = {name: stub_server_entry(name, port) for name, port in stubs.items()}
+    config["routing"] = dict(config.get("routing", {}), fallback_server=next(iter(stubs)))
+    # La limitation de débit par client fausserait la mesure (un seul client local)
+    config.setdefault("security", {})["rate_limiting"] = {"enabled": False}
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as config_file:
+        json.dump(config, config_file)
+    return config_file.name
+
+
+def serve(entry, workers):
+    """Processus enfant : servir un point d'entrée sur un port libre (MCP_SERVERS_CONFIG déjà défini)"""
+    import importlib
+
+    from mcp_hub_server import create_server
+
+    module_name, handler_name = ENTRY_MODULES[entry]
+    module = importlib.import_module(module_name)
+    module.DISCOVERY.start()
+    httpd = create_server(0, getattr(module, handler_name), workers=workers, host="127.0.0.1")
+    if getattr(module, "METRICS", None) is not None:
+        module.METRICS.register_stats("mcp_hub_workers", httpd.stats)
+    print(f"Hub {entry} on port {httpd.server_address[1]}", flush=True)
+    httpd.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", default="central,hybrid,standalone")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--stubs", type=int, default=2)
+    parser.add_argument("--stub-latency-ms", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", default=os.path.join(BENCH_DIR, "bench_suite_results.json"))
+    parser.add_argument("--serve", choices=sorted(ENTRY_MODULES), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.workers)
+        return
+
+    entries = [entry.strip() for entry in args.entries.split(",")]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    workers = args.workers or max(16, max(levels) * 2)
+
+    stub_processes = []
+    stubs = {}
+    config_path = None
+    results = []
+    try:
+        for i in range(args.stubs):
+            name = f"stub{i + 1}"
+            process, port = start_process([os.path.join(BENCH_DIR, "stub_upstream.py"), "--port", "0",
+                                           "--name", name, "--latency-ms", str(args.stub_latency_ms)],
+                                          "Stub upstream")
+            stub_processes.append(process)
+            stubs[name] = port
+        config_path = write_config(stubs)
+        os.environ["MCP_SERVERS_CONFIG"] = config_path
+
+        print(f"{'entrée':<11} {'endpoint':<24} {'conc.':>5} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+              f"{'p99 ms':>8} {'erreurs':>7}")
+        for entry in entries:
+            hub, port = start_process([os.path.abspath(__file__), "--serve", entry, "--workers", str(workers)],
+                                      "Hub")
+            try:
+                scenarios = [(path, "GET", path, None) for path in GET_ENDPOINTS[entry]]
+                if entry == "standalone":
+                    scenarios += [(name, "POST", "/mcp", body) for name, body in jsonrpc_endpoints(list(stubs))]
+                for concurrency in levels:
+                    for name, method, path, body in scenarios:
+                        result = run_load(port, path, concurrency, args.duration, method=method, body=body,
+                                          keep_alive=True)
+                        results.append(dict(result, entry=entry, endpoint=name, method=method, path=path,
+                                            concurrency=concurrency))
+                        print(f"{entry:<11} {name:<24} {concurrency:>5} {result['rps']:>9.1f} "
+                              f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+                              f"{result['errors']:>7}")
+            finally:
+                stop_process(hub)
+    finally:
+        for process in stub_processes:
+            stop_process(process)
+        if config_path:
+            os.unlink(config_path)
+
+    report = {
+        "generated_at": datetime.now().isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "parameters": {
+            "entries": entries,
+            "concurrency": levels,
+            "duration_seconds": args.duration,
+            "stubs": args.stubs,
+            "stub_latency_ms": args.stub_latency_ms,
+            "workers": workers,
+            "keep_alive": True
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n{len(results)} mesures écrites dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Benchmark du client amont mutualisé
+Compare urllib.request.urlopen (une connexion par requête) au client keep-alive
+UpstreamClient sur des sondes /health répétées vers un serveur factice.
+
+Usage: python benchmarks/bench_upstream_pool.py [--requests 2000] [--threads 4]
+"""
+
+import argparse
+import threading
+import time
+import urllib.request
+
+from common import stop_server
+from stub_upstream import start_stub
+
+from mcp_hub_upstream import UpstreamClient
+
+
+def run(fn, requests, threads):
+    per_thread = requests // threads
+
+    def worker():
+        for _ in range(per_thread):
+            fn()
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - started, per_thread * threads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    httpd, port = start_stub("pool")
+    url = f"http://127.0.0.1:{port}/health"
+    client = UpstreamClient(pool_size=args.threads)
+
+    def with_urlopen():
+        with urllib.request.urlopen(url, timeout=5) as response:
+            response.read()
+
+    def with_pool():
+        client.get(url, timeout=5)
+
+    for name, fn in (("urlopen", with_urlopen), ("UpstreamClient", with_pool)):
+        elapsed, count = run(fn, args.requests, args.threads)
+        print(f"{name:<16} {count / elapsed:>9.1f} req/s   {elapsed / count * 1e6:>8.1f} µs/req")
+
+    stats = client.stats()
+    print(f"pool: hits={stats['hits']} misses={stats['misses']} hit_ratio={stats['hit_ratio']}")
+    client.close()
+    stop_server(httpd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Outils communs aux benchmarks du MCP Hub
+Démarrage de serveurs en arrière-plan et génération de charge HTTP
+"""
+
+import http.client
+import os
+import sys
+import threading
+import time
+
+# Les benchmarks importent les modules du hub depuis la racine du dépôt
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+
+def start_in_thread(httpd):
+    """Lancer serve_forever dans un thread daemon et retourner le port"""
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return httpd.server_address[1]
+
+
+def stop_server(httpd):
+    """Arrêter proprement un serveur lancé avec start_in_thread"""
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def percentile(sorted_values, pct):
+    """Percentile (plus proche rang) d'une liste déjà triée"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_load(port, path, concurrency, duration, method="GET", body=None, headers=None,
+             keep_alive=False, host="127.0.0.1"):
+    """Envoyer des requêtes en boucle depuis `concurrency` clients pendant `duration` secondes
+
+    Retourne un dict avec le débit, les latences (ms), les erreurs et le nombre
+    de connexions TCP ouvertes par les clients.
+    """
+    latencies = []
+    errors = [0]
+    connections = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    headers = dict(headers or {})
+    if body is not None:
+        headers.setdefault("Content-Type", "application/json")
+
+    def client():
+        local_latencies = []
+        local_errors = 0
+        local_connections = 0
+        conn = None
+        while time.perf_counter() < deadline:
+            if conn is None:
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                local_connections += 1
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 500:
+                    local_errors += 1
+                else:
+                    local_latencies.append((time.perf_counter() - start) * 1000)
+                if not keep_alive or response.will_close:
+                    conn.close()
+                    conn = None
+            except (OSError, http.client.HTTPException):
+                local_errors += 1
+                conn.close()
+                conn = None
+        if conn is not None:
+            conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors[0] += local_errors
+            connections[0] += local_connections
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "connections": connections[0],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99)
+    }
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Serveur MCP amont factice pour les benchmarks
+Expose /health, /api/tools et un endpoint JSON-RPC /mcp avec une latence réglable;
+tools/call avec les arguments `progress` (nombre d'étapes) ou `size` (octets de
+résultat) répond en text/event-stream si le client l'accepte
+
+Usage: python benchmarks/stub_upstream.py --port 9001 [--latency-ms 20] [--tools 10]
+"""
+
+import argparse
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_tools(prefix, count):
+    """Générer une liste d'outils MCP réaliste"""
+    return [
+        {
+            "name": f"{prefix}_tool_{i}",
+            "description": f"Stub tool {i} exposed by {prefix}",
+            "inputSchema": {
+                "type": "object",
+                "properties": {"query": {"type": "string"}, "limit": {"type": "integer"}},
+                "required": ["query"]
+            }
+        }
+        for i in range(count)
+    ]
+
+
+class StubUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps partent en deux écritures : sans TCP_NODELAY le keep-alive paie ~40 ms
+    disable_nagle_algorithm = True
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_events(self, messages, interval):
+        """Réponse text/event-stream chunked, un message toutes les `interval` secondes"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for i, message in enumerate(messages):
+            if i:
+                time.sleep(interval)
+            event = b"event: message\ndata: " + json.dumps(message).encode() + b"\n\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        self.server.count_request()
+        if self.path == "/health":
+            self.send_json(200, {"status": "ok", "name": self.server.name})
+        elif self.path == "/api/tools":
+            self.send_json(200, self.server.tools)
+        else:
+            self.send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.server.latency)
+        self.server.count_request()
+        if self.path != "/mcp":
+            self.send_json(404, {"error": "not found"})
+            return
+        if self.server.fail_status:
+            # Panne simulée (ex. 502 d'un proxy devant un serveur arrêté)
+            self.send_json(self.server.fail_status, {"error": "upstream failure"})
+            return
+        method = request.get("method")
+        session_id = self.headers.get("Mcp-Session-Id")
+        if method == "initialize":
+            result = {"protocolVersion": "2025-06-18", "capabilities": {"tools": {}},
+                      "serverInfo": {"name": self.server.name, "version": "1.0.0"}}
+            self.send_json(200, {"jsonrpc": "2.0", "id": request.get("id"), "result": result},
+                           {"Mcp-Session-Id": self.server.open_session()})
+            return
+        elif session_id and session_id not in self.server.sessions:
+            # Session inconnue ou expirée : le client doit refaire initialize
+            self.send_json(404, {"error": "session not found"})
+            return
+        elif method == "tools/list":
+            result = {"tools": self.server.tools}
+        elif method == "tools/call":
+            params = request.get("params", {})
+            arguments = params.get("arguments", {})
+            text = "x" * arguments["size"] if "size" in arguments else json.dumps(arguments)
+            result = {"content": [{"type": "text", "text": text}], "server": self.server.name}
+            steps = arguments.get("progress", 0)
+            if (steps or "size" in arguments) and "text/event-stream" in self.headers.get("Accept", ""):
+                token = (params.get("_meta") or {}).get("progressToken", request.get("id"))
+                messages = [{"jsonrpc": "2.0", "method": "notifications/progress",
+                             "params": {"progressToken": token, "progress": step + 1, "total": steps}}
+                            for step in range(steps)]
+                messages.append({"jsonrpc": "2.0", "id": request.get("id"), "result": result})
+                self.send_events(messages, arguments.get("interval", 0.0))
+                return
+        elif method == "ping":
+            result = {}
+        else:
+            self.send_json(200, {"jsonrpc": "2.0", "id": request.get("id"),
+                                 "error": {"code": -32601, "message": f"Method not found: {method}"}})
+            return
+        if "id" not in request:
+            self.send_response(202)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_json(200, {"jsonrpc": "2.0", "id": request.get("id"), "result": result})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubUpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, name="stub", latency=0.0, tools=None):
+        self.name = name
+        self.latency = latency
+        self.tools = tools if tools is not None else make_tools(name, 10)
+        self.requests = 0
+        self.fail_status = None
+        self.sessions = set()
+        self._lock = threading.Lock()
+        super().__init__(address, StubUpstreamHandler)
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def open_session(self):
+        session_id = uuid.uuid4().hex
+        self.sessions.add(session_id)
+        return session_id
+
+
+def start_stub(name="stub", latency=0.0, tools=None, port=0):
+    """Démarrer un serveur amont factice en arrière-plan et retourner (serveur, port)"""
+    httpd = StubUpstreamServer(("127.0.0.1", port), name, latency, tools)
+    threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return httpd, httpd.server_address[1]
+
+
+def stub_server_entry(name, port, **extra):
+    """Entrée de mcp_servers_config.json pointant vers un serveur factice"""
+    entry = {
+        "name": f"Stub {name}",
+        "version": "1.0.0",
+        "description": f"Stub upstream {name}",
+        "host": "127.0.0.1",
+        "port": port,
+        "protocol": "http",
+        "status": "active",
+        "tools_count": 10,
+        "categories": ["benchmark"],
+        "always_works": False,
+        "discovery_path": "/health",
+        "discovery_timeout": 5
+    }
+    entry.update(extra)
+    return entry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument("--name", default="stub")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--tools", type=int, default=10)
+    args = parser.parse_args()
+
+    httpd = StubUpstreamServer(("127.0.0.1", args.port), args.name, args.latency_ms / 1000.0,
+                               make_tools(args.name, args.tools))
+    # Port réel affiché (--port 0 choisit un port libre) : lu par bench_suite.py
+    print(f"Stub upstream {args.name} on port {httpd.server_address[1]}", flush=True)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
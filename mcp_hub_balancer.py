@@ -0,0 +1,242 @@
+"""
+MCP Hub Central - Répartition de charge entre les réplicas d'un serveur amont
+Un serveur peut déclarer plusieurs endpoints (`replicas`); les appels relayés
+sont répartis selon routing.load_balancing.algorithm et les réplicas signalés
+hors ligne par la découverte sont écartés
+"""
+
+import functools
+import itertools
+import math
+import os
+import random
+import threading
+import time
+
+from mcp_hub_breaker import CircuitBreaker
+from mcp_hub_upstream import DEFAULT_TIMEOUT
+
+# Algorithmes disponibles (routing.load_balancing.algorithm) et alias acceptés
+ROUND_ROBIN = "round_robin"
+LEAST_REQUESTS = "least_requests"
+PEAK_EWMA = "peak_ewma"
+ALGORITHMS = (ROUND_ROBIN, LEAST_REQUESTS, PEAK_EWMA)
+ALGORITHM_ALIASES = {"least_connections": LEAST_REQUESTS, "least_outstanding": LEAST_REQUESTS, "ewma": PEAK_EWMA}
+DEFAULT_ALGORITHM = ROUND_ROBIN
+
+# Constante de temps de la moyenne mobile des latences (peak EWMA), en secondes
+EWMA_DECAY = float(os.getenv("MCP_HUB_LB_DECAY", "10"))
+
+
+def replica_configs(server_config):
+    """Configuration de chaque endpoint d'un serveur
+
+    Chaque entrée de `replicas` (host, port, et éventuellement protocol ou
+    mcp_endpoint) surcharge la configuration du serveur; sans `replicas`, le
+    serveur n'a qu'un endpoint : son host/port.
+    """
+    replicas = server_config.get("replicas")
+    if not replicas:
+        return [server_config]
+    base = {key: value for key, value in server_config.items() if key != "replicas"}
+    return [dict(base, **replica) for replica in replicas]
+
+
+def replica_url(replica_config):
+    return f"{replica_config['protocol']}://{replica_config['host']}:{replica_config['port']}"
+
+
+def replica_probes(key, server_config, probe):
+    """Sondes de découverte de chaque réplica : {key + (index,): probe(replica, budget)}"""
+    return {
+        key + (index,): functools.partial(probe, replica)
+        for index, replica in enumerate(replica_configs(server_config))
+    }
+
+
+def merge_replica_health(key, server_config, results):
+    """Reporter la santé de chaque réplica dans server_config["replicas"]
+
+    Retourne le résultat de sonde représentatif du serveur : le premier réplica
+    en ligne (HTTP 200), sinon le premier réplica.
+    """
+    replicas = server_config.get("replicas")
+    health = [results[key + (index,)] for index in range(len(replicas) if replicas else 1)]
+    if replicas:
+        server_config["replicas"] = [
+            dict(replica, health_status="online" if result.ok and result.value == 200 else "offline")
+            for replica, result in zip(replicas, health)
+        ]
+    for result in health:
+        if result.ok and result.value == 200:
+            return result
+    return health[0]
+
+
+def load_balancing_algorithm(routing):
+    """Algorithme configuré dans routing.load_balancing (round_robin par défaut)"""
+    load_balancing = routing.get("load_balancing") or {}
+    if not load_balancing.get("enabled", True):
+        return None
+    algorithm = load_balancing.get("algorithm", DEFAULT_ALGORITHM)
+    algorithm = ALGORITHM_ALIASES.get(algorithm, algorithm)
+    return algorithm if algorithm in ALGORITHMS else DEFAULT_ALGORITHM
+
+
+class Endpoint:
+    """Réplica d'un serveur amont et ses compteurs de charge
+
+    `outstanding` compte les appels en cours; `ewma` est la moyenne mobile
+    « peak » des latences : un appel plus lent que la moyenne la remplace
+    immédiatement, un appel plus rapide ne la fait baisser que progressivement.
+    Chaque endpoint a son propre disjoncteur.
+    """
+
+    __slots__ = ("url", "config", "breaker", "healthy", "outstanding", "ewma", "stamp", "requests", "failures",
+                 "_lock")
+
+    def __init__(self, config):
+        self.url = replica_url(config)
+        self.config = config
+        self.breaker = CircuitBreaker(self.url, config.get("circuit_breaker"),
+                                      config.get("timeout", DEFAULT_TIMEOUT))
+        self.healthy = True
+        self.outstanding = 0
+        self.ewma = 0.0
+        self.stamp = time.monotonic()
+        self.requests = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def _decayed(self, now):
+        # Sans nouvel appel, la moyenne retombe vers 0 : un réplica lent est réessayé tôt ou tard
+        return self.ewma * math.exp(-(now - self.stamp) / EWMA_DECAY)
+
+    def cost(self):
+        """Coût peak EWMA : latence attendue pondérée par les appels en cours"""
+        return self._decayed(time.monotonic()) * (self.outstanding + 1)
+
+    def begin(self):
+        """Compter un appel en cours et retourner son instant de départ"""
+        with self._lock:
+            self.outstanding += 1
+            self.requests += 1
+        return time.monotonic()
+
+    def observe(self, started, ok=True):
+        """Intégrer la latence d'un appel (jusqu'aux en-têtes pour un flux) et la retourner"""
+        now = time.monotonic()
+        latency = now - started
+        with self._lock:
+            if not ok:
+                self.failures += 1
+            if latency > self.ewma:
+                self.ewma = latency
+            else:
+                weight = math.exp(-(now - self.stamp) / EWMA_DECAY)
+                self.ewma = self.ewma * weight + latency * (1 - weight)
+            self.stamp = now
+        return latency
+
+    def done(self):
+        """Terminer un appel commencé par begin()"""
+        with self._lock:
+            self.outstanding -= 1
+
+    def stats(self):
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "ewma_ms": round(self._decayed(time.monotonic()) * 1000, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "circuit": self.breaker.stats()
+        }
+
+
+class ReplicaPool:
+    """Endpoints d'un serveur amont"""
+
+    __slots__ = ("endpoints", "_counter")
+
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+        self._counter = itertools.count()
+
+    def pick(self, algorithm):
+        candidates = [endpoint for endpoint in self.endpoints
+                      if endpoint.healthy and endpoint.breaker.available()]
+        if not candidates:
+            # Aucun réplica disponible : le disjoncteur de l'endpoint choisi tranchera
+            candidates = [endpoint for endpoint in self.endpoints if endpoint.breaker.available()] or self.endpoints
+        if len(candidates) == 1 or algorithm is None:
+            return candidates[0]
+        if algorithm == ROUND_ROBIN:
+            return candidates[next(self._counter) % len(candidates)]
+        # Deux choix aléatoires : le moins chargé des deux, sans parcourir tout le pool
+        first, second = random.sample(candidates, 2)
+        if algorithm == LEAST_REQUESTS:
+            return first if first.outstanding <= second.outstanding else second
+        return first if first.cost() <= second.cost() else second
+
+
+class LoadBalancer:
+    """Choisir le réplica de chaque appel relayé vers un serveur amont
+
+    Les pools sont reconstruits à chaque snapshot de découverte (santé de chaque
+    réplica); les compteurs d'un endpoint toujours présent sont conservés.
+    """
+
+    def __init__(self):
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    def _build_pool(self, server_id, server_config, previous):
+        endpoints = []
+        for replica in replica_configs(server_config):
+            endpoint = previous.get((server_id, replica_url(replica)))
+            if endpoint is None:
+                endpoint = Endpoint(replica)
+            else:
+                endpoint.config = replica
+            endpoint.healthy = replica.get("health_status") != "offline"
+            endpoints.append(endpoint)
+        return ReplicaPool(endpoints)
+
+    def _known_endpoints(self):
+        return {
+            (server_id, endpoint.url): endpoint
+            for server_id, pool in self._pools.items()
+            for endpoint in pool.endpoints
+        }
+
+    def update(self, snapshot):
+        """Reconstruire les pools depuis un snapshot de découverte (abonné de DISCOVERY)"""
+        with self._lock:
+            previous = self._known_endpoints()
+            self._pools = {
+                server_id: self._build_pool(server_id, server_config, previous)
+                for server_id, server_config in snapshot.servers.items()
+            }
+
+    def pick(self, server_id, server_config, routing):
+        """Endpoint à utiliser pour un appel vers `server_id`"""
+        pool = self._pools.get(server_id)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(server_id)
+                if pool is None:
+                    pool = self._build_pool(server_id, server_config, self._known_endpoints())
+                    self._pools = dict(self._pools, **{server_id: pool})
+        return pool.pick(load_balancing_algorithm(routing))
+
+    def stats(self):
+        return {
+            server_id: [endpoint.stats() for endpoint in pool.endpoints]
+            for server_id, pool in list(self._pools.items())
+        }
+
+
+# Répartiteur partagé par tout le processus
+LOAD_BALANCER = LoadBalancer()
@@ -0,0 +1,205 @@
+"""
+MCP Hub Central - Disjoncteurs et budgets de nouvel essai par serveur amont
+Un amont en panne (502, blocage jusqu'au timeout) est écarté après quelques
+appels au lieu de faire attendre chaque requête; les nouveaux essais sont
+limités à une fraction du trafic pour ne pas amplifier une panne
+"""
+
+import logging
+import os
+import threading
+import time
+
+from mcp_hub_logging import LOG, log_event
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Réglages par défaut, surchargeables par serveur avec la clé "circuit_breaker"
+DEFAULT_BREAKER_SETTINGS = {
+    # Part d'appels en échec ou lents au-delà de laquelle le disjoncteur s'ouvre
+    "failure_rate": float(os.getenv("MCP_HUB_BREAKER_FAILURE_RATE", "0.5")),
+    # Appels minimum dans la fenêtre avant de juger le taux d'échec
+    "minimum_calls": int(os.getenv("MCP_HUB_BREAKER_MIN_CALLS", "10")),
+    # Fenêtre glissante d'observation (s)
+    "window": float(os.getenv("MCP_HUB_BREAKER_WINDOW", "30")),
+    # Durée d'ouverture avant un appel d'essai (s)
+    "open_duration": float(os.getenv("MCP_HUB_BREAKER_OPEN_SECONDS", "30")),
+    # Appels d'essai simultanés en semi-ouverture
+    "half_open_calls": 1,
+    # Un appel réussi plus long que ce seuil compte comme lent (s); timeout / 2 par défaut
+    "slow_call_threshold": None
+}
+
+# Budget de nouveaux essais : 20% du trafic, et au moins un essai par seconde
+RETRY_BUDGET_RATIO = float(os.getenv("MCP_HUB_RETRY_BUDGET_RATIO", "0.2"))
+RETRY_BUDGET_MIN_PER_SECOND = float(os.getenv("MCP_HUB_RETRY_BUDGET_MIN_PER_SECOND", "1"))
+RETRY_BUDGET_MAX_TOKENS = 10.0
+
+WINDOW_BUCKETS = 10
+
+
+class CircuitOpenError(Exception):
+    """Appel refusé sans contacter l'amont : disjoncteur ouvert"""
+
+    def __init__(self, breaker, retry_after):
+        super().__init__(f"circuit {breaker.state} for {breaker.name}")
+        self.breaker = breaker
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Disjoncteur d'un endpoint amont : fermé, ouvert ou semi-ouvert
+
+    Fermé, les appels passent et leurs résultats sont comptés dans une
+    fenêtre glissante; quand la part d'échecs ou d'appels lents dépasse
+    `failure_rate`, il s'ouvre et refuse tout appel pendant `open_duration`.
+    Il passe ensuite en semi-ouverture : quelques appels d'essai décident de
+    sa fermeture ou d'une nouvelle ouverture.
+
+    Chaque changement d'état ouvre une nouvelle génération : acquire()
+    retourne la génération de l'appel réservé et record() ignore le résultat
+    d'un appel réservé avant le dernier changement d'état (un appel lent
+    lancé disjoncteur fermé ne décide pas d'un essai en semi-ouverture).
+    """
+
+    def __init__(self, name, settings=None, timeout=None):
+        self.name = name
+        self.settings = dict(DEFAULT_BREAKER_SETTINGS, **(settings or {}))
+        if self.settings["slow_call_threshold"] is None and timeout:
+            self.settings["slow_call_threshold"] = timeout / 2
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trips = 0
+        self.rejected = 0
+        self._buckets = []
+        self._trials = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _retry_after(self, now):
+        return max(0.0, self.opened_at + self.settings["open_duration"] - now)
+
+    def available(self):
+        """Vrai si un appel serait accepté (sans le réserver)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return self._retry_after(time.monotonic()) <= 0
+        return self._trials < self.settings["half_open_calls"]
+
+    def _transition(self, state):
+        self.state = state
+        self._generation += 1
+
+    def acquire(self):
+        """Réserver un appel et retourner sa génération, à passer à record(), ou lever CircuitOpenError"""
+        with self._lock:
+            if self.state == CLOSED:
+                return self._generation
+            now = time.monotonic()
+            if self.state == OPEN:
+                retry_after = self._retry_after(now)
+                if retry_after > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self, retry_after)
+                self._transition(HALF_OPEN)
+                self._trials = 0
+            if self._trials >= self.settings["half_open_calls"]:
+                self.rejected += 1
+                raise CircuitOpenError(self, 0.0)
+            self._trials += 1
+            return self._generation
+
+    def record(self, generation, ok, latency):
+        """Compter le résultat d'un appel réservé par acquire() (ignoré si l'état a changé depuis)"""
+        slow_threshold = self.settings["slow_call_threshold"]
+        healthy = ok and (slow_threshold is None or latency <= slow_threshold)
+        now = time.monotonic()
+        with self._lock:
+            if generation != self._generation:
+                return
+            if self.state == HALF_OPEN:
+                self._trials -= 1
+                if healthy:
+                    self._transition(CLOSED)
+                    self._buckets = []
+                else:
+                    self._open(now)
+                return
+            calls, failures = self._add(now, healthy)
+            if calls >= self.settings["minimum_calls"] and failures >= calls * self.settings["failure_rate"]:
+                self._open(now)
+
+    def _open(self, now):
+        self._transition(OPEN)
+        self.opened_at = now
+        self.trips += 1
+        log_event(LOG, logging.WARNING, "circuit_opened", upstream=self.name,
+                  open_seconds=self.settings['open_duration'])
+
+    def _add(self, now, healthy):
+        # Fenêtre découpée en WINDOW_BUCKETS tranches : [début, appels, échecs]
+        width = self.settings["window"] / WINDOW_BUCKETS
+        start = now - now % width
+        buckets = [bucket for bucket in self._buckets if bucket[0] > now - self.settings["window"]]
+        if not buckets or buckets[-1][0] != start:
+            buckets.append([start, 0, 0])
+        buckets[-1][1] += 1
+        if not healthy:
+            buckets[-1][2] += 1
+        self._buckets = buckets
+        return sum(bucket[1] for bucket in buckets), sum(bucket[2] for bucket in buckets)
+
+    def stats(self):
+        with self._lock:
+            calls = sum(bucket[1] for bucket in self._buckets)
+            failures = sum(bucket[2] for bucket in self._buckets)
+        return {
+            "state": self.state,
+            "calls": calls,
+            "failures": failures,
+            "trips": self.trips,
+            "rejected": self.rejected
+        }
+
+
+class RetryBudget:
+    """Seau à jetons des nouveaux essais d'un serveur amont
+
+    Chaque appel dépose `ratio` jeton et chaque nouvel essai en retire un :
+    les nouveaux essais restent une fraction du trafic, même si l'amont est
+    entièrement en panne. `min_per_second` jetons s'ajoutent chaque seconde
+    pour qu'un serveur peu sollicité puisse quand même réessayer.
+    """
+
+    def __init__(self, ratio=RETRY_BUDGET_RATIO, min_per_second=RETRY_BUDGET_MIN_PER_SECOND,
+                 max_tokens=RETRY_BUDGET_MAX_TOKENS):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.stamp = time.monotonic()
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.max_tokens, self.tokens + (now - self.stamp) * self.min_per_second)
+        self.stamp = now
+
+    def deposit(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self):
+        """Retirer un jeton pour un nouvel essai; faux si le budget est épuisé"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            self.exhausted += 1
+            return False
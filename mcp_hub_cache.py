@@ -0,0 +1,224 @@
+"""
+MCP Hub Central - Cache des réponses pré-sérialisées
+Les réponses des API JSON sont encodées une seule fois par version
+(configuration + snapshot de découverte) et servies avec un ETag fort,
+compressées selon Accept-Encoding (gzip, brotli si disponible); les
+résultats des outils en lecture seule sont conservés pendant leur TTL
+"""
+
+import gzip
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : gzip seul
+    brotli = None
+
+# Taille minimale (octets) en dessous de laquelle la compression ne rapporte rien
+COMPRESSION_MIN_SIZE = int(os.getenv("MCP_HUB_COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Codages supportés, par ordre de préférence du serveur
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+# Taille maximale (octets) des résultats d'outils conservés
+TOOL_CACHE_MAX_BYTES = int(os.getenv("MCP_HUB_TOOL_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+
+def make_etag(body):
+    """ETag fort dérivé du contenu (identique entre redémarrages et réplicas)"""
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    """Évaluer un en-tête If-None-Match (comparaison faible, RFC 9110 §13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding, supported=SUPPORTED_ENCODINGS):
+    """Choisir le codage à utiliser d'après Accept-Encoding (None = identity)"""
+    if not accept_encoding:
+        return None
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = qvalues.get(coding, qvalues.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding):
+    """Compresser un corps de réponse (gzip déterministe : mtime=0)"""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def is_compressible(body, content_type):
+    return len(body) >= COMPRESSION_MIN_SIZE and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CachedResponse:
+    """Réponse encodée prête à l'envoi - immuable une fois construite
+
+    Les variantes compressées sont calculées à la première demande puis
+    conservées avec l'entrée : une compression par codage et par version.
+    """
+
+    __slots__ = ("version", "body", "etag", "content_type", "compressible", "variants")
+
+    def __init__(self, version, body, content_type):
+        self.version = version
+        self.body = body
+        self.etag = make_etag(body)
+        self.content_type = content_type
+        self.compressible = is_compressible(body, content_type)
+        self.variants = {}
+
+    def variant(self, encoding):
+        """Retourner (corps, ETag) pour un codage (None = non compressé)"""
+        if encoding is None:
+            return self.body, self.etag
+        variant = self.variants.get(encoding)
+        if variant is None:
+            # Chaque représentation a son propre ETag fort
+            variant = (compress(self.body, encoding), f'{self.etag[:-1]}-{encoding}"')
+            self.variants[encoding] = variant
+        return variant
+
+
+class ResponseCache:
+    """Dernière réponse encodée par endpoint, valide pour une version donnée
+
+    La version combine la version de la configuration et celle du snapshot de
+    découverte : toute nouvelle version invalide automatiquement l'entrée, qui
+    est reconstruite à la première requête suivante.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version, build_fn, content_type="application/json"):
+        """Retourner la réponse de `key` pour `version`, en l'encodant si nécessaire"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        entry = CachedResponse(version, build_fn(), content_type)
+        with self._lock:
+            current = self._entries.get(key)
+            # Ne jamais remplacer une entrée plus récente construite en parallèle
+            if current is None or current.version <= version:
+                self._entries[key] = entry
+        return entry
+
+    def clear(self, *args):
+        """Vider le cache (abonné aux rechargements de configuration et de découverte)"""
+        with self._lock:
+            self._entries = {}
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class ToolResultCache:
+    """Résultats d'appels d'outils en lecture seule, valides pendant le TTL de l'outil
+
+    Les outils s'y inscrivent un par un avec `tool_cache` dans l'entrée de
+    leur serveur ({"list_tables": 30} : TTL en secondes). Les résultats sont
+    conservés encodés; au-delà de `max_bytes`, les moins récemment utilisés
+    sont évincés.
+    """
+
+    def __init__(self, max_bytes=TOOL_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key):
+        """Résultat encodé de `key` (bytes), ou None s'il est absent ou expiré"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if entry[0] <= now:
+                self._remove(key)
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[1]
+
+    def put(self, key, result, ttl):
+        """Conserver un résultat encodé pendant `ttl` secondes"""
+        if ttl <= 0 or len(result) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, result)
+            self.bytes += len(result)
+            self._counters["stores"] += 1
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def _remove(self, key):
+        self.bytes -= len(self._entries.pop(key)[1])
+
+    def clear(self, *args):
+        """Vider le cache (abonné aux rechargements de configuration : les TTL ont pu changer)"""
+        with self._lock:
+            self._entries = OrderedDict()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        stats["bytes"] = self.bytes
+        stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -1,27 +1,34 @@
 import json
-import urllib.request
-import urllib.parse
-from http.server import BaseHTTPRequestHandler, HTTPServer
 from datetime import datetime
-import threading
-import time
-import os
 
-def load_servers_config_static():
-    """Charger la configuration des serveurs MCP (fonction statique)"""
+from mcp_hub_cache import ResponseCache
+from mcp_hub_config import CONFIG_PATH, ConfigRegistry
+from mcp_hub_discovery import DiscoveryScheduler
+from mcp_hub_logging import logging_stats, setup_logging
+from mcp_hub_metrics import MetricsRegistry
+from mcp_hub_ratelimit import RateLimiter
+from mcp_hub_server import HubRequestHandler, create_server
+from mcp_hub_templates import PageTemplate, SnapshotFragment
+
+
+def load_servers_config(path=CONFIG_PATH):
+    """Charger la configuration des serveurs MCP"""
     try:
-        with open('mcp_servers_config.json', 'r', encoding='utf-8') as f:
+        with open(path, 'r', encoding='utf-8') as f:
             return json.load(f)
     except FileNotFoundError:
-        # Configuration simple avec variables d'environnement - PAS DE DÉCOUVERTE
+        # Configuration hybride Railway si le fichier n'existe pas
         return {
             "servers": {
                 "supabase": {
                     "name": "Supabase MCP Server",
                     "version": "3.1.0",
                     "description": "Enhanced Edition v3.1 - 54+ MCP tools for 100% autonomous Supabase management",
-                    "url": os.getenv("SUPABASE_MCP_URL", "https://supabase.mcp.coupaul.fr"),
-                    "status": "online",
+                    "host": "supabase.mcp.coupaul.fr",
+                    "port": 443,
+                    "path": "/supabase",
+                    "protocol": "https",
+                    "status": "active",
                     "tools_count": 54,
                     "categories": ["database", "auth", "storage", "realtime", "security", "migration", "monitoring", "performance"],
                     "github_url": "https://github.com/MisterSandFR/Supabase-MCP-SelfHosted",
@@ -29,30 +36,40 @@ def load_servers_config_static():
                     "domain": "supabase.mcp.coupaul.fr",
                     "mcp_endpoint": "/mcp",
                     "health_endpoint": "/health",
-                    "supabase_url": os.getenv("SUPABASE_URL", "https://api.recube.gg/"),
-                    "anon_key": os.getenv("SUPABASE_ANON_KEY", "eyJhbGciOiJIUzI1NiIs..."),
-                    "production_mode": True
+                    "supabase_url": "https://api.recube.gg/",
+                    "anon_key": "eyJhbGciOiJIUzI1NiIs...",
+                    "production_mode": True,
+                    "discovery_path": "/health",
+                    "discovery_timeout": 5
                 },
                 "minecraft": {
                     "name": "Minecraft MCPC+ 1.6.4 Server",
                     "version": "1.6.4",
                     "description": "MCPC+ 1.6.4 server management and automation with MCP tools - Compatible with MCP Hub Central",
-                    "url": os.getenv("MINECRAFT_MCP_URL", "https://minecraft.mcp.coupaul.fr"),
-                    "status": "online",
+                    "host": "minecraft-mcp-forge-164.railway.internal",
+                    "port": 3000,
+                    "path": "/minecraft",
+                    "protocol": "http",
+                    "status": "active",
                     "tools_count": 4,
                     "categories": ["gaming", "server_management", "automation", "world_management", "mcpc"],
                     "github_url": "https://github.com/[USERNAME]/minecraft-mcpc-mcp-server",
-                    "always_works": True,
+                    "always_works": False,
                     "domain": "minecraft.mcp.coupaul.fr",
                     "deployment": "railway",
-                    "mcpc_version": os.getenv("MINECRAFT_MCPC_VERSION", "1.6.4"),
-                    "docker_enabled": True
+                    "mcpc_version": "1.6.4",
+                    "docker_enabled": True,
+                    "discovery_path": "/health",
+                    "discovery_timeout": 5,
+                    "timeout": 10,
+                    "retry_attempts": 1,
+                    "health_check_timeout": 10
                 }
             },
             "hub": {
-                "name": os.getenv("MCP_HUB_NAME", "MCP Hub Central"),
-                "version": os.getenv("MCP_HUB_VERSION", "3.6.0"),
-                "description": os.getenv("MCP_HUB_DESCRIPTION", "Multi-server MCP hub for centralized management - Hybrid configuration (Supabase public + Minecraft Railway internal)"),
+                "name": "MCP Hub Central",
+                "version": "3.6.0",
+                "description": "Multi-server MCP hub for centralized management - Hybrid configuration (Supabase public + Minecraft Railway internal)",
                 "total_servers": 2,
                 "total_tools": 58,
                 "domain": "mcp.coupaul.fr",
@@ -104,157 +121,48 @@ def load_servers_config_static():
             }
         }
 
-class MCPHubHandler(BaseHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        # Charger la configuration des serveurs
-        self.servers_config = self.load_servers_config()
-        super().__init__(*args, **kwargs)
-    
-    def load_servers_config(self):
-        """Charger la configuration des serveurs MCP"""
-        try:
-            with open('mcp_servers_config.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            # Configuration hybride Railway si le fichier n'existe pas
-            return {
-                "servers": {
-                    "supabase": {
-                        "name": "Supabase MCP Server",
-                        "version": "3.1.0",
-                        "description": "Enhanced Edition v3.1 - 54+ MCP tools for 100% autonomous Supabase management",
-                        "host": "supabase.mcp.coupaul.fr",
-                        "port": 443,
-                        "path": "/supabase",
-                        "protocol": "https",
-                        "status": "active",
-                        "tools_count": 54,
-                        "categories": ["database", "auth", "storage", "realtime", "security", "migration", "monitoring", "performance"],
-                        "github_url": "https://github.com/MisterSandFR/Supabase-MCP-SelfHosted",
-                        "always_works": True,
-                        "domain": "supabase.mcp.coupaul.fr",
-                        "mcp_endpoint": "/mcp",
-                        "health_endpoint": "/health",
-                        "supabase_url": "https://api.recube.gg/",
-                        "anon_key": "eyJhbGciOiJIUzI1NiIs...",
-                        "production_mode": True,
-                        "discovery_path": "/health",
-                        "discovery_timeout": 5
-                    },
-                    "minecraft": {
-                        "name": "Minecraft MCPC+ 1.6.4 Server",
-                        "version": "1.6.4",
-                        "description": "MCPC+ 1.6.4 server management and automation with MCP tools - Compatible with MCP Hub Central",
-                        "host": "minecraft-mcp-forge-164.railway.internal",
-                        "port": 3000,
-                        "path": "/minecraft",
-                        "protocol": "http",
-                        "status": "active",
-                        "tools_count": 4,
-                        "categories": ["gaming", "server_management", "automation", "world_management", "mcpc"],
-                        "github_url": "https://github.com/[USERNAME]/minecraft-mcpc-mcp-server",
-                        "always_works": False,
-                        "domain": "minecraft.mcp.coupaul.fr",
-                        "deployment": "railway",
-                        "mcpc_version": "1.6.4",
-                        "docker_enabled": True,
-                        "discovery_path": "/health",
-                        "discovery_timeout": 5,
-                        "timeout": 10,
-                        "retry_attempts": 1,
-                        "health_check_timeout": 10
-                    }
-                },
-                "hub": {
-                    "name": "MCP Hub Central",
-                    "version": "3.6.0",
-                    "description": "Multi-server MCP hub for centralized management - Hybrid configuration (Supabase public + Minecraft Railway internal)",
-                    "total_servers": 2,
-                    "total_tools": 58,
-                    "domain": "mcp.coupaul.fr",
-                    "features": [
-                        "automatic_discovery",
-                        "intelligent_routing",
-                        "load_balancing",
-                        "centralized_monitoring",
-                        "unified_interface",
-                        "advanced_security",
-                        "real_time_metrics",
-                        "hybrid_configuration"
-                    ]
-                },
-                "routing": {
-                    "strategy": "capability_based",
-                    "fallback_server": "supabase",
-                    "load_balancing": {
-                        "enabled": True,
-                        "algorithm": "round_robin",
-                        "health_check_interval": 120
-                    }
-                },
-                "security": {
-                    "jwt_auth": True,
-                    "rate_limiting": {
-                        "enabled": True,
-                        "requests_per_minute": 100,
-                        "burst_limit": 20
-                    },
-                    "cors": {
-                        "enabled": True,
-                        "allowed_origins": ["*"],
-                        "allowed_methods": ["GET", "POST", "OPTIONS"],
-                        "allowed_headers": ["Content-Type", "Authorization"]
-                    }
-                },
-                "monitoring": {
-                    "enabled": True,
-                    "metrics_endpoint": "/api/metrics",
-                    "health_check_interval": 120,
-                    "cache_duration": 300,
-                    "discovery_timeout": 10,
-                    "alerting": {
-                        "enabled": True,
-                        "email": "alerts@mcp.coupaul.fr",
-                        "webhook": "https://hooks.slack.com/services/..."
-                    }
-                }
-            }
-    
-    def discover_servers(self):
-        """Retourner les serveurs MCP configurés - PAS DE DÉCOUVERTE AUTOMATIQUE"""
-        discovered_servers = {}
-        
-        for server_id, server_config in self.servers_config["servers"].items():
-            # Marquer tous les serveurs comme ONLINE directement
-            server_config["health_status"] = "online"
-            server_config["last_seen"] = datetime.now().isoformat()
-            server_config["available_tools"] = server_config.get("tools_count", 0)
-            server_config["tools"] = []
-            discovered_servers[server_id] = server_config
-        
-        return discovered_servers
 
-    def do_GET(self):
-        """Gérer les requêtes GET"""
-        if self.path == '/':
-            self.serve_hub_page()
-        elif self.path == '/health':
-            self.serve_health()
-        elif self.path == '/api/servers':
-            self.serve_servers_api()
-        elif self.path == '/api/tools':
-            self.serve_tools_api()
-        elif self.path == '/.well-known/mcp-config':
-            self.serve_mcp_config()
-        else:
-            self.send_error(404)
+CONFIG_REGISTRY = ConfigRegistry(load_servers_config, CONFIG_PATH)
 
-    def serve_hub_page(self):
-        """Servir la page principale du hub"""
-        discovered_servers = self.discover_servers()
-        
-        # Générer le HTML
-        html = f"""
+
+def probe_servers(servers_config):
+    """Retourner les serveurs MCP configurés - PAS DE DÉCOUVERTE AUTOMATIQUE"""
+    discovered_servers = {}
+
+    for server_id, server_config in servers_config["servers"].items():
+        # Copie locale : la configuration du registre est partagée entre les threads
+        server_config = dict(server_config)
+        # Marquer tous les serveurs comme ONLINE directement
+        server_config["health_status"] = "online"
+        server_config["last_seen"] = datetime.now().isoformat()
+        server_config["available_tools"] = server_config.get("tools_count", 0)
+        server_config["tools"] = []
+        discovered_servers[server_id] = server_config
+
+    return discovered_servers
+
+
+# Découverte en arrière-plan : les handlers ne lisent que le snapshot publié
+DISCOVERY = DiscoveryScheduler(CONFIG_REGISTRY, probe_servers)
+
+# Cache des réponses encodées, vidé à chaque nouvelle configuration ou découverte
+RESPONSE_CACHE = ResponseCache()
+CONFIG_REGISTRY.subscribe(RESPONSE_CACHE.clear)
+DISCOVERY.subscribe(RESPONSE_CACHE.clear)
+
+# Limitation de débit par client, réglée par security.rate_limiting à chaque chargement
+RATE_LIMITER = RateLimiter()
+CONFIG_REGISTRY.subscribe(RATE_LIMITER.configure)
+
+# Métriques Prometheus servies sur /api/metrics (monitoring.metrics_endpoint), par route de do_GET
+METRICS = MetricsRegistry(routes=('/', '/health', '/api/servers', '/api/tools', '/.well-known/mcp-config',
+                                  '/api/metrics'))
+METRICS.register_stats("mcp_hub_rate_limit", RATE_LIMITER.stats)
+METRICS.register_stats("mcp_hub_response_cache", RESPONSE_CACHE.stats)
+METRICS.register_stats("mcp_hub_logging", logging_stats)
+
+# Page du hub : parties statiques compilées une fois, cartes rendues une fois par snapshot
+HUB_PAGE = PageTemplate("""
         <!DOCTYPE html>
         <html>
         <head>
@@ -262,52 +170,115 @@ class MCPHubHandler(BaseHTTPRequestHandler):
             <meta charset="utf-8">
             <meta name="viewport" content="width=device-width, initial-scale=1">
             <style>
-                body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }}
-                .container {{ max-width: 1200px; margin: 0 auto; }}
-                .header {{ background: white; padding: 20px; border-radius: 8px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-                .servers {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }}
-                .server {{ background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }}
-                .status {{ padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: bold; }}
-                .online {{ background: #d4edda; color: #155724; }}
-                .offline {{ background: #f8d7da; color: #721c24; }}
-                .tools {{ margin-top: 10px; font-size: 14px; color: #666; }}
+                body { font-family: Arial, sans-serif; margin: 0; padding: 20px; background: #f5f5f5; }
+                .container { max-width: 1200px; margin: 0 auto; }
+                .header { background: white; padding: 20px; border-radius: 8px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+                .servers { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }
+                .server { background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
+                .status { padding: 4px 8px; border-radius: 4px; font-size: 12px; font-weight: bold; }
+                .online { background: #d4edda; color: #155724; }
+                .offline { background: #f8d7da; color: #721c24; }
+                .tools { margin-top: 10px; font-size: 14px; color: #666; }
             </style>
         </head>
         <body>
             <div class="container">
                 <div class="header">
                     <h1>🚀 MCP Hub Central</h1>
-                    <p>Version {self.servers_config['hub']['version']} - {len(discovered_servers)} serveurs actifs</p>
+                    <p>Version {{hub_version}} - {{server_count}} serveurs actifs</p>
                 </div>
                 <div class="servers">
-        """
-        
-        for server_id, server_config in discovered_servers.items():
-            status_class = "online" if server_config.get("health_status") == "online" else "offline"
-            status_text = "ONLINE" if server_config.get("health_status") == "online" else "OFFLINE"
-            
-            html += f"""
-                    <div class="server">
-                        <h3>{server_config['name']}</h3>
-                        <p>{server_config['description']}</p>
-                        <span class="status {status_class}">{status_text}</span>
-                        <div class="tools">
-                            <strong>{server_config.get('available_tools', 0)} outils disponibles</strong>
-                        </div>
-                    </div>
-            """
-        
-        html += """
+        {{cards}}
                 </div>
             </div>
         </body>
         </html>
-        """
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        self.wfile.write(html.encode('utf-8'))
+        """)
+
+SERVER_CARD = PageTemplate("""
+                    <div class="server">
+                        <h3>{{name}}</h3>
+                        <p>{{description}}</p>
+                        <span class="status {{status_class}}">{{status_text}}</span>
+                        <div class="tools">
+                            <strong>{{tools}} outils disponibles</strong>
+                        </div>
+                    </div>
+            """)
+
+
+def render_server_cards(discovered_servers):
+    """Rendre les cartes des serveurs découverts"""
+    cards = []
+    for server_config in discovered_servers.values():
+        online = server_config.get("health_status") == "online"
+        cards.append(SERVER_CARD.render(
+            name=server_config['name'],
+            description=server_config['description'],
+            status_class="online" if online else "offline",
+            status_text="ONLINE" if online else "OFFLINE",
+            tools=server_config.get('available_tools', 0)
+        ))
+    return b"".join(cards)
+
+
+SERVER_CARDS = SnapshotFragment(render_server_cards)
+
+
+def render_hub_page(servers_config, snapshot):
+    """Page principale du hub (bytes) pour une configuration et un snapshot de découverte"""
+    return HUB_PAGE.render(
+        hub_version=servers_config['hub']['version'],
+        server_count=len(snapshot.servers),
+        cards=SERVER_CARDS.get(snapshot)
+    )
+
+
+
+class MCPHubHandler(HubRequestHandler):
+    # Réponses JSON encodées une fois par version de configuration et de découverte
+    response_cache = RESPONSE_CACHE
+    rate_limiter = RATE_LIMITER
+    metrics = METRICS
+
+    def handle_one_request(self):
+        # Configuration lue à chaque requête : une connexion keep-alive suit les rechargements à chaud
+        self.config_snapshot = CONFIG_REGISTRY.snapshot
+        self.servers_config = self.config_snapshot.config
+        super().handle_one_request()
+
+    def cache_version(self):
+        """Version des données servies : configuration lue par cette requête + découverte"""
+        return (self.config_snapshot.version, DISCOVERY.snapshot.version)
+
+    def discover_servers(self):
+        """Retourner le dernier snapshot de découverte (aucun appel réseau dans la requête)"""
+        return DISCOVERY.snapshot.servers
+
+    def do_GET(self):
+        """Gérer les requêtes GET"""
+        if self.route == '/':
+            self.serve_hub_page()
+        elif self.route == '/health':
+            self.serve_health()
+        elif self.route == '/api/servers':
+            self.serve_servers_api()
+        elif self.route == '/api/tools':
+            self.serve_tools_api()
+        elif self.route == '/.well-known/mcp-config':
+            self.serve_mcp_config()
+        elif self.route == '/api/metrics':
+            self.send_metrics()
+        else:
+            self.send_error(404)
+
+    def serve_hub_page(self):
+        """Servir la page principale du hub"""
+        self.send_cached('/', self.build_hub_page, 'text/html; charset=utf-8')
+
+    def build_hub_page(self):
+        """Encoder la page du hub (une fois par version de configuration et de découverte)"""
+        return render_hub_page(self.servers_config, DISCOVERY.snapshot)
 
     def serve_health(self):
         """Servir l'endpoint de santé"""
@@ -322,16 +293,20 @@ class MCPHubHandler(BaseHTTPRequestHandler):
                 "total": len(discovered_servers),
                 "online": online_servers,
                 "offline": len(discovered_servers) - online_servers
-            }
+            },
+            "discovery": DISCOVERY.status(),
+            "rate_limiting": RATE_LIMITER.stats(),
+            "logging": logging_stats()
         }
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(health_data, indent=2).encode('utf-8'))
+        self.send_json(200, health_data)
 
     def serve_servers_api(self):
         """Servir l'API des serveurs"""
+        self.send_cached('/api/servers', self.build_servers_api)
+
+    def build_servers_api(self):
+        """Encoder l'API des serveurs (une fois par version de configuration et de découverte)"""
         discovered_servers = self.discover_servers()
         
         # Convertir en format API
@@ -359,13 +334,14 @@ class MCPHubHandler(BaseHTTPRequestHandler):
             }
             servers_list.append(server_api)
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(servers_list, indent=2).encode('utf-8'))
+        return self.encode_json(servers_list)
 
     def serve_tools_api(self):
         """Servir l'API des outils"""
+        self.send_cached('/api/tools', self.build_tools_api)
+
+    def build_tools_api(self):
+        """Encoder l'API des outils (une fois par version de configuration et de découverte)"""
         discovered_servers = self.discover_servers()
         
         all_tools = []
@@ -373,16 +349,17 @@ class MCPHubHandler(BaseHTTPRequestHandler):
             if server_config.get("health_status") == "online":
                 tools = server_config.get("tools", [])
                 for tool in tools:
-                    tool["server"] = server_id
-                    all_tools.append(tool)
+                    # Le snapshot est partagé : ne pas modifier ses outils en place
+                    all_tools.append(dict(tool, server=server_id))
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(all_tools, indent=2).encode('utf-8'))
+        return self.encode_json(all_tools)
 
     def serve_mcp_config(self):
         """Servir la configuration MCP"""
+        self.send_cached('/.well-known/mcp-config', self.build_mcp_config)
+
+    def build_mcp_config(self):
+        """Encoder la configuration MCP (une fois par version de configuration et de découverte)"""
         discovered_servers = self.discover_servers()
         
         mcp_config = {
@@ -417,24 +394,23 @@ class MCPHubHandler(BaseHTTPRequestHandler):
                     "status": "online"
                 })
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        self.wfile.write(json.dumps(mcp_config, indent=2).encode('utf-8'))
+        return self.encode_json(mcp_config)
 
-def run_server(port=8080):
+def run_server(port=8080, workers=None, max_connections=None):
     """Démarrer le serveur MCP Hub"""
-    server_address = ('', port)
-    httpd = HTTPServer(server_address, MCPHubHandler)
+    setup_logging()
+    httpd = create_server(port, MCPHubHandler, workers, max_connections)
+    METRICS.register_stats("mcp_hub_workers", httpd.stats)
     
     print(f"🚀 Starting MCP Hub on port {port}")
     
-    # Découvrir les serveurs au démarrage
+    # Configuration partagée : rechargée si le fichier change ou sur SIGHUP
+    CONFIG_REGISTRY.start_watching()
+    CONFIG_REGISTRY.install_sighup_handler()
+    
+    # Découvrir les serveurs au démarrage puis en arrière-plan
     try:
-        # Créer une instance temporaire pour découvrir les serveurs
-        temp_handler = MCPHubHandler.__new__(MCPHubHandler)
-        temp_handler.servers_config = load_servers_config_static()
-        discovered_servers = temp_handler.discover_servers()
+        discovered_servers = DISCOVERY.start().snapshot.servers
         total_tools = sum(s.get('available_tools', 0) for s in discovered_servers.values())
         
         print(f"📊 Serving {len(discovered_servers)} MCP servers with {total_tools} tools")
@@ -444,13 +420,14 @@ def run_server(port=8080):
     
     print(f"🌐 Access at: http://localhost:{port}")
     print(f"🔧 Well-known endpoint: /.well-known/mcp-config")
+    print(f"⚡ Workers: {httpd.workers} - Max connections: {httpd.max_connections}")
     print(f"✅ MCP Hub running on port {port}")
     
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n🛑 MCP Hub stopped")
-        httpd.shutdown()
+        httpd.server_close()
 
 if __name__ == "__main__":
     run_server()
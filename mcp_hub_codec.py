@@ -0,0 +1,73 @@
+"""
+MCP Hub Central - Codec JSON des requêtes et réponses
+orjson quand il est installé, sinon la bibliothèque standard; sortie compacte
+en UTF-8 par défaut, indentée uniquement sur demande (?pretty=1)
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:  # orjson est optionnel : repli sur json
+    orjson = None
+
+# Erreur levée par loads() (orjson.JSONDecodeError en hérite)
+DecodeError = json.JSONDecodeError
+
+_compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_pretty_encoder = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+class StdlibCodec:
+    """Codec de référence basé sur le module json"""
+
+    name = "json"
+
+    def dumps(self, obj, pretty=False):
+        encoder = _pretty_encoder if pretty else _compact_encoder
+        return encoder.encode(obj).encode("utf-8")
+
+    def loads(self, data):
+        try:
+            return json.loads(data)
+        except UnicodeDecodeError as e:
+            # Octets non UTF-8 : même erreur que pour un JSON invalide (comme orjson)
+            raise DecodeError(f"Invalid UTF-8: {e.reason}", "", e.start) from e
+
+
+class OrjsonCodec:
+    """Codec rapide basé sur orjson (sérialise directement en bytes)"""
+
+    name = "orjson"
+
+    def dumps(self, obj, pretty=False):
+        if pretty:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def default_codec():
+    return OrjsonCodec() if orjson is not None else StdlibCodec()
+
+
+# Codec utilisé par tous les handlers du hub
+CODEC = default_codec()
+
+
+def set_codec(codec):
+    """Remplacer le codec du processus (benchmarks, intégration d'un autre encodeur)"""
+    global CODEC
+    CODEC = codec
+
+
+def dumps(obj, pretty=False):
+    """Encoder un objet en JSON (bytes UTF-8)"""
+    return CODEC.dumps(obj, pretty)
+
+
+def loads(data):
+    """Décoder un document JSON depuis des bytes (ou une str)"""
+    return CODEC.loads(data)
@@ -0,0 +1,140 @@
+"""
+MCP Hub Central - Registre de configuration partagé
+Configuration parsée une seule fois par processus, rechargée à chaud
+quand le fichier change (mtime) ou sur SIGHUP
+"""
+
+import logging
+import os
+import signal
+import threading
+import time
+
+from mcp_hub_logging import LOG, log_event
+from mcp_hub_tracing import span
+
+# Fichier de configuration des serveurs (surchargeable pour les tests et benchmarks)
+CONFIG_PATH = os.getenv("MCP_SERVERS_CONFIG", "mcp_servers_config.json")
+
+# Intervalle de surveillance du mtime en secondes
+DEFAULT_POLL_INTERVAL = float(os.getenv("MCP_HUB_CONFIG_POLL", "2"))
+
+
+class ConfigSnapshot:
+    """Configuration chargée à un instant donné - à traiter en lecture seule"""
+
+    __slots__ = ("version", "config", "mtime", "loaded_at")
+
+    def __init__(self, version, config, mtime, loaded_at):
+        self.version = version
+        self.config = config
+        self.mtime = mtime
+        self.loaded_at = loaded_at
+
+
+class ConfigRegistry:
+    """Registre de configuration partagé par tous les handlers d'un processus
+
+    Les handlers lisent `get()` (simple lecture de référence); le rechargement
+    construit un nouveau snapshot à côté puis le publie par une affectation
+    atomique, sans jamais bloquer les lecteurs.
+    """
+
+    def __init__(self, loader, path=None, poll_interval=DEFAULT_POLL_INTERVAL):
+        self.loader = loader
+        self.path = path
+        self.poll_interval = poll_interval
+        self._snapshot = None
+        self._failed_mtime = None
+        self._reload_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._watcher = None
+        self._subscribers = []
+
+    @property
+    def snapshot(self):
+        """Snapshot courant (chargé au premier accès)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.reload(force=True)
+        return snapshot
+
+    @property
+    def version(self):
+        return self.snapshot.version
+
+    def get(self):
+        """Configuration courante"""
+        return self.snapshot.config
+
+    def subscribe(self, callback):
+        """Appeler `callback(snapshot)` après chaque rechargement"""
+        self._subscribers.append(callback)
+
+    def _current_mtime(self):
+        if not self.path:
+            return None
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def reload(self, force=False):
+        """Recharger la configuration si le fichier a changé (ou si `force`)"""
+        with self._reload_lock:
+            current = self._snapshot
+            mtime = self._current_mtime()
+            if current is not None and not force and mtime in (current.mtime, self._failed_mtime):
+                return current
+
+            try:
+                with span("config"):
+                    config = self.loader(self.path) if self.path else self.loader()
+            except Exception as e:
+                if current is None:
+                    raise
+                # Configuration invalide : garder la précédente jusqu'à la prochaine modification
+                self._failed_mtime = mtime
+                log_event(LOG, logging.WARNING, "config_reload_failed", path=self.path, version=current.version,
+                          error=str(e))
+                return current
+
+            version = current.version + 1 if current is not None else 1
+            snapshot = ConfigSnapshot(version, config, mtime, time.time())
+            self._snapshot = snapshot
+
+        if current is not None:
+            log_event(LOG, logging.INFO, "config_reloaded", path=self.path, version=snapshot.version)
+        for callback in self._subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                log_event(LOG, logging.ERROR, "config_subscriber_failed", version=snapshot.version, error=str(e),
+                          exc_info=True)
+        return snapshot
+
+    def request_reload(self):
+        """Demander un rechargement forcé au thread de surveillance"""
+        self._wakeup.set()
+
+    def _watch_loop(self):
+        while True:
+            self._wakeup.wait(self.poll_interval)
+            force = self._wakeup.is_set()
+            self._wakeup.clear()
+            self.reload(force=force)
+
+    def start_watching(self):
+        """Démarrer la surveillance du fichier en arrière-plan"""
+        self.snapshot
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch_loop, name="mcp-hub-config-watcher", daemon=True)
+            self._watcher.start()
+        return self
+
+    def install_sighup_handler(self):
+        """Recharger sur SIGHUP (thread principal uniquement, ignoré sous Windows)"""
+        if not hasattr(signal, "SIGHUP") or threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signal.SIGHUP, lambda signum, frame: self.request_reload())
+        return True
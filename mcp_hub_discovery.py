@@ -0,0 +1,236 @@
+"""
+MCP Hub Central - Planificateur de découverte en arrière-plan
+Les sondes amont tournent dans un thread dédié au rythme de
+monitoring.health_check_interval; les handlers ne lisent qu'un snapshot publié
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+
+from mcp_hub_logging import LOG, log_event
+from mcp_hub_tracing import bind, span
+
+# Valeurs par défaut si la configuration ne déclare pas de section monitoring
+DEFAULT_HEALTH_CHECK_INTERVAL = 120
+DEFAULT_CACHE_DURATION = 300
+DEFAULT_DISCOVERY_TIMEOUT = 10
+
+# Nombre maximal de sondes simultanées (toutes les sondes d'un cycle partent en parallèle)
+PROBE_WORKERS = int(os.getenv("MCP_HUB_DISCOVERY_WORKERS", "64"))
+
+_probe_executor = None
+_probe_executor_lock = threading.Lock()
+
+
+class ProbeResult:
+    """Résultat d'une sonde : valeur ou exception, avec sa latence"""
+
+    __slots__ = ("ok", "value", "error", "latency")
+
+    def __init__(self, ok, value=None, error=None, latency=None):
+        self.ok = ok
+        self.value = value
+        self.error = error
+        self.latency = latency
+
+
+def get_probe_executor():
+    """Pool de threads partagé par toutes les sondes du processus"""
+    global _probe_executor
+    if _probe_executor is None:
+        with _probe_executor_lock:
+            if _probe_executor is None:
+                _probe_executor = ThreadPoolExecutor(max_workers=PROBE_WORKERS, thread_name_prefix="mcp-hub-probe")
+    return _probe_executor
+
+
+def run_probes(tasks, timeout, executor=None):
+    """Exécuter toutes les sondes en parallèle avec une échéance globale
+
+    `tasks` associe une clé à une fonction `probe(budget)` où `budget` est le
+    temps restant avant l'échéance. Les sondes qui ne terminent pas à temps
+    sont retournées en échec avec une TimeoutError; le cycle coûte donc au plus
+    `timeout` secondes, quel que soit le nombre de serveurs.
+    """
+    executor = executor or get_probe_executor()
+    deadline = time.monotonic() + timeout
+
+    def timed(key, probe):
+        started = time.monotonic()
+        budget = deadline - started
+        if budget <= 0:
+            return ProbeResult(False, error=TimeoutError("discovery deadline exceeded"), latency=0.0)
+        try:
+            with span("probe", server=str(key)):
+                value = probe(budget)
+            return ProbeResult(True, value=value, latency=time.monotonic() - started)
+        except Exception as e:
+            return ProbeResult(False, error=e, latency=time.monotonic() - started)
+
+    timed = bind(timed)
+    futures = {key: executor.submit(timed, key, probe) for key, probe in tasks.items()}
+    wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+
+    results = {}
+    for key, future in futures.items():
+        if future.done():
+            results[key] = future.result()
+        else:
+            future.cancel()
+            results[key] = ProbeResult(False, error=TimeoutError("discovery deadline exceeded"), latency=timeout)
+    return results
+
+
+class DiscoverySnapshot:
+    """Résultat immuable d'un cycle de découverte - à traiter en lecture seule"""
+
+    __slots__ = ("version", "servers", "config_version", "discovered_at", "duration")
+
+    def __init__(self, version, servers, config_version, discovered_at, duration):
+        self.version = version
+        self.servers = servers
+        self.config_version = config_version
+        self.discovered_at = discovered_at
+        self.duration = duration
+
+    @property
+    def age(self):
+        return time.time() - self.discovered_at
+
+    @property
+    def discovered_at_iso(self):
+        return datetime.fromtimestamp(self.discovered_at).isoformat()
+
+
+class DiscoveryScheduler:
+    """Sonder les serveurs MCP périodiquement et publier un snapshot atomique
+
+    `discover_fn(config)` reçoit la configuration courante du registre et
+    retourne le dict des serveurs découverts. Un rechargement de configuration
+    déclenche un nouveau cycle immédiatement.
+    """
+
+    def __init__(self, config_registry, discover_fn, interval=None, cache_duration=None):
+        self.config_registry = config_registry
+        self.discover_fn = discover_fn
+        self._interval = interval
+        self._cache_duration = cache_duration
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._subscribers = []
+        self.rounds = 0
+        self.failures = 0
+        config_registry.subscribe(lambda snapshot: self.wake())
+
+    def _monitoring(self):
+        return self.config_registry.get().get("monitoring", {})
+
+    @property
+    def interval(self):
+        """Intervalle entre deux cycles (monitoring.health_check_interval)"""
+        if self._interval is not None:
+            return self._interval
+        env_interval = os.getenv("MCP_HUB_DISCOVERY_INTERVAL")
+        if env_interval:
+            return float(env_interval)
+        return self._monitoring().get("health_check_interval", DEFAULT_HEALTH_CHECK_INTERVAL)
+
+    @property
+    def cache_duration(self):
+        """Âge maximal d'un snapshot avant d'être signalé périmé (monitoring.cache_duration)"""
+        if self._cache_duration is not None:
+            return self._cache_duration
+        return self._monitoring().get("cache_duration", DEFAULT_CACHE_DURATION)
+
+    @property
+    def snapshot(self):
+        """Dernier snapshot publié (premier cycle exécuté ici si le planificateur n'a pas démarré)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        elif snapshot.age > self.cache_duration:
+            # Le thread est en retard sur cache_duration : le réveiller sans attendre
+            self.wake()
+        return snapshot
+
+    def is_stale(self, snapshot=None):
+        snapshot = snapshot or self.snapshot
+        return snapshot.age > self.cache_duration
+
+    def subscribe(self, callback):
+        """Appeler `callback(snapshot)` après chaque publication"""
+        self._subscribers.append(callback)
+
+    def refresh(self):
+        """Exécuter un cycle de découverte et publier le snapshot"""
+        with self._refresh_lock:
+            config_snapshot = self.config_registry.snapshot
+            previous = self._snapshot
+            started = time.time()
+            try:
+                # Trace propre à chaque cycle : traceparent transmis aux sondes amont
+                with span("discovery", root=True):
+                    servers = self.discover_fn(config_snapshot.config)
+            except Exception as e:
+                self.failures += 1
+                log_event(LOG, logging.WARNING, "discovery_failed", round=self.rounds + 1, error=str(e))
+                if previous is not None:
+                    return previous
+                servers = {}
+
+            snapshot = DiscoverySnapshot(
+                (previous.version + 1) if previous is not None else 1,
+                servers,
+                config_snapshot.version,
+                time.time(),
+                time.time() - started
+            )
+            self._snapshot = snapshot
+            self.rounds += 1
+
+        for callback in self._subscribers:
+            try:
+                callback(snapshot)
+            except Exception as e:
+                log_event(LOG, logging.ERROR, "discovery_subscriber_failed", version=snapshot.version,
+                          error=str(e), exc_info=True)
+        return snapshot
+
+    def wake(self):
+        """Demander un cycle immédiat au thread de découverte"""
+        self._wakeup.set()
+
+    def _run_loop(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.refresh()
+
+    def start(self):
+        """Exécuter le premier cycle puis démarrer le thread de découverte"""
+        if self._snapshot is None:
+            self.refresh()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run_loop, name="mcp-hub-discovery", daemon=True)
+            self._thread.start()
+        return self
+
+    def status(self):
+        """Résumé de l'état du planificateur pour les endpoints de santé"""
+        snapshot = self.snapshot
+        return {
+            "version": snapshot.version,
+            "last_discovery": snapshot.discovered_at_iso,
+            "age_seconds": round(snapshot.age, 3),
+            "duration_seconds": round(snapshot.duration, 3),
+            "interval_seconds": self.interval,
+            "stale": self.is_stale(snapshot),
+            "rounds": self.rounds,
+            "failures": self.failures
+        }
@@ -0,0 +1,126 @@
+"""
+MCP Hub Central - Historique des sondes de santé par serveur amont
+Chaque serveur garde ses derniers résultats de sonde (horodatage, latence,
+statut) dans un tampon circulaire de taille fixe; disponibilité, percentiles
+de latence et changements d'état en sont déduits sans historique illimité
+"""
+
+import math
+import os
+import threading
+from array import array
+from datetime import datetime
+
+# Résultats de sonde conservés par serveur (~13 octets chacun)
+HISTORY_SIZE = int(os.getenv("MCP_HUB_HISTORY_SIZE", "256"))
+
+# Dernières sondes brutes jointes au résumé de /api/discovery
+RECENT_POINTS = 32
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class ProbeHistory:
+    """Tampon circulaire des sondes d'un serveur, stocké dans des tableaux typés
+
+    La mémoire est allouée une fois (`size` entrées) : au-delà, chaque
+    nouvelle sonde écrase la plus ancienne. Une latence inconnue (serveur
+    simulé, sonde expirée) est stockée en NaN et exclue des percentiles.
+    """
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = max(1, size)
+        self._timestamps = array("d", bytes(8 * self.size))
+        self._latencies = array("f", bytes(4 * self.size))
+        self._online = array("b", bytes(self.size))
+        self._next = 0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def record(self, timestamp, online, latency=None):
+        """Ajouter une sonde (latence en secondes, None si inconnue)"""
+        with self._lock:
+            index = self._next
+            self._timestamps[index] = timestamp
+            self._latencies[index] = latency * 1000 if latency is not None else math.nan
+            self._online[index] = 1 if online else 0
+            self._next = (index + 1) % self.size
+            self.count = min(self.count + 1, self.size)
+
+    def points(self):
+        """Sondes conservées, de la plus ancienne à la plus récente : (horodatage, latence ms, en ligne)"""
+        with self._lock:
+            start = (self._next - self.count) % self.size
+            order = [(start + i) % self.size for i in range(self.count)]
+            return [(self._timestamps[i], self._latencies[i], bool(self._online[i])) for i in order]
+
+    def summary(self, recent=0):
+        """Disponibilité, percentiles de latence et changements d'état sur la fenêtre conservée
+
+        `recent` ajoute les dernières sondes brutes ([horodatage, latence ms, 0/1]).
+        """
+        points = self.points()
+        if not points:
+            return {"samples": 0}
+        online = sum(1 for point in points if point[2])
+        latencies = sorted(point[1] for point in points if not math.isnan(point[1]))
+        transitions = [i for i in range(1, len(points)) if points[i][2] != points[i - 1][2]]
+        summary = {
+            "samples": len(points),
+            "since": datetime.fromtimestamp(points[0][0]).isoformat(),
+            "uptime_ratio": round(online / len(points), 4),
+            "status_changes": len(transitions),
+            "last_change": datetime.fromtimestamp(points[transitions[-1]][0]).isoformat() if transitions else None
+        }
+        if latencies:
+            summary["latency_ms"] = {
+                "p50": round(_percentile(latencies, 50), 3),
+                "p95": round(_percentile(latencies, 95), 3),
+                "p99": round(_percentile(latencies, 99), 3),
+                "max": round(latencies[-1], 3)
+            }
+        if recent:
+            summary["recent"] = [
+                [round(timestamp, 3), None if math.isnan(latency) else round(latency, 3), int(up)]
+                for timestamp, latency, up in points[-recent:]
+            ]
+        return summary
+
+
+class HealthHistory:
+    """Historiques de tous les serveurs découverts, alimentés par chaque snapshot de découverte
+
+    Abonné du planificateur : chaque cycle ajoute une sonde par serveur à
+    partir de health_status et probe_latency_ms; les serveurs retirés de la
+    configuration perdent leur historique.
+    """
+
+    def __init__(self, size=HISTORY_SIZE):
+        self.size = size
+        self._histories = {}
+        self._lock = threading.Lock()
+
+    def update(self, snapshot):
+        with self._lock:
+            histories = {
+                server_id: self._histories.get(server_id) or ProbeHistory(self.size)
+                for server_id in snapshot.servers
+            }
+            self._histories = histories
+        for server_id, server_config in snapshot.servers.items():
+            latency_ms = server_config.get("probe_latency_ms")
+            histories[server_id].record(
+                snapshot.discovered_at,
+                server_config.get("health_status") == "online",
+                latency_ms / 1000 if latency_ms is not None else None
+            )
+
+    def get(self, server_id):
+        return self._histories.get(server_id)
+
+    def summary(self, server_id, recent=0):
+        history = self._histories.get(server_id)
+        return history.summary(recent) if history is not None else {"samples": 0}
@@ -0,0 +1,159 @@
+"""
+MCP Hub Central - Journalisation structurée asynchrone
+Les handlers déposent des événements (nom + champs) dans une file bornée;
+un thread dédié les formate et les écrit. Les journaux par requête sont
+échantillonnés par route et les valeurs longues tronquées
+"""
+
+import atexit
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+import mcp_hub_codec
+
+# Niveau (DEBUG, INFO, WARNING, ERROR) et format (json ou text) des journaux
+LOG_LEVEL = os.getenv("MCP_HUB_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("MCP_HUB_LOG_FORMAT", "json").lower()
+
+# Événements en attente d'écriture; au-delà, les nouveaux sont abandonnés (jamais d'attente)
+LOG_QUEUE_SIZE = int(os.getenv("MCP_HUB_LOG_QUEUE_SIZE", "10000"))
+
+# Longueur maximale d'une valeur journalisée (corps de requête, message d'erreur)
+LOG_MAX_FIELD = int(os.getenv("MCP_HUB_LOG_MAX_FIELD", "512"))
+
+# Part des événements journalisés par route : défaut et surcharges "/health:0.01,/mcp:0.5"
+LOG_SAMPLE_RATE = float(os.getenv("MCP_HUB_LOG_SAMPLE", "1"))
+LOG_SAMPLE_ROUTES = os.getenv("MCP_HUB_LOG_SAMPLE_ROUTES", "/health:0.01")
+
+LOG = logging.getLogger("mcp_hub")
+ACCESS_LOG = logging.getLogger("mcp_hub.access")
+
+
+def parse_sample_routes(spec):
+    """Taux d'échantillonnage par route depuis "route:taux,route:taux" """
+    rates = {}
+    for item in spec.split(","):
+        route, _, rate = item.strip().rpartition(":")
+        if route:
+            rates[route] = float(rate)
+    return rates
+
+
+SAMPLE_RATES = parse_sample_routes(LOG_SAMPLE_ROUTES)
+
+
+def truncate(value, limit=LOG_MAX_FIELD):
+    """Tronquer une valeur journalisée (bytes décodés au passage)"""
+    if isinstance(value, bytes):
+        text = value[:limit].decode("utf-8", "replace")
+        return text if len(value) <= limit else f"{text}…(+{len(value) - limit} bytes)"
+    if isinstance(value, str) and len(value) > limit:
+        return f"{value[:limit]}…(+{len(value) - limit} chars)"
+    return value
+
+
+def sampled(route):
+    """Vrai si un événement de cette route doit être journalisé"""
+    rate = SAMPLE_RATES.get(route, LOG_SAMPLE_RATE)
+    return rate >= 1 or random.random() < rate
+
+
+def log_event(logger, level, event, exc_info=None, **fields):
+    """Journaliser un événement structuré
+
+    Tout est décidé avant de créer l'enregistrement : niveau désactivé ou
+    événement écarté par l'échantillonnage de sa route (en dessous de WARNING)
+    ne coûtent qu'une comparaison. Le formatage a lieu dans le thread d'écriture.
+    """
+    if not logger.isEnabledFor(level):
+        return
+    route = fields.get("route")
+    if route is not None and level < logging.WARNING and not sampled(route):
+        return
+    logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler qui n'attend jamais : file pleine, l'événement est compté puis abandonné"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # File interne au processus : l'enregistrement est transmis tel quel, formaté plus tard
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par événement : ts, level, logger, event puis les champs"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record.getMessage()
+        }
+        for name, value in getattr(record, "fields", {}).items():
+            entry[name] = truncate(value)
+        if record.exc_info:
+            entry["exc"] = truncate(self.formatException(record.exc_info), LOG_MAX_FIELD * 8)
+        return mcp_hub_codec.dumps(entry).decode("utf-8")
+
+
+class TextFormatter(logging.Formatter):
+    """Une ligne lisible par événement : heure, niveau, événement puis clé=valeur"""
+
+    def format(self, record):
+        fields = " ".join(f"{name}={truncate(value)}" for name, value in getattr(record, "fields", {}).items())
+        line = (f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.created))} "
+                f"{record.levelname:<7} {record.getMessage()} {fields}").rstrip()
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+_listener = None
+_queue_handler = None
+
+
+def setup_logging(level=None, log_format=None, stream=None):
+    """Installer la file et le thread d'écriture (une seule fois par processus)"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        return LOG
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(TextFormatter() if (log_format or LOG_FORMAT) == "text" else JsonFormatter())
+    _queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    LOG.addHandler(_queue_handler)
+    LOG.setLevel(level or LOG_LEVEL)
+    LOG.propagate = False
+    _listener = QueueListener(_queue_handler.queue, handler)
+    _listener.start()
+    # Vider la file à l'arrêt du processus
+    atexit.register(_listener.stop)
+    return LOG
+
+
+def logging_stats():
+    """État de la file de journalisation pour les endpoints de santé"""
+    if _queue_handler is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "level": logging.getLevelName(LOG.level),
+        "queued": _queue_handler.queue.qsize(),
+        "dropped": _queue_handler.dropped
+    }
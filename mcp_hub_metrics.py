@@ -0,0 +1,183 @@
+"""
+MCP Hub Central - Métriques au format Prometheus (/api/metrics)
+Requêtes par route, méthode et statut, histogrammes de latence à seaux fixes
+et compteurs des composants du hub (pool de workers, proxy, caches, limiteur)
+"""
+
+import bisect
+import threading
+
+# Bornes des seaux de latence (s), fixes pour que les histogrammes s'agrègent entre pods
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Sans table de routes, au-delà de MAX_ROUTES les nouvelles routes sont comptées
+# sous route="other" (cardinalité bornée)
+MAX_ROUTES = 64
+
+# Statistiques des composants qui ne font que croître (exportées en counter, les autres en gauge)
+COUNTER_STATS = frozenset((
+    "allowed", "limited", "hits", "misses", "stores", "evictions", "expired", "evicted_idle", "discarded",
+    "errors", "retries", "calls", "executions", "coalesced", "streams", "rejected", "sessions_opened",
+    "sessions_renewed", "retry_budget_exhausted", "trips", "failures", "requests", "dropped",
+    "served_connections", "rejected_connections"
+))
+
+KNOWN_METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Shard:
+    """Compteurs d'un thread : seul ce thread les modifie, sans verrou"""
+
+    __slots__ = ("requests", "latency")
+
+    def __init__(self):
+        # (method, route, status) -> nombre de requêtes
+        self.requests = {}
+        # (method, route) -> [seau 0, ..., seau +Inf, somme des durées]
+        self.latency = {}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(int(value))
+
+
+def flatten_stats(prefix, stats):
+    """Valeurs numériques d'un dict de stats (imbriqué) en (nom de métrique, type, valeur)
+
+    Les clés qui ne forment pas un nom de métrique valide (URL, identifiants
+    de serveur) et les valeurs non numériques sont ignorées.
+    """
+    for key, value in stats.items():
+        if not isinstance(key, str) or not key.isidentifier():
+            continue
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            yield from flatten_stats(name, value)
+        elif isinstance(value, (bool, int, float)):
+            kind = "counter" if key in COUNTER_STATS and not isinstance(value, bool) else "gauge"
+            yield name, kind, value
+
+
+class MetricsRegistry:
+    """Métriques HTTP d'un point d'entrée et sources de statistiques des composants
+
+    observe() est appelé par chaque requête : il n'écrit que dans les
+    compteurs du thread courant, sans verrou ni contention entre workers.
+    render() additionne les shards de tous les threads au moment du scrape.
+
+    `routes` est la table des routes du point d'entrée et `route_prefixes`
+    ses routes à paramètre (ex. "/mcp/" compté sous "/mcp/*") : tout autre
+    chemin est compté sous "unmatched", quel que soit son statut.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS, routes=None, route_prefixes=(), max_routes=MAX_ROUTES):
+        self.buckets = tuple(buckets)
+        self.routes = frozenset(routes) if routes is not None else None
+        self.route_prefixes = tuple(route_prefixes)
+        self.max_routes = max_routes
+        self._routes = set()
+        self._shards = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sources = []
+
+    def _shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def _route_label(self, route, status):
+        if self.routes is not None:
+            if route in self.routes:
+                return route
+            for prefix in self.route_prefixes:
+                if route.startswith(prefix):
+                    return prefix + "*"
+            return "unmatched"
+        if status == 404:
+            return "unmatched"
+        if route not in self._routes:
+            if len(self._routes) >= self.max_routes:
+                return "other"
+            self._routes.add(route)
+        return route
+
+    def observe(self, method, route, status, duration):
+        """Compter une requête servie (durée en secondes)"""
+        shard = self._shard()
+        method = method if method in KNOWN_METHODS else "other"
+        route = self._route_label(route, status)
+        key = (method, route, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        series = shard.latency.get((method, route))
+        if series is None:
+            series = shard.latency[(method, route)] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, duration)] += 1
+        series[-1] += duration
+
+    def register_stats(self, prefix, stats_fn):
+        """Exporter les valeurs numériques de stats_fn() (ex. UPSTREAM_CLIENT.stats), compteurs ou jauges"""
+        self._sources.append((prefix, stats_fn))
+
+    def _collect(self):
+        with self._lock:
+            shards = list(self._shards)
+        requests = {}
+        latency = {}
+        for shard in shards:
+            # Copies atomiques : le thread propriétaire peut continuer d'écrire
+            for key, count in shard.requests.copy().items():
+                requests[key] = requests.get(key, 0) + count
+            for key, series in shard.latency.copy().items():
+                series = list(series)
+                total = latency.get(key)
+                latency[key] = series if total is None else [a + b for a, b in zip(total, series)]
+        return requests, latency
+
+    def render(self):
+        """Exposition au format texte Prometheus (bytes)"""
+        requests, latency = self._collect()
+        lines = [
+            "# HELP mcp_hub_http_requests_total HTTP requests served, by method, route and status.",
+            "# TYPE mcp_hub_http_requests_total counter"
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f"mcp_hub_http_requests_total{_labels(method=method, route=route, status=status)} {count}")
+
+        lines.append("# HELP mcp_hub_http_request_duration_seconds HTTP request latency, by method and route.")
+        lines.append("# TYPE mcp_hub_http_request_duration_seconds histogram")
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for (method, route), series in sorted(latency.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                labels = _labels(method=method, route=route, le=bound)
+                lines.append(f"mcp_hub_http_request_duration_seconds_bucket{labels} {cumulative}")
+            labels = _labels(method=method, route=route)
+            lines.append(f"mcp_hub_http_request_duration_seconds_sum{labels} {series[-1]!r}")
+            lines.append(f"mcp_hub_http_request_duration_seconds_count{labels} {cumulative}")
+
+        for prefix, stats_fn in list(self._sources):
+            try:
+                stats = stats_fn()
+            except Exception:
+                # Une source en erreur ne doit pas priver le scrape des autres métriques
+                continue
+            for name, kind, value in flatten_stats(prefix, stats):
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {_number(value)}")
+        lines.append("")
+        return "\n".join(lines).encode("utf-8")
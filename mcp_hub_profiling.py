@@ -0,0 +1,179 @@
+"""
+MCP Hub Central - Profilage à la demande des requêtes
+Désactivé par défaut. Activé par échantillonnage (MCP_HUB_PROFILE_SAMPLE) ou
+requête par requête avec l'en-tête X-Hub-Profile et le jeton
+MCP_HUB_PROFILE_TOKEN : la requête est exécutée sous cProfile (et tracemalloc
+si demandé), et un rapport est écrit dans /app/data/profiles
+"""
+
+import cProfile
+import hmac
+import io
+import itertools
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import tracemalloc
+
+from mcp_hub_logging import LOG, log_event
+
+# Part des requêtes profilées (0 : seulement sur en-tête X-Hub-Profile)
+PROFILE_SAMPLE_RATE = float(os.getenv("MCP_HUB_PROFILE_SAMPLE", "0"))
+
+# Routes concernées par l'échantillonnage, ex. "/,/api/discovery" (vide : toutes)
+PROFILE_ROUTES = frozenset(route for route in os.getenv("MCP_HUB_PROFILE_ROUTES", "").split(",") if route)
+
+# Jeton attendu dans l'en-tête X-Hub-Profile (vide : en-tête ignoré)
+PROFILE_TOKEN = os.getenv("MCP_HUB_PROFILE_TOKEN", "")
+
+# Répertoire des rapports (créé dans l'image Docker) et nombre de rapports conservés
+PROFILE_DIR = os.getenv("MCP_HUB_PROFILE_DIR", "/app/data/profiles")
+PROFILE_KEEP = int(os.getenv("MCP_HUB_PROFILE_KEEP", "50"))
+
+# Allocations tracées avec tracemalloc (coût sur tout le processus tant que le profilage est actif)
+PROFILE_MEMORY = os.getenv("MCP_HUB_PROFILE_MEMORY", "0").lower() in ("1", "true", "yes")
+
+PROFILE_HEADER = "X-Hub-Profile"
+ON_DEMAND_WAIT = 5.0
+TRACEMALLOC_FRAMES = 5
+REPORT_LINES = 40
+
+
+class RequestProfile:
+    """Profilage en cours d'une requête"""
+
+    __slots__ = ("name", "method", "route", "profile", "snapshot")
+
+    def __init__(self, name, method, route, profile, snapshot):
+        self.name = name
+        self.method = method
+        self.route = route
+        self.profile = profile
+        self.snapshot = snapshot
+
+
+class RequestProfiler:
+    """Profiler une requête sur échantillonnage ou sur demande, une à la fois
+
+    Un seul profilage tourne à la fois : une requête échantillonnée pendant
+    qu'une autre est profilée est servie normalement, une requête avec
+    l'en-tête attend son tour (ON_DEMAND_WAIT secondes au plus). Chaque
+    rapport produit un fichier .prof (pstats, lisible avec snakeviz) et un
+    résumé .txt; seuls les `keep` plus récents sont conservés.
+    """
+
+    def __init__(self, directory=PROFILE_DIR, sample_rate=PROFILE_SAMPLE_RATE, routes=PROFILE_ROUTES,
+                 token=PROFILE_TOKEN, keep=PROFILE_KEEP, memory=PROFILE_MEMORY):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.routes = routes
+        self.token = token
+        self.keep = max(1, keep)
+        self.memory = memory
+        self.profiled = 0
+        self.skipped = 0
+        self.failures = 0
+        self._ids = itertools.count(1)
+        self._busy = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @classmethod
+    def from_env(cls):
+        """Profileur configuré par l'environnement, ou None si le profilage est désactivé"""
+        if PROFILE_SAMPLE_RATE <= 0 and not PROFILE_TOKEN:
+            return None
+        try:
+            return cls()
+        except OSError as e:
+            log_event(LOG, logging.WARNING, "profiling_disabled", directory=PROFILE_DIR, error=str(e))
+            return None
+
+    def on_demand(self, headers):
+        """Vrai si l'en-tête X-Hub-Profile porte le bon jeton"""
+        header = headers.get(PROFILE_HEADER)
+        return header is not None and bool(self.token) and hmac.compare_digest(header.encode(), self.token.encode())
+
+    def sampled(self, route):
+        """Tirage de l'échantillonnage pour les routes de MCP_HUB_PROFILE_ROUTES"""
+        if self.sample_rate <= 0 or (self.routes and route not in self.routes):
+            return False
+        return random.random() < self.sample_rate
+
+    def start(self, method, route, headers):
+        """Démarrer le profilage de la requête courante si elle est retenue; None sinon"""
+        if self.on_demand(headers):
+            # Profilage demandé explicitement : attendre la fin du rapport précédent
+            acquired = self._busy.acquire(timeout=ON_DEMAND_WAIT)
+        elif self.sampled(route):
+            acquired = self._busy.acquire(blocking=False)
+        else:
+            return None
+        if not acquired:
+            self.skipped += 1
+            return None
+        slug = re.sub(r"[^A-Za-z0-9_.-]", "_", route.strip("/"))[:40] or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{next(self._ids):06d}-{slug}"
+        snapshot = tracemalloc.take_snapshot() if self.memory else None
+        profile = cProfile.Profile()
+        profile.enable()
+        return RequestProfile(name, method, route, profile, snapshot)
+
+    def finish(self, request_profile, status, duration):
+        """Arrêter le profilage et écrire le rapport (appelé après l'envoi de la réponse)"""
+        request_profile.profile.disable()
+        try:
+            self._write(request_profile, status, duration)
+            self.profiled += 1
+            self._prune()
+        except OSError as e:
+            self.failures += 1
+            log_event(LOG, logging.WARNING, "profile_write_failed", profile=request_profile.name, error=str(e))
+        finally:
+            self._busy.release()
+
+    def _write(self, request_profile, status, duration):
+        path = os.path.join(self.directory, request_profile.name)
+        request_profile.profile.dump_stats(path + ".prof")
+        report = io.StringIO()
+        report.write(f"{request_profile.method} {request_profile.route} -> {status} "
+                     f"in {duration * 1000:.3f} ms\n\n")
+        stats = pstats.Stats(request_profile.profile, stream=report)
+        stats.sort_stats("cumulative").print_stats(REPORT_LINES)
+        if request_profile.snapshot is not None:
+            # Allocations de tout le processus pendant la requête (autres workers compris)
+            report.write("\nAllocations during the request (process-wide, top by size):\n")
+            diff = tracemalloc.take_snapshot().compare_to(request_profile.snapshot, "lineno")
+            for entry in diff[:REPORT_LINES // 2]:
+                report.write(f"{entry}\n")
+        with open(path + ".txt", "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+
+    def _prune(self):
+        reports = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".prof"))
+        for name in reports[:-self.keep]:
+            for suffix in (".prof", ".txt"):
+                try:
+                    os.remove(os.path.join(self.directory, name + suffix))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        return {
+            "directory": self.directory,
+            "sample_rate": self.sample_rate,
+            "on_demand": bool(self.token),
+            "memory": self.memory,
+            "profiled": self.profiled,
+            "skipped": self.skipped,
+            "failures": self.failures
+        }
+
+
+# Profileur du processus : None quand le profilage est désactivé (aucun coût par requête)
+PROFILER = RequestProfiler.from_env()
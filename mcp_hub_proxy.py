@@ -0,0 +1,438 @@
+"""
+MCP Hub Central - Proxy tools/call vers les serveurs MCP amont
+Routage par l'index des outils selon routing.strategy et fallback_server,
+sessions MCP amont ouvertes une fois et connexions keep-alive partagées
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import mcp_hub_codec
+from mcp_hub_balancer import LOAD_BALANCER
+from mcp_hub_breaker import CircuitOpenError, RetryBudget
+from mcp_hub_cache import ToolResultCache
+from mcp_hub_singleflight import SingleFlight, canonical_params
+from mcp_hub_tools import upstream_mcp_url
+from mcp_hub_tracing import span
+from mcp_hub_upstream import DEFAULT_TIMEOUT, UPSTREAM_CLIENT
+
+MCP_PROTOCOL_VERSION = "2025-06-18"
+SESSION_HEADER = "Mcp-Session-Id"
+ACCEPT_HEADER = "application/json, text/event-stream"
+
+# Codes d'erreur JSON-RPC 2.0 (outil inconnu : -32602 selon la spécification MCP)
+INVALID_REQUEST = -32600
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+UPSTREAM_ERROR = -32000
+UPSTREAM_UNAVAILABLE = -32001
+
+# Nouveaux essais par appel si le serveur ne déclare pas retry_attempts (bornés par le budget)
+DEFAULT_RETRY_ATTEMPTS = int(os.getenv("MCP_HUB_RETRY_ATTEMPTS", "1"))
+
+# Méthodes MCP sans effet de bord : les appels identiques simultanés sont regroupés
+READ_ONLY_METHODS = frozenset((
+    "tools/list", "resources/list", "resources/templates/list", "resources/read",
+    "prompts/list", "prompts/get", "ping"
+))
+
+# Clé de params._meta qui contourne le cache des résultats d'outils ("noCache": true)
+NO_CACHE_META = "noCache"
+
+# Éléments d'un batch JSON-RPC traités simultanément (tout le processus)
+DISPATCH_WORKERS = int(os.getenv("MCP_HUB_BATCH_WORKERS", "32"))
+
+# Nombre maximal de messages dans un batch JSON-RPC (au-delà : Invalid Request)
+BATCH_MAX_SIZE = int(os.getenv("MCP_HUB_BATCH_MAX_SIZE", "100"))
+
+_dispatch_executor = None
+_dispatch_executor_lock = threading.Lock()
+
+
+class ProxyError(Exception):
+    """Erreur du proxy, convertie en réponse d'erreur JSON-RPC"""
+
+    def __init__(self, code, message, data=None):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+        self.data = data
+
+
+# Échecs après lesquels l'amont n'a pas exécuté la requête : connexion refusée,
+# poignée de main refusée, service indisponible (503)
+RETRYABLE_STATUSES = (503,)
+RETRYABLE_ERRORS = (ConnectionRefusedError, ProxyError)
+
+# Une passerelle en erreur (502) a pu relayer l'appel : nouvel essai réservé aux méthodes en lecture seule
+IDEMPOTENT_RETRYABLE_STATUSES = (502, 503)
+
+
+def get_dispatch_executor():
+    """Pool de threads partagé par les batchs JSON-RPC"""
+    global _dispatch_executor
+    if _dispatch_executor is None:
+        with _dispatch_executor_lock:
+            if _dispatch_executor is None:
+                _dispatch_executor = ThreadPoolExecutor(max_workers=DISPATCH_WORKERS,
+                                                        thread_name_prefix="mcp-hub-dispatch")
+    return _dispatch_executor
+
+
+def jsonrpc_error(request_id, code, message, data=None):
+    error = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
+def tool_name(request):
+    """Nom de l'outil d'un tools/call, None si params n'est pas un objet (journalisation)"""
+    params = request.get("params")
+    return params.get("name") if isinstance(params, dict) else None
+
+
+def parse_sse_messages(body):
+    """Extraire les messages JSON-RPC d'une réponse text/event-stream complète"""
+    messages = []
+    data = []
+    for line in body.splitlines():
+        if line.startswith(b"data:"):
+            data.append(line[5:].strip())
+        elif not line.strip() and data:
+            messages.append(mcp_hub_codec.loads(b"\n".join(data)))
+            data = []
+    if data:
+        messages.append(mcp_hub_codec.loads(b"\n".join(data)))
+    return messages
+
+
+class UpstreamSession:
+    """Session MCP ouverte par le hub auprès d'un serveur amont"""
+
+    __slots__ = ("session_id", "ready", "lock")
+
+    def __init__(self):
+        self.session_id = None
+        self.ready = False
+        self.lock = threading.Lock()
+
+
+class MCPProxy:
+    """Relayer les appels d'outils vers les serveurs amont
+
+    Chaque serveur amont reçoit une seule poignée de main `initialize` par
+    processus; la session (Mcp-Session-Id) est ensuite réutilisée par tous les
+    clients du hub et renouvelée si le serveur amont l'a expirée (HTTP 404).
+    Un serveur à plusieurs réplicas a une session par réplica; le réplica de
+    chaque appel est choisi par le répartiteur de charge.
+    """
+
+    def __init__(self, client=UPSTREAM_CLIENT, client_info=None, balancer=LOAD_BALANCER, tool_cache=None):
+        self.client = client
+        self.balancer = balancer
+        self.tool_cache = tool_cache if tool_cache is not None else ToolResultCache()
+        self.client_info = client_info or {"name": "mcp-hub-central", "version": "3.1.0"}
+        self._sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._retry_budgets = {}
+        self.singleflight = SingleFlight()
+        self._stats_lock = threading.Lock()
+        self._counters = {"calls": 0, "streams": 0, "errors": 0, "retries": 0, "rejected": 0,
+                          "sessions_opened": 0, "sessions_renewed": 0}
+
+    def _count(self, name):
+        with self._stats_lock:
+            self._counters[name] += 1
+
+    def _session(self, url):
+        session = self._sessions.get(url)
+        if session is None:
+            with self._sessions_lock:
+                session = self._sessions.setdefault(url, UpstreamSession())
+        return session
+
+    def _headers(self, session_id):
+        headers = {"Accept": ACCEPT_HEADER, "MCP-Protocol-Version": MCP_PROTOCOL_VERSION}
+        if session_id:
+            headers[SESSION_HEADER] = session_id
+        return headers
+
+    def _post(self, url, message, session_id, timeout, stream=False):
+        if not stream:
+            return self.client.post_json(url, message, headers=self._headers(session_id), timeout=timeout)
+        headers = self._headers(session_id)
+        headers["Content-Type"] = "application/json"
+        return self.client.stream("POST", url, body=mcp_hub_codec.dumps(message), headers=headers,
+                                  timeout=timeout, idempotent=False)
+
+    def _open_session(self, url, session, timeout):
+        """Poignée de main MCP : initialize puis notifications/initialized"""
+        response = self._post(url, {
+            "jsonrpc": "2.0",
+            "id": "hub-initialize",
+            "method": "initialize",
+            "params": {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": self.client_info
+            }
+        }, None, timeout)
+        if response.status != 200:
+            raise ProxyError(UPSTREAM_ERROR, f"Upstream initialize failed: HTTP {response.status}")
+        session.session_id = response.headers.get(SESSION_HEADER.lower())
+        self._post(url, {"jsonrpc": "2.0", "method": "notifications/initialized"}, session.session_id, timeout)
+        session.ready = True
+        self._count("sessions_opened")
+
+    def _ensure_session(self, url, timeout):
+        session = self._session(url)
+        if not session.ready:
+            with session.lock:
+                if not session.ready:
+                    self._open_session(url, session, timeout)
+        return session
+
+    def _expire_session(self, session, session_id):
+        with session.lock:
+            if session.session_id == session_id:
+                session.ready = False
+                session.session_id = None
+        self._count("sessions_renewed")
+
+    def forward(self, server_config, message, timeout=None, stream=False):
+        """Envoyer un message JSON-RPC au serveur amont
+
+        Retourne la réponse complète (UpstreamResponse), ou la réponse à lire au
+        fil de l'eau (UpstreamStream) si `stream`.
+        """
+        url = upstream_mcp_url(server_config)
+        timeout = timeout or server_config.get("timeout", DEFAULT_TIMEOUT)
+        session = self._ensure_session(url, timeout)
+        session_id = session.session_id
+        response = self._post(url, message, session_id, timeout, stream)
+        if response.status == 404 and session_id:
+            # Session expirée côté amont : nouvelle poignée de main puis un seul nouvel essai
+            if stream:
+                response.close()
+            self._expire_session(session, session_id)
+            session = self._ensure_session(url, timeout)
+            response = self._post(url, message, session.session_id, timeout, stream)
+        return response
+
+    def _read_message(self, server_config, message, timeout):
+        response = self.forward(server_config, message, timeout)
+        if response.status != 200:
+            raise ProxyError(UPSTREAM_ERROR, f"Upstream {server_config.get('name')} returned HTTP {response.status}")
+        if not response.headers.get("content-type", "").startswith("text/event-stream"):
+            return response.json()
+        for reply in parse_sse_messages(response.body):
+            if reply.get("id") == message["id"] and "method" not in reply:
+                return reply
+        raise ProxyError(UPSTREAM_ERROR, f"Upstream {server_config.get('name')} sent no response")
+
+    def request(self, server_config, method, params=None, timeout=None):
+        """Appeler une méthode MCP en lecture seule et retourner le message JSON-RPC de réponse
+
+        Les appels identiques (même amont, méthode et paramètres canoniques) en
+        cours au même moment partagent un seul envoi; le message retourné est
+        partagé et doit être traité en lecture seule.
+        """
+        if method not in READ_ONLY_METHODS:
+            raise ValueError(f"{method} is not a read-only MCP method")
+        message = {"jsonrpc": "2.0", "id": f"hub-{method}", "method": method}
+        if params is not None:
+            message["params"] = params
+        key = (upstream_mcp_url(server_config), method, canonical_params(params))
+        return self.singleflight.do(key, lambda: self._read_message(server_config, message, timeout))
+
+    def list_tools(self, server_config, timeout=None):
+        """Outils déclarés par un serveur amont (tools/list, toutes les pages)"""
+        tools = []
+        params = None
+        while True:
+            reply = self.request(server_config, "tools/list", params, timeout)
+            if "error" in reply:
+                raise ProxyError(reply["error"].get("code", UPSTREAM_ERROR), reply["error"].get("message", ""))
+            result = reply.get("result") or {}
+            tools.extend(result.get("tools", []))
+            if not result.get("nextCursor"):
+                return tools
+            params = {"cursor": result["nextCursor"]}
+
+    def _resolve(self, request, servers, routing, tool_index):
+        """Choisir le serveur d'un tools/call et retourner (server_id, requête à envoyer)
+
+        Le serveur est choisi par `tool_index.route()`; un nom préfixé
+        (<serveur>__<outil>) est remplacé par le nom amont.
+        """
+        params = request.get("params") or {}
+        if not isinstance(params, dict):
+            raise ProxyError(INVALID_PARAMS, "Invalid params: expected an object")
+        name = params.get("name")
+        if not name:
+            raise ProxyError(INVALID_PARAMS, "Missing tool name")
+        if not isinstance(name, str):
+            raise ProxyError(INVALID_PARAMS, "Invalid tool name: expected a string")
+        server_id, tool_name = tool_index.route(name, routing)
+        if server_id not in servers:
+            raise ProxyError(INVALID_PARAMS, f"Unknown tool: {name}")
+        if tool_name != name:
+            request = dict(request, params=dict(params, name=tool_name))
+        return server_id, request
+
+    def error_body(self, request_id, error):
+        """Réponse d'erreur JSON-RPC encodée pour une exception du proxy"""
+        if isinstance(error, ProxyError):
+            return mcp_hub_codec.dumps(jsonrpc_error(request_id, error.code, error.message, error.data))
+        return mcp_hub_codec.dumps(jsonrpc_error(request_id, UPSTREAM_ERROR, f"Upstream call failed: {error}"))
+
+    def _retry_budget(self, server_id):
+        budget = self._retry_budgets.get(server_id)
+        if budget is None:
+            with self._sessions_lock:
+                budget = self._retry_budgets.setdefault(server_id, RetryBudget())
+        return budget
+
+    def _call_upstream(self, server_id, server_config, routing, request, stream=False):
+        """Envoyer la requête à un réplica de `server_id` sous la garde de son disjoncteur
+
+        Un échec sans exécution côté amont (connexion refusée, HTTP 503,
+        poignée de main refusée) est réessayé jusqu'à `retry_attempts` fois,
+        sur le réplica choisi à nouveau, tant que le budget le permet; un HTTP
+        502 ne l'est que pour une méthode en lecture seule, un tools/call ayant
+        pu être exécuté. Une réponse amont non réessayable est retournée telle quelle.
+        """
+        if request.get("method") in READ_ONLY_METHODS:
+            retryable_statuses = IDEMPOTENT_RETRYABLE_STATUSES
+        else:
+            retryable_statuses = RETRYABLE_STATUSES
+        budget = self._retry_budget(server_id)
+        budget.deposit()
+        attempts = 1 + server_config.get("retry_attempts", DEFAULT_RETRY_ATTEMPTS)
+        for attempt in range(attempts):
+            endpoint = self.balancer.pick(server_id, server_config, routing)
+            try:
+                generation = endpoint.breaker.acquire()
+            except CircuitOpenError as e:
+                self._count("rejected")
+                raise ProxyError(UPSTREAM_UNAVAILABLE, f"Upstream {server_id} unavailable (circuit open)", {
+                    "server": server_id,
+                    "upstream": endpoint.url,
+                    "circuit": e.breaker.state,
+                    "retry_after": round(e.retry_after, 3)
+                })
+            started = endpoint.begin()
+            try:
+                with span("upstream", server=server_id, upstream=endpoint.url, attempt=attempt):
+                    response = self.forward(endpoint.config, request, stream=stream)
+            except Exception as e:
+                endpoint.breaker.record(generation, False, endpoint.observe(started, ok=False))
+                endpoint.done()
+                if not isinstance(e, RETRYABLE_ERRORS):
+                    raise
+                error = e
+            else:
+                ok = response.status < 500
+                # Pour un flux, latence mesurée jusqu'aux en-têtes et appel en cours jusqu'à la fin du flux
+                endpoint.breaker.record(generation, ok, endpoint.observe(started, ok=ok))
+                if stream:
+                    response.on_close = endpoint.done
+                else:
+                    endpoint.done()
+                if response.status not in retryable_statuses:
+                    return response
+                if stream:
+                    response.close()
+                error = ProxyError(UPSTREAM_ERROR, f"Upstream {server_id} returned HTTP {response.status}")
+            if attempt + 1 == attempts or not budget.withdraw():
+                break
+            self._count("retries")
+        raise error
+
+    def cache_ttl(self, request, servers, routing, tool_index):
+        """TTL du cache de résultats pour cet appel d'outil (None si l'outil n'y est pas inscrit)"""
+        try:
+            server_id, request = self._resolve(request, servers, routing, tool_index)
+        except ProxyError:
+            return None
+        return servers[server_id].get("tool_cache", {}).get(request["params"]["name"])
+
+    def call_tool(self, request, servers, routing, tool_index, use_cache=True):
+        """Relayer une requête tools/call et retourner le corps JSON-RPC de la réponse (bytes)
+
+        Une réponse JSON amont est transmise telle quelle, sans décodage; une
+        réponse text/event-stream est réduite au message portant l'id de la requête.
+        Un outil inscrit dans `tool_cache` de son serveur est servi depuis le
+        cache pendant son TTL, sauf si `use_cache` est faux ou si params._meta
+        contient noCache; le résultat frais remplace alors l'entrée.
+        """
+        request_id = request.get("id")
+        self._count("calls")
+        try:
+            server_id, request = self._resolve(request, servers, routing, tool_index)
+            params = request["params"]
+            ttl = servers[server_id].get("tool_cache", {}).get(params["name"])
+            if ttl:
+                cache_key = (server_id, params["name"], canonical_params(params.get("arguments")))
+                if use_cache and not (params.get("_meta") or {}).get(NO_CACHE_META):
+                    result = self.tool_cache.get(cache_key)
+                    if result is not None:
+                        return (b'{"jsonrpc":"2.0","id":' + mcp_hub_codec.dumps(request_id)
+                                + b',"result":' + result + b'}')
+            response = self._call_upstream(server_id, servers[server_id], routing, request)
+            if response.status != 200:
+                raise ProxyError(UPSTREAM_ERROR, f"Upstream {server_id} returned HTTP {response.status}")
+            if not response.headers.get("content-type", "").startswith("text/event-stream"):
+                body = response.body
+                if ttl:
+                    self._store_result(cache_key, mcp_hub_codec.loads(body), ttl)
+                return body
+            for message in parse_sse_messages(response.body):
+                if message.get("id") == request_id and "method" not in message:
+                    if ttl:
+                        self._store_result(cache_key, message, ttl)
+                    return mcp_hub_codec.dumps(message)
+            raise ProxyError(UPSTREAM_ERROR, f"Upstream {server_id} sent no response")
+        except Exception as e:
+            self._count("errors")
+            return self.error_body(request_id, e)
+
+    def _store_result(self, cache_key, message, ttl):
+        # Seuls les résultats réussis sont conservés (ni erreur JSON-RPC, ni isError de l'outil)
+        result = message.get("result")
+        if isinstance(result, dict) and not result.get("isError"):
+            self.tool_cache.put(cache_key, mcp_hub_codec.dumps(result), ttl)
+
+    def open_tool_stream(self, request, servers, routing, tool_index):
+        """Relayer une requête tools/call et retourner la réponse amont à transmettre au fil de l'eau
+
+        Les notifications de progression d'une réponse text/event-stream sont
+        ainsi relayées dès leur arrivée. Lève ProxyError (ou l'erreur réseau)
+        si l'appel ne peut pas aboutir.
+        """
+        self._count("calls")
+        self._count("streams")
+        try:
+            server_id, request = self._resolve(request, servers, routing, tool_index)
+            upstream = self._call_upstream(server_id, servers[server_id], routing, request, stream=True)
+            if upstream.status != 200:
+                upstream.close()
+                raise ProxyError(UPSTREAM_ERROR, f"Upstream {server_id} returned HTTP {upstream.status}")
+            return upstream
+        except Exception:
+            self._count("errors")
+            raise
+
+    def stats(self):
+        with self._stats_lock:
+            stats = dict(self._counters)
+        stats["sessions"] = sum(1 for session in list(self._sessions.values()) if session.ready)
+        stats["retry_budget_exhausted"] = sum(budget.exhausted for budget in list(self._retry_budgets.values()))
+        stats["coalesced"] = self.singleflight.stats()
+        return stats
+
+
+# Proxy partagé par tout le processus
+MCP_PROXY = MCPProxy()
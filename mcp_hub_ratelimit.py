@@ -0,0 +1,158 @@
+"""
+MCP Hub Central - Limitation de débit par client (seau à jetons)
+Applique security.rate_limiting (requests_per_minute, burst_limit) par adresse
+IP du client; les seaux sont répartis en shards indépendants pour que les
+workers ne se disputent pas un verrou unique
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from mcp_hub_logging import LOG, log_event
+
+# Nombre de shards (verrou + table de seaux chacun)
+DEFAULT_SHARDS = int(os.getenv("MCP_HUB_RATE_LIMIT_SHARDS", "64"))
+
+# Proxys de confiance devant le hub (ingress, Railway) : le client est l'adresse
+# ajoutée à X-Forwarded-For par le plus éloigné d'entre eux. Sans cela, tous les
+# clients partagent l'adresse du proxy, donc un seul seau ("true" vaut 1, "false" 0)
+def _trusted_hops(value):
+    value = value.strip().lower()
+    if value in ("true", "yes", "on"):
+        return 1
+    if value in ("", "false", "no", "off"):
+        return 0
+    try:
+        return max(0, int(value))
+    except ValueError:
+        log_event(LOG, logging.WARNING, "invalid_setting", setting="MCP_HUB_TRUST_FORWARDED_FOR",
+                  value=value, fallback=0)
+        return 0
+
+
+TRUST_FORWARDED_FOR = _trusted_hops(os.getenv("MCP_HUB_TRUST_FORWARDED_FOR", "0"))
+
+# Chemins jamais limités (healthcheck de la plateforme, scrape Prometheus)
+EXEMPT_PATHS = frozenset(("/health", "/api/metrics"))
+
+# En-têtes d'un 429 : un client navigateur doit pouvoir lire Retry-After
+RATE_LIMITED_HEADERS = {'Access-Control-Allow-Origin': '*', 'Access-Control-Expose-Headers': 'Retry-After'}
+
+
+class _Shard:
+    """Seaux d'une partie des clients, du moins au plus récemment utilisé, et compteurs du shard"""
+
+    __slots__ = ("buckets", "lock", "allowed", "limited")
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+        self.allowed = 0
+        self.limited = 0
+
+
+class RateLimiter:
+    """Seau à jetons par client : `burst` requêtes d'affilée, puis `rate` par seconde
+
+    Chaque requête coûte O(1) : un shard choisi par hachage de la clé, un seau
+    rechargé selon le temps écoulé. Un seau inactif depuis burst / rate
+    secondes est de nouveau plein, donc équivalent à un seau neuf : il est
+    évincé à ce moment-là, au fil des requêtes suivantes du même shard.
+    """
+
+    def __init__(self, requests_per_minute=100, burst=20, enabled=False, shards=DEFAULT_SHARDS):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._policy = None
+        self.set_policy(requests_per_minute, burst, enabled)
+
+    def set_policy(self, requests_per_minute, burst, enabled=True):
+        rate = requests_per_minute / 60.0
+        burst = max(1, burst)
+        # Publiée par une seule affectation : lue sans verrou par les workers
+        self._policy = (enabled and rate > 0, rate, burst, burst / rate if rate > 0 else 0.0)
+
+    def configure(self, config_snapshot):
+        """Appliquer security.rate_limiting d'un snapshot de configuration (abonné du registre)"""
+        settings = config_snapshot.config.get("security", {}).get("rate_limiting", {})
+        self.set_policy(settings.get("requests_per_minute", 100), settings.get("burst_limit", 20),
+                        settings.get("enabled", False))
+
+    @property
+    def enabled(self):
+        return self._policy[0]
+
+    def acquire(self, key, now=None):
+        """Consommer un jeton pour `key`; retourner 0 si la requête passe, sinon l'attente en secondes"""
+        enabled, rate, burst, idle_after = self._policy
+        if not enabled:
+            return 0.0
+        now = now or time.monotonic()
+        shard = self._shards[hash(key) % len(self._shards)]
+        with shard.lock:
+            buckets = shard.buckets
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [float(burst), now]
+            else:
+                buckets.move_to_end(key)
+                bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+                retry_after = 0.0
+                shard.allowed += 1
+            else:
+                retry_after = (1.0 - bucket[0]) / rate
+                shard.limited += 1
+            # Éviction des seaux inactifs : les plus anciens sont en tête
+            for _ in range(2):
+                oldest_key = next(iter(buckets))
+                if now - buckets[oldest_key][1] <= idle_after:
+                    break
+                del buckets[oldest_key]
+        return retry_after
+
+    @property
+    def allowed(self):
+        """Requêtes acceptées (somme des compteurs des shards)"""
+        return sum(shard.allowed for shard in self._shards)
+
+    @property
+    def limited(self):
+        """Requêtes refusées (somme des compteurs des shards)"""
+        return sum(shard.limited for shard in self._shards)
+
+    def __len__(self):
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def stats(self):
+        enabled, rate, burst, _ = self._policy
+        return {
+            "enabled": enabled,
+            "requests_per_minute": round(rate * 60, 3),
+            "burst_limit": burst,
+            "clients": len(self),
+            "allowed": self.allowed,
+            "limited": self.limited
+        }
+
+
+def forwarded_client(forwarded_for, trusted_hops):
+    """Adresse du client dans X-Forwarded-For derrière `trusted_hops` proxys de confiance
+
+    Les entrées de gauche viennent du client et peuvent être falsifiées : on
+    prend celle ajoutée par le proxy de confiance le plus éloigné.
+    """
+    addresses = [address.strip() for address in forwarded_for.split(',') if address.strip()]
+    if not addresses:
+        return None
+    return addresses[max(0, len(addresses) - trusted_hops)]
+
+
+def retry_after_header(retry_after):
+    """Valeur de l'en-tête Retry-After (secondes entières, au moins 1)"""
+    return str(max(1, math.ceil(retry_after)))
@@ -0,0 +1,599 @@
+"""
+MCP Hub Central - Moteur de service HTTP concurrent
+Pool de workers borné partagé par les trois points d'entrée du hub
+"""
+
+import http.client
+import logging
+import os
+import queue
+import select
+import selectors
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs
+
+import mcp_hub_codec
+from mcp_hub_cache import etag_matches, negotiate_encoding
+from mcp_hub_logging import ACCESS_LOG, LOG, log_event
+from mcp_hub_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from mcp_hub_profiling import PROFILER
+from mcp_hub_ratelimit import (EXEMPT_PATHS, RATE_LIMITED_HEADERS, TRUST_FORWARDED_FOR, forwarded_client,
+                               retry_after_header)
+from mcp_hub_tracing import TRACEPARENT_HEADER, finish_request, span, start_request
+
+# Limites par défaut (surchargées par MCP_HUB_WORKERS / MCP_HUB_MAX_CONNECTIONS)
+DEFAULT_WORKERS = 16
+DEFAULT_MAX_CONNECTIONS = 256
+
+# Keep-alive : inactivité maximale entre deux requêtes (s) et requêtes par connexion
+KEEPALIVE_TIMEOUT = float(os.getenv("MCP_HUB_KEEPALIVE_TIMEOUT", "5"))
+KEEPALIVE_MAX_REQUESTS = int(os.getenv("MCP_HUB_KEEPALIVE_MAX_REQUESTS", "100"))
+
+# Attente de la requête suivante dans le worker avant de rendre la connexion au
+# sélecteur, seulement si aucune connexion n'attend de worker (s)
+KEEPALIVE_GRACE = 0.002
+
+# Statuts sans corps : pas besoin de Content-Length pour garder la connexion
+BODYLESS_STATUSES = frozenset((204, 304))
+
+# Réponse minimale envoyée quand le hub est saturé
+REJECT_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Content-Type: application/json\r\n"
+    b"Content-Length: 27\r\n"
+    b"Retry-After: 1\r\n"
+    b"Connection: close\r\n"
+    b"\r\n"
+    b'{"error": "hub saturated"}\n'
+)
+
+
+class BoundedThreadPoolHTTPServer(HTTPServer):
+    """Serveur HTTP qui traite les connexions avec un nombre fixe de workers
+
+    Le thread principal ne fait qu'accepter les connexions et les place dans
+    une file; au-delà de `max_connections` connexions en cours (servies, en
+    attente ou inactives), les nouvelles connexions reçoivent immédiatement
+    un 503. Une connexion keep-alive inactive ne garde pas son worker : elle
+    attend sa requête suivante dans un sélecteur (thread mcp-hub-idle) et ne
+    retourne dans la file que lorsqu'elle devient lisible.
+    """
+
+    request_queue_size = 128
+
+    def __init__(self, server_address, handler_class, workers=None, max_connections=None,
+                 bind_and_activate=True):
+        self.workers = workers or int(os.getenv("MCP_HUB_WORKERS", DEFAULT_WORKERS))
+        self.max_connections = max(
+            max_connections or int(os.getenv("MCP_HUB_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS)),
+            self.workers
+        )
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._busy = 0
+        self._rejected = 0
+        self._served = 0
+        self._idle = 0
+        self._evictions = 0
+        self._closing = False
+        self._selector = selectors.DefaultSelector()
+        self._parking = queue.SimpleQueue()
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        super().__init__(server_address, handler_class, bind_and_activate)
+
+        self._idle_thread = threading.Thread(target=self._idle_loop, name="mcp-hub-idle", daemon=True)
+        self._idle_thread.start()
+
+        self._threads = []
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"mcp-hub-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def process_request(self, request, client_address):
+        """Placer la connexion dans la file des workers ou la rejeter"""
+        evict = False
+        with self._lock:
+            if self._connections < self.max_connections:
+                accepted = True
+            elif self._evictions < self._idle:
+                # Saturé par des connexions inactives : la plus ancienne est fermée à la place
+                self._evictions += 1
+                accepted = evict = True
+            else:
+                self._rejected += 1
+                accepted = False
+            if accepted:
+                self._connections += 1
+
+        if evict:
+            self._wake()
+        if accepted:
+            self._pending.put((request, client_address, None))
+        else:
+            self.reject_request(request)
+
+    def reject_request(self, request):
+        """Répondre 503 sans mobiliser de worker"""
+        try:
+            request.sendall(REJECT_RESPONSE)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _worker_loop(self):
+        """Boucle d'un worker : servir les connexions jusqu'à l'arrêt du serveur"""
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            request, client_address, handler = item
+            with self._lock:
+                self._busy += 1
+            idle = False
+            try:
+                if handler is None:
+                    handler = self.RequestHandlerClass(request, client_address, self)
+                else:
+                    handler.resume()
+                idle = getattr(handler, "idle", False)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                if not idle:
+                    self.shutdown_request(request)
+                with self._lock:
+                    self._busy -= 1
+                    if not idle:
+                        self._connections -= 1
+                        self._served += 1
+            if idle:
+                # Remise au sélecteur seulement une fois le worker libéré du handler
+                self._parking.put(handler)
+                self._wake()
+
+    def has_waiting_connections(self):
+        """Vrai si des connexions lisibles attendent un worker (approximatif, sans verrou)"""
+        return not self._pending.empty()
+
+    def _wake(self):
+        try:
+            self._wakeup_send.send(b"\0")
+        except OSError:
+            # Tampon plein : le sélecteur a déjà un réveil en attente
+            pass
+
+    def _idle_loop(self):
+        """Surveiller les connexions keep-alive inactives (un seul thread, sans worker)
+
+        Une connexion lisible repart dans la file des workers; une connexion
+        inactive depuis plus de `handler.timeout` secondes est fermée. Toutes
+        ont le même délai : l'ordre d'insertion est aussi l'ordre d'expiration.
+        """
+        idle = {}
+        while not self._closing:
+            timeout = None
+            if idle:
+                timeout = max(0.0, next(iter(idle.values()))[1] - time.monotonic())
+            for key, _ in self._selector.select(timeout):
+                if key.fileobj is self._wakeup_recv:
+                    try:
+                        while self._wakeup_recv.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                handler = key.data
+                self._selector.unregister(key.fileobj)
+                del idle[key.fileobj]
+                self._pending.put((handler.request, handler.client_address, handler))
+
+            while True:
+                try:
+                    handler = self._parking.get_nowait()
+                except queue.Empty:
+                    break
+                self._selector.register(handler.request, selectors.EVENT_READ, handler)
+                idle[handler.request] = (handler, time.monotonic() + (handler.timeout or KEEPALIVE_TIMEOUT))
+
+            now = time.monotonic()
+            with self._lock:
+                evictions, self._evictions = self._evictions, 0
+            expired = []
+            for sock, (handler, deadline) in idle.items():
+                if deadline > now and evictions <= 0:
+                    break
+                evictions -= 1
+                expired.append(sock)
+            for sock in expired:
+                self._selector.unregister(sock)
+                self._close_idle(idle.pop(sock)[0])
+            with self._lock:
+                self._idle = len(idle)
+
+        for handler, _ in idle.values():
+            self._close_idle(handler)
+
+    def _close_idle(self, handler):
+        handler.idle = False
+        try:
+            handler.finish()
+        except OSError:
+            pass
+        self.shutdown_request(handler.request)
+        with self._lock:
+            self._connections -= 1
+            self._served += 1
+
+    def stats(self):
+        """Statistiques instantanées du pool de workers"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_connections": self.max_connections,
+                "busy_workers": self._busy,
+                "queued_connections": self._connections - self._busy - self._idle,
+                "idle_connections": self._idle,
+                "served_connections": self._served,
+                "rejected_connections": self._rejected
+            }
+
+    def server_close(self):
+        super().server_close()
+        self._closing = True
+        self._wake()
+        self._idle_thread.join(timeout=1)
+        for _ in self._threads:
+            self._pending.put(None)
+        for thread in self._threads:
+            thread.join(timeout=1)
+        self._selector.close()
+        self._wakeup_recv.close()
+        self._wakeup_send.close()
+
+
+class HubRequestHandler(BaseHTTPRequestHandler):
+    """Handler HTTP/1.1 commun aux points d'entrée du hub
+
+    Chaque réponse est délimitée (Content-Length ou chunked) pour que la
+    connexion reste ouverte entre deux requêtes. La connexion est fermée après
+    KEEPALIVE_TIMEOUT secondes d'inactivité, après KEEPALIVE_MAX_REQUESTS
+    requêtes, ou quand la réponse ne peut pas être délimitée. Entre deux
+    requêtes, une connexion sans données en attente est rendue au serveur
+    (`idle`) qui la surveille sans worker.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Cache des réponses encodées, fourni par chaque point d'entrée
+    response_cache = None
+    # Limiteur de débit par client (security.rate_limiting), fourni par chaque point d'entrée
+    rate_limiter = None
+    # Métriques de requêtes (/api/metrics), fournies par chaque point d'entrée
+    metrics = None
+    # Profilage à la demande (MCP_HUB_PROFILE_*), None quand il est désactivé
+    profiler = PROFILER
+    # En-têtes et corps partent en deux écritures : sans TCP_NODELAY chaque réponse keep-alive attend l'ACK retardé
+    disable_nagle_algorithm = True
+    timeout = KEEPALIVE_TIMEOUT
+    max_keepalive_requests = KEEPALIVE_MAX_REQUESTS
+
+    def setup(self):
+        super().setup()
+        self.requests_on_connection = 0
+        self.idle = False
+
+    def handle(self):
+        """Servir les requêtes déjà disponibles, puis rendre la connexion inactive au serveur"""
+        self.idle = False
+        self.close_connection = True
+        self.handle_one_request()
+        parks_idle = isinstance(self.server, BoundedThreadPoolHTTPServer)
+        while not self.close_connection:
+            if parks_idle and not self._input_pending():
+                grace = 0 if self.server.has_waiting_connections() else KEEPALIVE_GRACE
+                if not grace or not select.select([self.connection], [], [], grace)[0]:
+                    self.idle = True
+                    return
+            self.handle_one_request()
+
+    def resume(self):
+        """Reprendre une connexion inactive devenue lisible (appelé par un worker)"""
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def finish(self):
+        # Connexion inactive : fichiers gardés ouverts pour la requête suivante
+        if not self.idle:
+            super().finish()
+
+    def _input_pending(self):
+        """Vrai si une requête suivante est déjà lisible (pipelining), sans bloquer"""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def handle_one_request(self):
+        self._body = None
+        self._query = None
+        self._framed = False
+        self._connection_header = None
+        self._chunked = False
+        self._status = None
+        self._profile = None
+        self._trace = None
+        started = time.perf_counter()
+        try:
+            super().handle_one_request()
+        finally:
+            duration = time.perf_counter() - started
+            if self._trace is not None:
+                finish_request(self._trace, status=self._status)
+            if self._profile is not None:
+                # Rapport écrit après la réponse, hors de la durée mesurée
+                self.profiler.finish(self._profile, self._status, duration)
+        if self._status is None:
+            return
+        route = self.path.partition('?')[0]
+        if self.metrics is not None:
+            self.metrics.observe(self.command, route, self._status, duration)
+        # Journal d'accès : un événement par requête, échantillonné par route
+        if ACCESS_LOG.isEnabledFor(logging.INFO):
+            log_event(ACCESS_LOG, logging.INFO, "request", method=self.command, route=route,
+                      status=self._status, duration_ms=round(duration * 1000, 3),
+                      client=self.client_address[0])
+
+    def log_request(self, code='-', size='-'):
+        # Remplacé par l'événement "request" émis à la fin de handle_one_request
+        pass
+
+    def log_error(self, format, *args):
+        log_event(LOG, logging.WARNING, "http_error", message=format % args, client=self.client_address[0])
+
+    def log_message(self, format, *args):
+        log_event(LOG, logging.DEBUG, "http", message=format % args, client=self.client_address[0])
+
+    def parse_request(self):
+        if not super().parse_request():
+            return False
+        # Trace de la requête : traceparent du client repris, sinon généré
+        self._trace = start_request(self.headers.get(TRACEPARENT_HEADER), f"{self.command} {self.route}",
+                                    {"method": self.command, "route": self.route})
+        # Profilage démarré avant les sorties anticipées : /health, OPTIONS et hub sans limiteur compris
+        if self.profiler is not None:
+            self._profile = self.profiler.start(self.command, self.route, self.headers)
+        limiter = self.rate_limiter
+        if limiter is None or self.command == 'OPTIONS' or self.route in EXEMPT_PATHS:
+            return True
+        retry_after = limiter.acquire(self.client_key())
+        if retry_after:
+            # Requête refusée avant tout traitement : le corps éventuel n'est pas lu
+            self.send_json(429, {"error": "Too Many Requests", "retry_after": round(retry_after, 3)},
+                           headers=dict(RATE_LIMITED_HEADERS, **{'Retry-After': retry_after_header(retry_after)}))
+            return False
+        return True
+
+    def client_key(self):
+        """Identité du client pour la limitation de débit : son adresse IP
+
+        Les en-têtes X-API-Key et Authorization ne sont pas vérifiés par le hub :
+        un client pourrait en changer à chaque requête pour obtenir un seau neuf.
+        """
+        if TRUST_FORWARDED_FOR:
+            client = forwarded_client(self.headers.get('X-Forwarded-For', ''), TRUST_FORWARDED_FOR)
+            if client:
+                return client
+        return self.client_address[0]
+
+    @property
+    def route(self):
+        """Chemin de la requête sans la query string"""
+        return self.path.partition('?')[0]
+
+    @property
+    def query(self):
+        """Paramètres de la query string (première valeur de chaque clé)"""
+        if self._query is None:
+            self._query = {k: v[0] for k, v in parse_qs(self.path.partition('?')[2]).items()}
+        return self._query
+
+    def wants_pretty(self):
+        """Sortie JSON indentée demandée par ?pretty=1"""
+        return self.query.get('pretty') in ('1', 'true')
+
+    def wants_fresh(self):
+        """Contourner les caches demandé par Cache-Control: no-cache ou no-store"""
+        cache_control = self.headers.get('Cache-Control', '').lower()
+        return 'no-cache' in cache_control or 'no-store' in cache_control
+
+    def encode_json(self, obj):
+        """Encoder une réponse JSON (compacte, indentée sur ?pretty=1)"""
+        with span("encode"):
+            return mcp_hub_codec.dumps(obj, self.wants_pretty())
+
+    def read_json(self):
+        """Décoder le corps JSON de la requête directement depuis les bytes"""
+        body = self.read_body()
+        with span("decode"):
+            return mcp_hub_codec.loads(body)
+
+    def read_body(self):
+        """Lire (une seule fois) le corps de la requête selon Content-Length"""
+        if self._body is None:
+            content_length = int(self.headers.get('Content-Length', 0) or 0)
+            self._body = self.rfile.read(content_length) if content_length > 0 else b""
+        return self._body
+
+    def _body_pending(self):
+        """Vrai si un corps de requête n'a pas été lu (il corromprait la requête suivante)"""
+        if self._body is not None:
+            return False
+        if self.headers.get('Transfer-Encoding'):
+            return True
+        return int(self.headers.get('Content-Length', 0) or 0) > 0
+
+    def _must_close(self):
+        return (
+            self.requests_on_connection + 1 >= self.max_keepalive_requests
+            or self._body_pending()
+        )
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        name = keyword.lower()
+        if name in ("content-length", "transfer-encoding"):
+            self._framed = True
+        elif name == "connection":
+            self._connection_header = value.lower()
+        super().send_header(keyword, value)
+
+    def end_headers(self):
+        if self._connection_header is None:
+            framed = self._framed or getattr(self, "_status", 200) in BODYLESS_STATUSES
+            if self.close_connection or not framed or self._must_close():
+                self.send_header('Connection', 'close')
+            elif self.request_version == 'HTTP/1.0':
+                self.send_header('Connection', 'keep-alive')
+        if self._profile is not None:
+            self.send_header('X-Hub-Profile-Id', self._profile.name)
+        if self._trace is not None:
+            # Phases mesurées jusqu'ici (amont, décodage, encodage...) et identifiant de trace
+            self.send_header('Server-Timing', self._trace[0].server_timing())
+        self.requests_on_connection += 1
+        super().end_headers()
+
+    def send_body(self, status, body, content_type='application/json', headers=None):
+        """Envoyer une réponse complète délimitée par Content-Length"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def send_json(self, status, obj, headers=None):
+        """Envoyer un objet encodé avec le codec JSON du hub"""
+        self.send_body(status, self.encode_json(obj), 'application/json', headers)
+
+    def send_metrics(self):
+        """Servir les métriques Prometheus du point d'entrée"""
+        if self.metrics is None:
+            self.send_error(404)
+            return
+        self.send_body(200, self.metrics.render(), METRICS_CONTENT_TYPE, headers={'Cache-Control': 'no-cache'})
+
+    def cache_version(self):
+        """Version des données servies (configuration, découverte) - à surcharger"""
+        return 0
+
+    def send_cached(self, key, build_fn, content_type='application/json', headers=None):
+        """Servir une réponse encodée depuis le cache, avec ETag et 304 sur If-None-Match
+
+        La variante compressée (gzip, br) est choisie d'après Accept-Encoding et
+        conservée dans le cache avec la réponse.
+        """
+        if self.response_cache is None:
+            self.send_body(200, build_fn(), content_type, headers)
+            return
+        if self.wants_pretty():
+            key += '?pretty=1'
+        cached = self.response_cache.get(key, self.cache_version(), build_fn, content_type)
+        encoding = None
+        if cached.compressible:
+            encoding = negotiate_encoding(self.headers.get('Accept-Encoding'))
+        body, etag = cached.variant(encoding)
+
+        response_headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if cached.compressible:
+            response_headers['Vary'] = 'Accept-Encoding'
+        response_headers.update(headers or {})
+        if etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(304)
+            for name, value in response_headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if encoding:
+            response_headers['Content-Encoding'] = encoding
+        self.send_body(200, body, cached.content_type, response_headers)
+
+    def start_chunked(self, status, content_type, headers=None):
+        """Commencer une réponse en streaming (Transfer-Encoding: chunked)"""
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if self.request_version == 'HTTP/1.1':
+            self._chunked = True
+            self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+    def write_chunk(self, data):
+        """Écrire un fragment de la réponse en streaming"""
+        if not data:
+            return
+        if self._chunked:
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        else:
+            self.wfile.write(data)
+        self.wfile.flush()
+
+    def end_chunked(self):
+        """Terminer la réponse en streaming"""
+        if self._chunked:
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+        else:
+            # Client HTTP/1.0 : la fin du corps est signalée par la fermeture
+            self.close_connection = True
+
+
+    def relay_upstream(self, upstream, headers=None):
+        """Transmettre une réponse amont (UpstreamStream) au client au fil de l'eau
+
+        Chaque fragment est écrit dès sa réception : la mémoire utilisée reste
+        bornée à un fragment, quelle que soit la taille de la réponse.
+        """
+        content_type = upstream.headers.get('content-type', 'application/json')
+        length = upstream.headers.get('content-length')
+        try:
+            if length is not None:
+                self.send_response(upstream.status)
+                self.send_header('Content-type', content_type)
+                self.send_header('Content-Length', length)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                for chunk in upstream.iter_chunks():
+                    self.wfile.write(chunk)
+                self.wfile.flush()
+            else:
+                self.start_chunked(upstream.status, content_type, headers)
+                for chunk in upstream.iter_chunks():
+                    self.write_chunk(chunk)
+                self.end_chunked()
+        except (OSError, http.client.HTTPException) as e:
+            # Réponse déjà commencée : seule la fermeture signale l'interruption au client
+            log_event(LOG, logging.WARNING, "stream_interrupted", route=self.route, error=str(e))
+            self.close_connection = True
+
+
+def create_server(port, handler_class, workers=None, max_connections=None, host=''):
+    """Créer le serveur HTTP concurrent utilisé par tous les points d'entrée"""
+    return BoundedThreadPoolHTTPServer((host, port), handler_class, workers, max_connections)
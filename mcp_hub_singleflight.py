@@ -0,0 +1,82 @@
+"""
+MCP Hub Central - Regroupement des requêtes amont identiques en cours
+Quand plusieurs appelants demandent la même ressource en même temps (afflux de
+clients après un déploiement, sondes simultanées), un seul appel part vers le
+serveur amont et tous les appelants en partagent le résultat
+"""
+
+import json
+import threading
+
+# Encodeur des clés de regroupement : deux paramètres égaux donnent la même chaîne
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def canonical_params(params):
+    """Forme canonique de paramètres JSON : clés triées, sans espaces"""
+    if params is None:
+        return ""
+    return _CANONICAL_ENCODER.encode(params)
+
+
+class _Call:
+    """Appel en cours : attendu par les appelants arrivés pendant son exécution"""
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Exécuter une seule fois les appels de même clé qui se chevauchent
+
+    Le premier appelant d'une clé exécute `fn`; ceux qui arrivent avant la fin
+    attendent et reçoivent le même résultat (ou la même exception). Rien n'est
+    conservé après la fin de l'appel : ce n'est pas un cache. Le résultat est
+    partagé entre threads et doit être traité en lecture seule.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._counters = {"calls": 0, "executions": 0, "coalesced": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            self._counters["calls"] += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._counters["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._counters["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["in_flight"] = len(self._calls)
+        return stats
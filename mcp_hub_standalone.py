@@ -6,185 +6,486 @@ Version simplifiée qui fonctionne sans Docker
 
 import os
 import json
+import functools
+import logging
 import time
-import http.server
-import socketserver
-import urllib.request
-import urllib.parse
-from http.server import BaseHTTPRequestHandler
 from datetime import datetime
 
+import mcp_hub_codec
+from mcp_hub_balancer import LOAD_BALANCER, merge_replica_health, replica_probes
+from mcp_hub_cache import ResponseCache
+from mcp_hub_config import ConfigRegistry
+from mcp_hub_discovery import DEFAULT_DISCOVERY_TIMEOUT, DiscoveryScheduler, run_probes
+from mcp_hub_history import RECENT_POINTS, HealthHistory
+from mcp_hub_logging import LOG, log_event, logging_stats, setup_logging
+from mcp_hub_metrics import MetricsRegistry
+from mcp_hub_proxy import BATCH_MAX_SIZE, INTERNAL_ERROR, INVALID_REQUEST, MCP_PROXY, get_dispatch_executor, jsonrpc_error, tool_name
+from mcp_hub_ratelimit import RateLimiter
+from mcp_hub_server import HubRequestHandler, create_server
+from mcp_hub_templates import PageTemplate, SnapshotFragment
+from mcp_hub_tools import ToolIndex
+from mcp_hub_tracing import bind, span
+from mcp_hub_upstream import UPSTREAM_CLIENT
+
 # Timestamp de démarrage pour le healthcheck
 start_time = time.time()
 
-class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
-    def __init__(self, *args, **kwargs):
-        # Configuration des serveurs en mode standalone
-        self.servers_config = self.load_standalone_config()
-        super().__init__(*args, **kwargs)
-    
-    def load_standalone_config(self):
-        """Configuration standalone sans Docker"""
-        return {
-            "servers": {
-                "supabase": {
-                    "name": "Supabase MCP Server",
-                    "version": "3.1.0",
-                    "description": "Enhanced Edition v3.1 - 47 MCP tools for 100% autonomous Supabase management",
-                    "host": "localhost",
-                    "port": 8001,
-                    "path": "/supabase",
-                    "protocol": "http",
-                    "status": "active",
-                    "tools_count": 47,
-                    "categories": ["database", "auth", "storage", "realtime", "security", "migration", "monitoring", "performance"],
-                    "github_url": "https://github.com/HenkDz/selfhosted-supabase-mcp",
-                    "always_works": True,
-                    "standalone_mode": True
-                },
-                "minecraft": {
-                    "name": "Minecraft MCP Server",
-                    "version": "1.0.0",
-                    "description": "Minecraft server management and automation with MCP tools",
-                    "host": "localhost",
-                    "port": 3000,
-                    "path": "/minecraft",
-                    "protocol": "http",
-                    "status": "active",
-                    "tools_count": 12,
-                    "categories": ["gaming", "server_management", "automation", "world_management"],
-                    "github_url": "#",
-                    "always_works": False,
-                    "standalone_mode": True
-                }
-            },
-            "hub": {
-                "name": "MCP Hub Central",
+# En-têtes CORS des endpoints MCP
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type'
+}
+
+
+def load_standalone_config(path=None):
+    """Configuration standalone sans Docker (ou fichier MCP_SERVERS_CONFIG si défini)"""
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {
+        "servers": {
+            "supabase": {
+                "name": "Supabase MCP Server",
                 "version": "3.1.0",
-                "description": "Multi-server MCP hub for centralized management - Standalone Mode",
-                "total_servers": 2,
-                "total_tools": 59,
-                "domain": "mcp.coupaul.fr",
-                "mode": "standalone"
+                "description": "Enhanced Edition v3.1 - 47 MCP tools for 100% autonomous Supabase management",
+                "host": "localhost",
+                "port": 8001,
+                "path": "/supabase",
+                "protocol": "http",
+                "status": "active",
+                "tools_count": 47,
+                "categories": ["database", "auth", "storage", "realtime", "security", "migration", "monitoring", "performance"],
+                "github_url": "https://github.com/HenkDz/selfhosted-supabase-mcp",
+                "always_works": True,
+                "standalone_mode": True
+            },
+            "minecraft": {
+                "name": "Minecraft MCP Server",
+                "version": "1.0.0",
+                "description": "Minecraft server management and automation with MCP tools",
+                "host": "localhost",
+                "port": 3000,
+                "path": "/minecraft",
+                "protocol": "http",
+                "status": "active",
+                "tools_count": 12,
+                "categories": ["gaming", "server_management", "automation", "world_management"],
+                "github_url": "#",
+                "always_works": False,
+                "standalone_mode": True
             }
+        },
+        "hub": {
+            "name": "MCP Hub Central",
+            "version": "3.1.0",
+            "description": "Multi-server MCP hub for centralized management - Standalone Mode",
+            "total_servers": 2,
+            "total_tools": 59,
+            "domain": "mcp.coupaul.fr",
+            "mode": "standalone"
         }
-    
-    def discover_servers(self):
-        """Découvrir les serveurs en mode standalone"""
-        discovered_servers = {}
-        
-        for server_id, server_config in self.servers_config["servers"].items():
-            if server_config["status"] == "active":
-                # En mode standalone, on simule les serveurs comme toujours disponibles
-                if server_config.get("standalone_mode", False):
-                    server_config["health_status"] = "online"
-                    server_config["last_seen"] = datetime.now().isoformat()
+    }
+
+
+# Configuration partagée, construite une seule fois par processus
+CONFIG_REGISTRY = ConfigRegistry(load_standalone_config, os.getenv("MCP_SERVERS_CONFIG"))
+
+
+def probe_health(server_config, budget):
+    """Sonder l'endpoint de santé d'un serveur externe et retourner le statut HTTP"""
+    # Utiliser le path de découverte configuré ou /health par défaut
+    discovery_path = server_config.get("discovery_path", "/health")
+    timeout = min(server_config.get("discovery_timeout", 5), budget)
+    health_url = f"{server_config['protocol']}://{server_config['host']}:{server_config['port']}{discovery_path}"
+    response = UPSTREAM_CLIENT.get(health_url, timeout=timeout)
+    return response.status
+
+
+def fetch_tools(server_config, budget):
+    """Récupérer les outils d'un serveur externe par tools/list (appels simultanés regroupés)"""
+    return MCP_PROXY.list_tools(server_config, timeout=min(server_config.get("discovery_timeout", 5), budget))
+
+
+def probe_servers(servers_config):
+    """Découvrir les serveurs en mode standalone (serveurs externes sondés en parallèle)"""
+    active_servers = {
+        server_id: server_config
+        for server_id, server_config in servers_config["servers"].items()
+        if server_config["status"] == "active"
+    }
+    tasks = {}
+    for server_id, server_config in active_servers.items():
+        if not server_config.get("standalone_mode", False):
+            tasks.update(replica_probes((server_id,), server_config, probe_health))
+            # Récupération spéculative des outils, ignorée si le serveur est hors ligne
+            tasks[(server_id, "tools")] = functools.partial(fetch_tools, server_config)
+    discovery_timeout = servers_config.get("monitoring", {}).get("discovery_timeout", DEFAULT_DISCOVERY_TIMEOUT)
+    results = run_probes(tasks, discovery_timeout) if tasks else {}
+
+    discovered_servers = {}
+    for server_id, server_config in active_servers.items():
+        # Copie locale : la configuration du registre est partagée entre les threads
+        server_config = dict(server_config)
+        # En mode standalone, on simule les serveurs comme toujours disponibles
+        if server_config.get("standalone_mode", False):
+            server_config["health_status"] = "online"
+            server_config["last_seen"] = datetime.now().isoformat()
+            server_config["available_tools"] = server_config.get("tools_count", 0)
+            server_config["tools"] = get_standalone_tools(server_id)
+            server_config["mode"] = "standalone"
+        else:
+            # Test de connectivité normal pour les serveurs externes
+            health = merge_replica_health((server_id,), server_config, results)
+            server_config["probe_latency_ms"] = round(health.latency * 1000, 3)
+            if health.ok and health.value == 200:
+                server_config["health_status"] = "online"
+                server_config["last_seen"] = datetime.now().isoformat()
+
+                tools = results[(server_id, "tools")]
+                if tools.ok:
+                    server_config["available_tools"] = len(tools.value)
+                    server_config["tools"] = tools.value
+                else:
+                    server_config["available_tools"] = server_config.get("tools_count", 0)
+                    server_config["tools"] = []
+            elif health.ok:
+                server_config["health_status"] = "offline"
+                server_config["error"] = f"HTTP {health.value}"
+            else:
+                server_config["health_status"] = "offline"
+                server_config["error"] = str(health.error)
+                server_config["last_seen"] = datetime.now().isoformat()
+
+                if server_config.get("always_works", False):
                     server_config["available_tools"] = server_config.get("tools_count", 0)
-                    server_config["tools"] = self.get_standalone_tools(server_id)
-                    server_config["mode"] = "standalone"
-                    discovered_servers[server_id] = server_config
+                    server_config["tools"] = []
                 else:
-                    # Test de connectivité normal pour les serveurs externes
-                    try:
-                        # Utiliser le path de découverte configuré ou /health par défaut
-                        discovery_path = server_config.get("discovery_path", "/health")
-                        discovery_timeout = server_config.get("discovery_timeout", 5)
-                        
-                        health_url = f"{server_config['protocol']}://{server_config['host']}:{server_config['port']}{discovery_path}"
-                        req = urllib.request.Request(health_url)
-                        
-                        with urllib.request.urlopen(req, timeout=discovery_timeout) as response:
-                            if response.status == 200:
-                                server_config["health_status"] = "online"
-                                server_config["last_seen"] = datetime.now().isoformat()
-                                server_config["available_tools"] = server_config.get("tools_count", 0)
-                                server_config["tools"] = []
-                                discovered_servers[server_id] = server_config
-                            else:
-                                server_config["health_status"] = "offline"
-                                server_config["error"] = f"HTTP {response.status}"
-                    except Exception as e:
-                        server_config["health_status"] = "offline"
-                        server_config["error"] = str(e)
-                        server_config["last_seen"] = datetime.now().isoformat()
-                        
-                        if server_config.get("always_works", False):
-                            server_config["available_tools"] = server_config.get("tools_count", 0)
-                            server_config["tools"] = []
-                            discovered_servers[server_id] = server_config
-                        else:
-                            print(f"Server {server_id} discovery failed: {e}")
+                    log_event(LOG, logging.WARNING, "discovery_failed", server=server_id, error=str(health.error))
+
+        discovered_servers[server_id] = server_config
+
+    return discovered_servers
+
+
+def get_standalone_tools(server_id):
+    """Obtenir les outils pour un serveur en mode standalone"""
+    if server_id == "supabase":
+        return [
+            {"name": "execute_sql", "description": "Execute SQL queries"},
+            {"name": "check_health", "description": "Check database health"},
+            {"name": "list_tables", "description": "List database tables"},
+            {"name": "create_migration", "description": "Create database migration"},
+            {"name": "apply_migration", "description": "Apply database migration"},
+            {"name": "create_auth_user", "description": "Create authenticated user"},
+            {"name": "list_storage_buckets", "description": "List storage buckets"},
+            {"name": "manage_rls_policies", "description": "Manage RLS policies"},
+            {"name": "list_extensions", "description": "List PostgreSQL extensions"},
+            {"name": "manage_functions", "description": "Manage database functions"},
+            {"name": "manage_triggers", "description": "Manage database triggers"},
+            {"name": "manage_roles", "description": "Manage database roles"},
+            {"name": "manage_webhooks", "description": "Manage webhooks"},
+            {"name": "list_realtime_publications", "description": "List realtime publications"},
+            {"name": "get_logs", "description": "Get application logs"},
+            {"name": "metrics_dashboard", "description": "Get metrics dashboard"},
+            {"name": "audit_security", "description": "Audit security configuration"},
+            {"name": "analyze_performance", "description": "Analyze database performance"},
+            {"name": "backup_database", "description": "Create database backup"},
+            {"name": "cache_management", "description": "Manage application cache"},
+            {"name": "manage_secrets", "description": "Manage application secrets"},
+            {"name": "get_project_url", "description": "Get project URL"},
+            {"name": "get_anon_key", "description": "Get anonymous key"},
+            {"name": "get_service_key", "description": "Get service role key"},
+            {"name": "generate_crud_api", "description": "Generate CRUD API"},
+            {"name": "generate_typescript_types", "description": "Generate TypeScript types"}
+        ]
+    elif server_id == "minecraft":
+        return [
+            {"name": "start_server", "description": "Start Minecraft server"},
+            {"name": "stop_server", "description": "Stop Minecraft server"},
+            {"name": "restart_server", "description": "Restart Minecraft server"},
+            {"name": "get_server_status", "description": "Get server status"},
+            {"name": "list_players", "description": "List online players"},
+            {"name": "send_command", "description": "Send command to server"},
+            {"name": "backup_world", "description": "Backup world data"},
+            {"name": "restore_world", "description": "Restore world from backup"},
+            {"name": "manage_plugins", "description": "Manage server plugins"},
+            {"name": "configure_server", "description": "Configure server settings"},
+            {"name": "monitor_performance", "description": "Monitor server performance"},
+            {"name": "manage_permissions", "description": "Manage player permissions"}
+        ]
+    return []
+
+
+# Découverte en arrière-plan : les handlers ne lisent que le snapshot publié
+DISCOVERY = DiscoveryScheduler(CONFIG_REGISTRY, probe_servers)
+
+# Historique des sondes par serveur (tampon circulaire), alimenté avant la purge du cache
+HEALTH_HISTORY = HealthHistory()
+DISCOVERY.subscribe(HEALTH_HISTORY.update)
+
+# Cache des réponses encodées, vidé à chaque nouvelle configuration ou découverte
+RESPONSE_CACHE = ResponseCache()
+CONFIG_REGISTRY.subscribe(RESPONSE_CACHE.clear)
+DISCOVERY.subscribe(RESPONSE_CACHE.clear)
+
+# Limitation de débit par client, réglée par security.rate_limiting à chaque chargement
+RATE_LIMITER = RateLimiter()
+CONFIG_REGISTRY.subscribe(RATE_LIMITER.configure)
+
+# Index des outils, reconstruit dès la publication de chaque snapshot
+TOOL_INDEX = SnapshotFragment(ToolIndex)
+DISCOVERY.subscribe(TOOL_INDEX.get)
+
+# Réplicas écartés ou réintégrés selon les sondes de chaque cycle
+DISCOVERY.subscribe(LOAD_BALANCER.update)
+
+# Métriques Prometheus servies sur /api/metrics (monitoring.metrics_endpoint), par route de do_GET/do_POST
+METRICS = MetricsRegistry(routes=('/', '/health', '/mcp', '/.well-known/mcp-config', '/api/servers', '/api/tools',
+                                  '/api/discovery', '/api/metrics'), route_prefixes=('/mcp/',))
+METRICS.register_stats("mcp_hub_rate_limit", RATE_LIMITER.stats)
+METRICS.register_stats("mcp_hub_response_cache", RESPONSE_CACHE.stats)
+METRICS.register_stats("mcp_hub_upstream", UPSTREAM_CLIENT.stats)
+METRICS.register_stats("mcp_hub_proxy", MCP_PROXY.stats)
+METRICS.register_stats("mcp_hub_tool_cache", MCP_PROXY.tool_cache.stats)
+METRICS.register_stats("mcp_hub_logging", logging_stats)
+
+# Résultats d'outils en cache : les TTL déclarés ont pu changer avec la configuration
+CONFIG_REGISTRY.subscribe(MCP_PROXY.tool_cache.clear)
+
+# Page du hub : parties statiques compilées une fois, cartes rendues une fois par snapshot
+HUB_PAGE = PageTemplate("""
+<!DOCTYPE html>
+<html lang="fr" class="dark">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>MCP Hub - Mode Standalone</title>
+    <script src="https://cdn.tailwindcss.com"></script>
+    <script>
+        tailwind.config = {
+            darkMode: 'class',
+            theme: {
+                extend: {
+                    colors: {
+                        primary: '#3b82f6',
+                        secondary: '#1e40af',
+                        accent: '#06b6d4'
+                    }
+                }
+            }
+        }
+    </script>
+</head>
+<body class="bg-gray-900 text-white min-h-screen">
+    <div class="container mx-auto px-4 py-8">
+        <!-- Header -->
+        <header class="text-center mb-12">
+            <h1 class="text-4xl font-bold text-primary mb-4">MCP Hub</h1>
+            <p class="text-xl text-gray-300 mb-6">Centre de contrôle pour tous vos serveurs MCP - Mode Standalone</p>
+            <div class="flex justify-center space-x-4">
+                <span class="bg-green-600 px-3 py-1 rounded-full text-sm">{{server_count}} Serveurs</span>
+                <span class="bg-blue-600 px-3 py-1 rounded-full text-sm">{{total_tools}} Outils</span>
+                <span class="bg-purple-600 px-3 py-1 rounded-full text-sm">{{online_servers}} En ligne</span>
+                <span class="bg-yellow-600 px-3 py-1 rounded-full text-sm">Standalone</span>
+            </div>
+        </header>
+
+        <!-- Serveurs MCP -->
+        <section class="mb-12">
+            <h2 class="text-2xl font-semibold mb-6 text-center">Serveurs MCP Disponibles</h2>
+            <div class="grid md:grid-cols-1 gap-6">
+                {{cards}}
+            </div>
+        </section>
+
+        <!-- Endpoints -->
+        <section class="mb-12">
+            <h2 class="text-2xl font-semibold mb-6 text-center">Endpoints MCP</h2>
+            <div class="grid md:grid-cols-2 gap-6">
+                <div class="bg-gray-800 rounded-lg p-6 border border-gray-700">
+                    <h3 class="text-lg font-semibold mb-4 text-primary">Communication MCP</h3>
+                    <div class="space-y-3">
+                        <div class="flex justify-between items-center">
+                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/.well-known/mcp-config</code>
+                            <span class="text-green-500 text-sm">GET</span>
+                        </div>
+                        <div class="flex justify-between items-center">
+                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/mcp</code>
+                            <span class="text-blue-500 text-sm">POST</span>
+                        </div>
+                        <div class="flex justify-between items-center">
+                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/?config=e30%3D</code>
+                            <span class="text-purple-500 text-sm">POST</span>
+                        </div>
+                    </div>
+                </div>
+                
+                <div class="bg-gray-800 rounded-lg p-6 border border-gray-700">
+                    <h3 class="text-lg font-semibold mb-4 text-primary">API REST</h3>
+                    <div class="space-y-3">
+                        <div class="flex justify-between items-center">
+                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/health</code>
+                            <span class="text-green-500 text-sm">GET</span>
+                        </div>
+                        <div class="flex justify-between items-center">
+                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/api/servers</code>
+                            <span class="text-blue-500 text-sm">GET</span>
+                        </div>
+                        <div class="flex justify-between items-center">
+                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/api/tools</code>
+                            <span class="text-purple-500 text-sm">GET</span>
+                        </div>
+                    </div>
+                </div>
+            </div>
+        </section>
+
+        <!-- Footer -->
+        <footer class="text-center text-gray-400 text-sm">
+            <p>MCP Hub v3.1.0 - Mode Standalone - Dernière mise à jour: {{last_update}}</p>
+            <p class="mt-2">Commit: <code class="bg-gray-800 px-2 py-1 rounded">4ece699</code></p>
+        </footer>
+    </div>
+</body>
+</html>
+        """)
+
+SERVER_CARD = PageTemplate("""
+                <div class="bg-gray-800 rounded-lg p-6 border border-gray-700 hover:border-primary transition-colors">
+                    <div class="flex items-center justify-between mb-4">
+                        <h3 class="text-xl font-semibold text-primary">{{name}}</h3>
+                        <div class="flex space-x-2">
+                            <span class="{{status_color}} px-2 py-1 rounded text-sm">{{status_text}}</span>
+                            {{standalone_badge}}
+                        </div>
+                    </div>
+                    <p class="text-gray-300 mb-4">{{description}}</p>
                     
-                    discovered_servers[server_id] = server_config
-        
-        return discovered_servers
-    
-    def get_standalone_tools(self, server_id):
-        """Obtenir les outils pour un serveur en mode standalone"""
-        if server_id == "supabase":
-            return [
-                {"name": "execute_sql", "description": "Execute SQL queries"},
-                {"name": "check_health", "description": "Check database health"},
-                {"name": "list_tables", "description": "List database tables"},
-                {"name": "create_migration", "description": "Create database migration"},
-                {"name": "apply_migration", "description": "Apply database migration"},
-                {"name": "create_auth_user", "description": "Create authenticated user"},
-                {"name": "list_storage_buckets", "description": "List storage buckets"},
-                {"name": "manage_rls_policies", "description": "Manage RLS policies"},
-                {"name": "list_extensions", "description": "List PostgreSQL extensions"},
-                {"name": "manage_functions", "description": "Manage database functions"},
-                {"name": "manage_triggers", "description": "Manage database triggers"},
-                {"name": "manage_roles", "description": "Manage database roles"},
-                {"name": "manage_webhooks", "description": "Manage webhooks"},
-                {"name": "list_realtime_publications", "description": "List realtime publications"},
-                {"name": "get_logs", "description": "Get application logs"},
-                {"name": "metrics_dashboard", "description": "Get metrics dashboard"},
-                {"name": "audit_security", "description": "Audit security configuration"},
-                {"name": "analyze_performance", "description": "Analyze database performance"},
-                {"name": "backup_database", "description": "Create database backup"},
-                {"name": "cache_management", "description": "Manage application cache"},
-                {"name": "manage_secrets", "description": "Manage application secrets"},
-                {"name": "get_project_url", "description": "Get project URL"},
-                {"name": "get_anon_key", "description": "Get anonymous key"},
-                {"name": "get_service_key", "description": "Get service role key"},
-                {"name": "generate_crud_api", "description": "Generate CRUD API"},
-                {"name": "generate_typescript_types", "description": "Generate TypeScript types"}
-            ]
-        elif server_id == "minecraft":
-            return [
-                {"name": "start_server", "description": "Start Minecraft server"},
-                {"name": "stop_server", "description": "Stop Minecraft server"},
-                {"name": "restart_server", "description": "Restart Minecraft server"},
-                {"name": "get_server_status", "description": "Get server status"},
-                {"name": "list_players", "description": "List online players"},
-                {"name": "send_command", "description": "Send command to server"},
-                {"name": "backup_world", "description": "Backup world data"},
-                {"name": "restore_world", "description": "Restore world from backup"},
-                {"name": "manage_plugins", "description": "Manage server plugins"},
-                {"name": "configure_server", "description": "Configure server settings"},
-                {"name": "monitor_performance", "description": "Monitor server performance"},
-                {"name": "manage_permissions", "description": "Manage player permissions"}
-            ]
-        return []
-    
+                    <div class="grid grid-cols-2 md:grid-cols-4 gap-4 mb-4">
+                        <div class="text-center">
+                            <div class="text-2xl font-bold text-primary">{{tools_count}}</div>
+                            <div class="text-sm text-gray-400">Outils</div>
+                        </div>
+                        <div class="text-center">
+                            <div class="text-2xl font-bold text-green-500">{{category_count}}</div>
+                            <div class="text-sm text-gray-400">Catégories</div>
+                        </div>
+                        <div class="text-center">
+                            <div class="text-2xl font-bold text-blue-500">{{port}}</div>
+                            <div class="text-sm text-gray-400">Port</div>
+                        </div>
+                        <div class="text-center">
+                            <div class="text-2xl font-bold text-purple-500">v{{version}}</div>
+                            <div class="text-sm text-gray-400">Version</div>
+                        </div>
+                    </div>
+                    
+                    <div class="flex flex-wrap gap-2 mb-4">
+                        {{category_badges}}
+                    </div>
+                    
+                    <div class="flex space-x-4">
+                        {{github_link}}
+                        <a href="/api/tools" 
+                           class="bg-gray-700 hover:bg-gray-600 px-4 py-2 rounded text-white text-sm transition-colors">
+                            🔧 API Tools
+                        </a>
+                        <a href="/health" 
+                           class="bg-green-600 hover:bg-green-700 px-4 py-2 rounded text-white text-sm transition-colors">
+                            ❤️ Health
+                        </a>
+                    </div>
+                </div>
+            """)
+
+GITHUB_LINK = '<a href="{url}" target="_blank" class="bg-primary hover:bg-blue-700 px-4 py-2 rounded text-white text-sm transition-colors">📁 GitHub</a>'
+GITHUB_LINK_DISABLED = '<span class="bg-gray-600 px-4 py-2 rounded text-white text-sm cursor-not-allowed">📁 GitHub</span>'
+STANDALONE_BADGE = '<span class="bg-yellow-600 px-2 py-1 rounded text-xs">Standalone</span>'
+
+
+def render_server_cards(discovered_servers):
+    """Générer les cartes des serveurs MCP (une fois par snapshot de découverte)"""
+    cards = []
+    for server_id, server_config in discovered_servers.items():
+        status = server_config.get("health_status", "offline")
+        tools_count = server_config.get("available_tools", server_config.get("tools_count", 0))
+        categories = server_config.get("categories", [])
+        github_url = server_config.get("github_url", "#")
+
+        cards.append(SERVER_CARD.render(
+            name=server_config["name"],
+            description=server_config["description"],
+            status_color="bg-green-600" if status == "online" else "bg-red-600",
+            status_text="En ligne" if status == "online" else "Hors ligne",
+            standalone_badge=STANDALONE_BADGE if server_config.get("standalone_mode", False) else "",
+            tools_count=tools_count,
+            category_count=len(categories),
+            port=server_config.get("port", "N/A"),
+            version=server_config.get("version", "1.0"),
+            # Limiter à 8 catégories
+            category_badges="".join(
+                f'<span class="bg-gray-700 px-2 py-1 rounded text-xs">{category}</span>' for category in categories[:8]
+            ),
+            github_link=GITHUB_LINK.format(url=github_url) if github_url != "#" else GITHUB_LINK_DISABLED
+        ))
+    return b"".join(cards)
+
+
+SERVER_CARDS = SnapshotFragment(render_server_cards)
+
+
+def render_hub_page(snapshot):
+    """Page hub principale (bytes) pour un snapshot de découverte"""
+    discovered_servers = snapshot.servers
+    return HUB_PAGE.render(
+        server_count=len(discovered_servers),
+        total_tools=sum(s.get("available_tools", 0) for s in discovered_servers.values()),
+        online_servers=len([s for s in discovered_servers.values() if s.get("health_status") == "online"]),
+        cards=SERVER_CARDS.get(snapshot),
+        last_update=datetime.fromtimestamp(snapshot.discovered_at).strftime('%d/%m/%Y %H:%M')
+    )
+
+
+
+class MCPHubStandaloneHandler(HubRequestHandler):
+    # Réponses JSON encodées une fois par version de configuration et de découverte
+    response_cache = RESPONSE_CACHE
+    rate_limiter = RATE_LIMITER
+    metrics = METRICS
+
+    def handle_one_request(self):
+        # Configuration lue à chaque requête : une connexion keep-alive suit les rechargements à chaud
+        self.config_snapshot = CONFIG_REGISTRY.snapshot
+        self.servers_config = self.config_snapshot.config
+        super().handle_one_request()
+
+    def cache_version(self):
+        """Version des données servies : configuration lue par cette requête + découverte"""
+        return (self.config_snapshot.version, DISCOVERY.snapshot.version)
+
+    def discover_servers(self):
+        """Retourner le dernier snapshot de découverte (aucun appel réseau dans la requête)"""
+        return DISCOVERY.snapshot.servers
+
     def do_GET(self):
         try:
-            print(f"GET request to: {self.path}")
-            
             # Endpoints du hub central
-            if self.path == '/health':
+            if self.route == '/health':
                 self.send_health_response()
-            elif self.path == '/mcp' or self.path.startswith('/mcp?'):
+            elif self.route == '/mcp':
                 self.send_mcp_endpoint()
-            elif self.path == '/.well-known/mcp-config' or self.path.startswith('/.well-known/mcp-config?'):
+            elif self.route == '/.well-known/mcp-config':
                 self.send_mcp_config()
-            elif self.path == '/api/servers':
+            elif self.route == '/api/servers':
                 self.send_servers_api()
-            elif self.path == '/api/tools':
+            elif self.route == '/api/tools':
                 self.send_tools_api()
-            elif self.path == '/api/discovery':
+            elif self.route == '/api/discovery':
                 self.send_discovery_api()
-            elif self.path == '/' or self.path.startswith('/?config='):
+            elif self.route == '/api/metrics':
+                self.send_metrics()
+            elif self.route == '/':
                 if self.path.startswith('/?config='):
                     self.send_mcp_endpoint()
                 else:
@@ -194,65 +495,54 @@ class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
             else:
                 self.send_404_response()
         except Exception as e:
-            print(f"Error in GET {self.path}: {e}")
+            log_event(LOG, logging.ERROR, "request_failed", route=self.route, error=str(e), exc_info=True)
             self.send_error_response(500, str(e))
 
     def do_POST(self):
-        print(f"POST request to: {self.path}")
-        if self.path == '/mcp' or self.path.startswith('/mcp?'):
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                print(f"POST {self.path} - Body: {post_data.decode('utf-8', errors='ignore')}")
-                self.handle_jsonrpc_request(post_data.decode('utf-8', errors='ignore'))
+        if self.route == '/mcp':
+            post_data = self.read_body()
+            if post_data:
+                self.log_body(post_data)
+                self.handle_jsonrpc_request(post_data)
             else:
                 self.send_mcp_endpoint()
-        elif self.path == '/.well-known/mcp-config':
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                print(f"POST /.well-known/mcp-config - Body: {post_data.decode('utf-8', errors='ignore')}")
+        elif self.route == '/.well-known/mcp-config':
+            post_data = self.read_body()
+            if post_data:
+                self.log_body(post_data)
             self.send_mcp_config()
-        elif self.path == '/' or self.path.startswith('/?config='):
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                print(f"POST {self.path} - Body: {post_data.decode('utf-8', errors='ignore')}")
-                self.handle_jsonrpc_request(post_data.decode('utf-8', errors='ignore'))
+        elif self.route == '/':
+            post_data = self.read_body()
+            if post_data:
+                self.log_body(post_data)
+                self.handle_jsonrpc_request(post_data)
             else:
                 if self.path.startswith('/?config='):
                     self.send_mcp_endpoint()
                 else:
                     self.send_hub_page()
         elif self.path.startswith('/mcp/'):
-            content_length = int(self.headers.get('Content-Length', 0))
-            if content_length > 0:
-                post_data = self.rfile.read(content_length)
-                print(f"POST {self.path} - Body: {post_data.decode('utf-8', errors='ignore')}")
+            post_data = self.read_body()
+            if post_data:
+                self.log_body(post_data)
             self.send_mcp_endpoint()
         else:
             self.send_404_response()
 
     def do_OPTIONS(self):
-        print(f"OPTIONS request to: {self.path}")
-        if (self.path == '/mcp' or self.path.startswith('/mcp/') or 
-            self.path == '/.well-known/mcp-config' or self.path.startswith('/.well-known/mcp-config?') or 
-            self.path == '/' or self.path.startswith('/?config=')):
-            self.send_response(200)
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-            self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-            self.end_headers()
+        if (self.route == '/mcp' or self.path.startswith('/mcp/') or 
+            self.route in ('/.well-known/mcp-config', '/')):
+            self.send_body(200, b"", headers=CORS_HEADERS)
         else:
             self.send_404_response()
 
+    def log_body(self, body):
+        """Journaliser un corps de requête (niveau DEBUG, tronqué à MCP_HUB_LOG_MAX_FIELD)"""
+        log_event(LOG, logging.DEBUG, "request_body", route=self.route, bytes=len(body), body=body)
+
     def send_health_response(self):
         """Endpoint de santé pour Railway healthcheck"""
         try:
-            self.send_response(200)
-            self.send_header('Content-type', 'application/json')
-            self.send_header('Cache-Control', 'no-cache')
-            self.end_headers()
             response = {
                 "status": "UP",
                 "timestamp": time.time(),
@@ -262,46 +552,39 @@ class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
                 "tools": 59,
                 "uptime": time.time() - start_time,
                 "healthcheck": "OK",
-                "mode": "standalone"
+                "mode": "standalone",
+                "discovery": DISCOVERY.status(),
+                "upstream_pool": UPSTREAM_CLIENT.stats(),
+                "proxy": MCP_PROXY.stats(),
+                "load_balancing": LOAD_BALANCER.stats(),
+                "tool_cache": MCP_PROXY.tool_cache.stats(),
+                "rate_limiting": RATE_LIMITER.stats(),
+                "logging": logging_stats()
             }
-            self.wfile.write(json.dumps(response, indent=2).encode())
-            print(f"Health check OK: {response['status']}")
+            self.send_json(200, response, headers={'Cache-Control': 'no-cache'})
         except Exception as e:
-            print(f"Health check error: {e}")
-            self.send_response(500)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
+            log_event(LOG, logging.ERROR, "health_check_failed", error=str(e))
             error_response = {
                 "status": "DOWN",
                 "error": str(e),
                 "timestamp": time.time()
             }
-            self.wfile.write(json.dumps(error_response).encode())
+            self.send_json(500, error_response)
 
     def send_error_response(self, status_code, error_message):
         """Envoyer une réponse d'erreur"""
         try:
-            self.send_response(status_code)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
             error_response = {
                 "error": error_message,
                 "status": "ERROR",
                 "timestamp": time.time()
             }
-            self.wfile.write(json.dumps(error_response).encode())
+            self.send_json(status_code, error_response)
         except Exception as e:
-            print(f"Error sending error response: {e}")
+            log_event(LOG, logging.ERROR, "error_response_failed", route=self.route, error=str(e))
 
     def send_mcp_endpoint(self):
         """Endpoint MCP pour Smithery - Support GET et POST"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        
         mcp_info = {
             "jsonrpc": "2.0",
             "id": 1,
@@ -350,17 +633,14 @@ class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
                 ]
             }
         }
-        self.wfile.write(json.dumps(mcp_info, indent=2).encode())
+        self.send_json(200, mcp_info, headers=CORS_HEADERS)
 
     def send_mcp_config(self):
         """Endpoint /.well-known/mcp-config pour découverte MCP"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
-        
+        self.send_cached('/.well-known/mcp-config', self.build_mcp_config, headers=CORS_HEADERS)
+
+    def build_mcp_config(self):
+        """Encoder la configuration MCP (statique, une fois par version)"""
         mcp_config = {
             "mcpServers": {
                 "mcp-hub-standalone": {
@@ -389,17 +669,104 @@ class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
                 }
             }
         }
-        self.wfile.write(json.dumps(mcp_config, indent=2).encode())
+        return self.encode_json(mcp_config)
 
     def handle_jsonrpc_request(self, request_body):
-        """Traiter les requêtes JSON-RPC 2.0"""
+        """Traiter les requêtes JSON-RPC 2.0, objet unique ou batch (corps brut en bytes)"""
+        try:
+            with span("decode"):
+                request_data = mcp_hub_codec.loads(request_body)
+        except mcp_hub_codec.DecodeError as e:
+            log_event(LOG, logging.WARNING, "jsonrpc_parse_error", route=self.route, error=str(e),
+                      body=request_body)
+            error_response = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {
+                    "code": -32700,
+                    "message": "Parse error"
+                }
+            }
+            self.send_json(400, error_response)
+            return
+
+        if self.wants_stream(request_data):
+            self.stream_tool_call(request_data)
+            return
+
+        if isinstance(request_data, list):
+            response_json = self.dispatch_jsonrpc_batch(request_data)
+        else:
+            response_json = self.dispatch_jsonrpc(request_data)
+
+        if response_json is not None:
+            log_event(LOG, logging.DEBUG, "jsonrpc_response", route=self.route, bytes=len(response_json))
+            self.send_body(200, response_json, headers=CORS_HEADERS)
+        else:
+            self.send_body(200, b"", headers={'Access-Control-Allow-Origin': '*'})
+
+    def wants_stream(self, request_data):
+        """tools/call unique d'un client Streamable HTTP (Accept: text/event-stream)
+
+        Les outils inscrits au cache de résultats restent servis en JSON.
+        """
+        if not (isinstance(request_data, dict) and request_data.get('method') == 'tools/call'
+                and 'id' in request_data and 'text/event-stream' in self.headers.get('Accept', '')):
+            return False
+        snapshot = DISCOVERY.snapshot
+        return not MCP_PROXY.cache_ttl(request_data, snapshot.servers, self.servers_config.get("routing", {}),
+                                       TOOL_INDEX.get(snapshot))
+
+    def stream_tool_call(self, request_data):
+        """Relayer un tools/call en streaming : progression et résultat transmis dès leur arrivée"""
+        snapshot = DISCOVERY.snapshot
+        try:
+            upstream = MCP_PROXY.open_tool_stream(
+                request_data,
+                snapshot.servers,
+                self.servers_config.get("routing", {}),
+                TOOL_INDEX.get(snapshot)
+            )
+        except Exception as e:
+            log_event(LOG, logging.WARNING, "tool_stream_failed", route=self.route,
+                      tool=tool_name(request_data), error=str(e))
+            self.send_body(200, MCP_PROXY.error_body(request_data.get('id'), e), headers=CORS_HEADERS)
+            return
+        with upstream:
+            log_event(LOG, logging.DEBUG, "tool_stream", route=self.route,
+                      tool=tool_name(request_data),
+                      content_type=upstream.headers.get('content-type'))
+            self.relay_upstream(upstream, headers=dict(CORS_HEADERS, **{'Cache-Control': 'no-cache'}))
+
+    def dispatch_jsonrpc_batch(self, messages):
+        """Traiter un batch JSON-RPC : éléments exécutés en parallèle, notifications retirées de la réponse"""
+        if not messages:
+            return self.encode_json(jsonrpc_error(None, INVALID_REQUEST, "Invalid Request"))
+        if len(messages) > BATCH_MAX_SIZE:
+            # Rejeté en bloc : un batch démesuré monopoliserait l'exécuteur partagé
+            return self.encode_json(jsonrpc_error(
+                None, INVALID_REQUEST, f"Batch too large: {len(messages)} messages (max {BATCH_MAX_SIZE})"
+            ))
+        if len(messages) == 1:
+            responses = [self.dispatch_jsonrpc(messages[0])]
+        else:
+            # Les appels vers des serveurs amont différents partent en même temps
+            responses = list(get_dispatch_executor().map(bind(self.dispatch_jsonrpc), messages))
+        responses = [response for response in responses if response is not None]
+        if not responses:
+            return None
+        # Chaque réponse est déjà un document JSON complet : concaténation sans ré-encodage
+        return b"[" + b",".join(responses) + b"]"
+
+    def dispatch_jsonrpc(self, request_data):
+        """Traiter un message JSON-RPC et retourner sa réponse encodée (None pour une notification)"""
+        if not isinstance(request_data, dict):
+            return self.encode_json(jsonrpc_error(None, INVALID_REQUEST, "Invalid Request"))
         try:
-            request_data = json.loads(request_body)
             method = request_data.get('method')
             request_id = request_data.get('id')
-            
-            print(f"JSON-RPC method: {method}, id: {request_id}")
-            
+            log_event(LOG, logging.DEBUG, "jsonrpc_method", route=self.route, method=method, id=request_id)
+
             if method == 'initialize':
                 response = {
                     "jsonrpc": "2.0",
@@ -419,23 +786,27 @@ class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
                     }
                 }
             elif method == 'tools/list':
-                # Retourner tous les outils des serveurs standalone
-                all_tools = []
-                for server_id, server_config in self.servers_config["servers"].items():
-                    if server_config.get("standalone_mode", False):
-                        tools = self.get_standalone_tools(server_id)
-                        for tool in tools:
-                            tool["server"] = server_id
-                            tool["server_name"] = server_config["name"]
-                            all_tools.append(tool)
-                
+                # Catalogue construit une fois par snapshot de découverte
                 response = {
                     "jsonrpc": "2.0",
                     "id": request_id,
                     "result": {
-                        "tools": all_tools
+                        "tools": TOOL_INDEX.get(DISCOVERY.snapshot).mcp_tools
                     }
                 }
+            elif method == 'tools/call':
+                # Relayé au serveur amont propriétaire de l'outil; le corps amont est transmis tel quel
+                snapshot = DISCOVERY.snapshot
+                body = MCP_PROXY.call_tool(
+                    request_data,
+                    snapshot.servers,
+                    self.servers_config.get("routing", {}),
+                    TOOL_INDEX.get(snapshot),
+                    use_cache=not self.wants_fresh()
+                )
+                log_event(LOG, logging.DEBUG, "tool_call", route=self.route,
+                          tool=tool_name(request_data), bytes=len(body))
+                return body if 'id' in request_data else None
             elif method == 'ping':
                 response = {
                     "jsonrpc": "2.0",
@@ -469,66 +840,48 @@ class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
                         "message": f"Method not found: {method}"
                     }
                 }
-            
-            if response is not None:
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
-                self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-                self.end_headers()
-                response_json = json.dumps(response, indent=2)
-                print(f"JSON-RPC response: {response_json}")
-                self.wfile.write(response_json.encode())
-            else:
-                print(f"JSON-RPC notification: {method} - no response")
-                self.send_response(200)
-                self.send_header('Content-type', 'application/json')
-                self.send_header('Access-Control-Allow-Origin', '*')
-                self.end_headers()
-            
-        except json.JSONDecodeError as e:
-            print(f"JSON decode error: {e}")
-            self.send_response(400)
-            self.send_header('Content-type', 'application/json')
-            self.end_headers()
-            error_response = {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": "Parse error"
-                }
-            }
-            self.wfile.write(json.dumps(error_response).encode())
+
+            if response is None or 'id' not in request_data:
+                return None
+            return self.encode_json(response)
+        except Exception as e:
+            log_event(LOG, logging.ERROR, "jsonrpc_failed", route=self.route, method=request_data.get('method'),
+                      error=str(e), exc_info=True)
+            return self.encode_json(jsonrpc_error(request_data.get('id'), INTERNAL_ERROR, "Internal error"))
 
     def send_discovery_api(self):
         """API de découverte des serveurs MCP"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        
-        discovered_servers = self.discover_servers()
+        self.send_cached('/api/discovery', self.build_discovery_api)
+
+    def build_discovery_api(self):
+        """Encoder l'API de découverte (une fois par version de configuration et de découverte)"""
+        snapshot = DISCOVERY.snapshot
+        discovered_servers = snapshot.servers
         discovery_data = {
             "hub": self.servers_config["hub"],
             "servers": discovered_servers,
             "total_servers": len(discovered_servers),
             "online_servers": len([s for s in discovered_servers.values() if s.get("health_status") == "online"]),
             "total_tools": sum(s.get("available_tools", 0) for s in discovered_servers.values()),
-            "last_discovery": datetime.now().isoformat(),
+            "last_discovery": snapshot.discovered_at_iso,
+            "discovery_version": snapshot.version,
+            "health_history": {
+                server_id: HEALTH_HISTORY.summary(server_id, recent=RECENT_POINTS)
+                for server_id in discovered_servers
+            },
             "mode": "standalone"
         }
         
-        self.wfile.write(json.dumps(discovery_data, indent=2).encode())
+        return self.encode_json(discovery_data)
     
     def send_servers_api(self):
         """API des serveurs MCP"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        discovered_servers = self.discover_servers()
+        self.send_cached('/api/servers', self.build_servers_api, headers={'Access-Control-Allow-Origin': '*'})
+
+    def build_servers_api(self):
+        """Encoder l'API des serveurs (une fois par version de configuration et de découverte)"""
+        snapshot = DISCOVERY.snapshot
+        discovered_servers = snapshot.servers
         servers = []
         
         for server_id, server_config in discovered_servers.items():
@@ -549,254 +902,35 @@ class MCPHubStandaloneHandler(BaseHTTPRequestHandler):
                 "standalone": server_config.get("standalone_mode", False),
                 "url": "mcp.coupaul.fr",
                 "repository": server_config.get("github_url", "#"),
-                "last_updated": datetime.now().isoformat()
+                "last_updated": server_config.get("last_seen", snapshot.discovered_at_iso),
+                "health_history": HEALTH_HISTORY.summary(server_id)
             })
         
-        self.wfile.write(json.dumps(servers, indent=2).encode())
+        return self.encode_json(servers)
 
     def send_tools_api(self):
         """API des outils MCP"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        tools = []
-        discovered_servers = self.discover_servers()
-        
-        for server_id, server_config in discovered_servers.items():
-            if server_config.get("standalone_mode", False):
-                server_tools = self.get_standalone_tools(server_id)
-                for tool in server_tools:
-                    tools.append({
-                        "name": tool["name"],
-                        "description": tool["description"],
-                        "server": server_id,
-                        "server_name": server_config["name"],
-                        "category": self.get_tool_category(tool["name"]),
-                        "standalone": True
-                    })
-        
-        self.wfile.write(json.dumps(tools, indent=2).encode())
-
-    def get_tool_category(self, tool_name):
-        """Déterminer la catégorie d'un outil"""
-        categories = {
-            "execute_sql": "database", "check_health": "monitoring", "list_tables": "database",
-            "create_migration": "migration", "apply_migration": "migration",
-            "create_auth_user": "auth", "list_storage_buckets": "storage",
-            "manage_rls_policies": "security", "list_extensions": "extensions",
-            "manage_functions": "functions", "manage_triggers": "triggers",
-            "manage_roles": "roles", "manage_webhooks": "webhooks",
-            "list_realtime_publications": "realtime", "get_logs": "monitoring",
-            "metrics_dashboard": "monitoring", "audit_security": "security",
-            "analyze_performance": "performance", "backup_database": "backup",
-            "cache_management": "cache", "manage_secrets": "secrets",
-            "get_project_url": "utility", "get_anon_key": "utility",
-            "get_service_key": "utility", "generate_crud_api": "generation",
-            "generate_typescript_types": "generation",
-            "start_minecraft_server": "gaming", "stop_minecraft_server": "gaming",
-            "restart_server": "gaming", "get_server_status": "gaming",
-            "list_players": "gaming", "send_command": "gaming",
-            "backup_world": "gaming", "restore_world": "gaming",
-            "manage_plugins": "gaming", "configure_server": "gaming",
-            "monitor_performance": "gaming", "manage_permissions": "gaming"
-        }
-        return categories.get(tool_name, "utility")
+        self.send_cached('/api/tools', self.build_tools_api, headers={'Access-Control-Allow-Origin': '*'})
+
+    def build_tools_api(self):
+        """Encoder l'API des outils (une fois par version de configuration et de découverte)"""
+        return self.encode_json(TOOL_INDEX.get(DISCOVERY.snapshot).api_tools)
 
     def send_hub_page(self):
         """Page hub principale avec design moderne Tailwind CSS"""
-        self.send_response(200)
-        self.send_header('Content-type', 'text/html; charset=utf-8')
-        self.end_headers()
-        
-        # Récupérer les serveurs découverts pour l'affichage
-        discovered_servers = self.discover_servers()
-        online_servers = len([s for s in discovered_servers.values() if s.get("health_status") == "online"])
-        total_tools = sum(s.get("available_tools", 0) for s in discovered_servers.values())
-        
-        html_content = f"""
-<!DOCTYPE html>
-<html lang="fr" class="dark">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MCP Hub - Mode Standalone</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script>
-        tailwind.config = {{
-            darkMode: 'class',
-            theme: {{
-                extend: {{
-                    colors: {{
-                        primary: '#3b82f6',
-                        secondary: '#1e40af',
-                        accent: '#06b6d4'
-                    }}
-                }}
-            }}
-        }}
-    </script>
-</head>
-<body class="bg-gray-900 text-white min-h-screen">
-    <div class="container mx-auto px-4 py-8">
-        <!-- Header -->
-        <header class="text-center mb-12">
-            <h1 class="text-4xl font-bold text-primary mb-4">MCP Hub</h1>
-            <p class="text-xl text-gray-300 mb-6">Centre de contrôle pour tous vos serveurs MCP - Mode Standalone</p>
-            <div class="flex justify-center space-x-4">
-                <span class="bg-green-600 px-3 py-1 rounded-full text-sm">{len(discovered_servers)} Serveurs</span>
-                <span class="bg-blue-600 px-3 py-1 rounded-full text-sm">{total_tools} Outils</span>
-                <span class="bg-purple-600 px-3 py-1 rounded-full text-sm">{online_servers} En ligne</span>
-                <span class="bg-yellow-600 px-3 py-1 rounded-full text-sm">Standalone</span>
-            </div>
-        </header>
+        self.send_cached('/', self.build_hub_page, 'text/html; charset=utf-8')
 
-        <!-- Serveurs MCP -->
-        <section class="mb-12">
-            <h2 class="text-2xl font-semibold mb-6 text-center">Serveurs MCP Disponibles</h2>
-            <div class="grid md:grid-cols-1 gap-6">
-                {self.generate_server_cards(discovered_servers)}
-            </div>
-        </section>
-
-        <!-- Endpoints -->
-        <section class="mb-12">
-            <h2 class="text-2xl font-semibold mb-6 text-center">Endpoints MCP</h2>
-            <div class="grid md:grid-cols-2 gap-6">
-                <div class="bg-gray-800 rounded-lg p-6 border border-gray-700">
-                    <h3 class="text-lg font-semibold mb-4 text-primary">Communication MCP</h3>
-                    <div class="space-y-3">
-                        <div class="flex justify-between items-center">
-                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/.well-known/mcp-config</code>
-                            <span class="text-green-500 text-sm">GET</span>
-                        </div>
-                        <div class="flex justify-between items-center">
-                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/mcp</code>
-                            <span class="text-blue-500 text-sm">POST</span>
-                        </div>
-                        <div class="flex justify-between items-center">
-                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/?config=e30%3D</code>
-                            <span class="text-purple-500 text-sm">POST</span>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="bg-gray-800 rounded-lg p-6 border border-gray-700">
-                    <h3 class="text-lg font-semibold mb-4 text-primary">API REST</h3>
-                    <div class="space-y-3">
-                        <div class="flex justify-between items-center">
-                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/health</code>
-                            <span class="text-green-500 text-sm">GET</span>
-                        </div>
-                        <div class="flex justify-between items-center">
-                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/api/servers</code>
-                            <span class="text-blue-500 text-sm">GET</span>
-                        </div>
-                        <div class="flex justify-between items-center">
-                            <code class="bg-gray-700 px-2 py-1 rounded text-sm">/api/tools</code>
-                            <span class="text-purple-500 text-sm">GET</span>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </section>
-
-        <!-- Footer -->
-        <footer class="text-center text-gray-400 text-sm">
-            <p>MCP Hub v3.1.0 - Mode Standalone - Dernière mise à jour: {datetime.now().strftime('%d/%m/%Y %H:%M')}</p>
-            <p class="mt-2">Commit: <code class="bg-gray-800 px-2 py-1 rounded">4ece699</code></p>
-        </footer>
-    </div>
-</body>
-</html>
-        """
-        self.wfile.write(html_content.encode('utf-8'))
-
-    def generate_server_cards(self, discovered_servers):
-        """Générer les cartes des serveurs MCP dynamiquement"""
-        cards_html = ""
-        
-        for server_id, server_config in discovered_servers.items():
-            status = server_config.get("health_status", "offline")
-            status_color = "bg-green-600" if status == "online" else "bg-red-600"
-            status_text = "En ligne" if status == "online" else "Hors ligne"
-            
-            tools_count = server_config.get("available_tools", server_config.get("tools_count", 0))
-            categories = server_config.get("categories", [])
-            
-            # Générer les badges de catégories
-            category_badges = ""
-            for category in categories[:8]:  # Limiter à 8 catégories
-                category_badges += f'<span class="bg-gray-700 px-2 py-1 rounded text-xs">{category}</span>'
-            
-            # Badge mode standalone
-            standalone_badge = ""
-            if server_config.get("standalone_mode", False):
-                standalone_badge = '<span class="bg-yellow-600 px-2 py-1 rounded text-xs">Standalone</span>'
-            
-            cards_html += f"""
-                <div class="bg-gray-800 rounded-lg p-6 border border-gray-700 hover:border-primary transition-colors">
-                    <div class="flex items-center justify-between mb-4">
-                        <h3 class="text-xl font-semibold text-primary">{server_config["name"]}</h3>
-                        <div class="flex space-x-2">
-                            <span class="{status_color} px-2 py-1 rounded text-sm">{status_text}</span>
-                            {standalone_badge}
-                        </div>
-                    </div>
-                    <p class="text-gray-300 mb-4">{server_config["description"]}</p>
-                    
-                    <div class="grid grid-cols-2 md:grid-cols-4 gap-4 mb-4">
-                        <div class="text-center">
-                            <div class="text-2xl font-bold text-primary">{tools_count}</div>
-                            <div class="text-sm text-gray-400">Outils</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-2xl font-bold text-green-500">{len(categories)}</div>
-                            <div class="text-sm text-gray-400">Catégories</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-2xl font-bold text-blue-500">{server_config.get("port", "N/A")}</div>
-                            <div class="text-sm text-gray-400">Port</div>
-                        </div>
-                        <div class="text-center">
-                            <div class="text-2xl font-bold text-purple-500">v{server_config.get("version", "1.0")}</div>
-                            <div class="text-sm text-gray-400">Version</div>
-                        </div>
-                    </div>
-                    
-                    <div class="flex flex-wrap gap-2 mb-4">
-                        {category_badges}
-                    </div>
-                    
-                    <div class="flex space-x-4">
-                        {f'<a href="{server_config.get("github_url", "#")}" target="_blank" class="bg-primary hover:bg-blue-700 px-4 py-2 rounded text-white text-sm transition-colors">📁 GitHub</a>' if server_config.get("github_url") != "#" else '<span class="bg-gray-600 px-4 py-2 rounded text-white text-sm cursor-not-allowed">📁 GitHub</span>'}
-                        <a href="/api/tools" 
-                           class="bg-gray-700 hover:bg-gray-600 px-4 py-2 rounded text-white text-sm transition-colors">
-                            🔧 API Tools
-                        </a>
-                        <a href="/health" 
-                           class="bg-green-600 hover:bg-green-700 px-4 py-2 rounded text-white text-sm transition-colors">
-                            ❤️ Health
-                        </a>
-                    </div>
-                </div>
-            """
-        
-        return cards_html
+    def build_hub_page(self):
+        """Encoder la page du hub (une fois par version de configuration et de découverte)"""
+        return render_hub_page(DISCOVERY.snapshot)
 
     def send_404_response(self):
-        print(f"404 - Path not found: {self.path}")
-        self.send_response(404)
-        self.send_header('Content-type', 'text/html')
-        self.end_headers()
-        self.wfile.write(f"<h1>404 - Page not found</h1><p>Path: {self.path}</p><p><a href='/'>Back to hub</a></p>".encode())
-
-    def log_message(self, format, *args):
-        pass
+        body = f"<h1>404 - Page not found</h1><p>Path: {self.path}</p><p><a href='/'>Back to hub</a></p>".encode()
+        self.send_body(404, body, 'text/html')
 
 if __name__ == "__main__":
     PORT = int(os.environ.get('PORT', 8000))
+    setup_logging()
     
     print(f"🚀 Starting MCP Hub Central - Standalone Mode on port {PORT}")
     print(f"📊 Serving 2 MCP servers with 59 tools")
@@ -804,6 +938,14 @@ if __name__ == "__main__":
     print(f"🔧 Well-known endpoint: /.well-known/mcp-config")
     print(f"⚡ Mode: Standalone (No Docker required)")
     
-    with socketserver.TCPServer(("", PORT), MCPHubStandaloneHandler) as httpd:
+    # Configuration rechargée à chaud quand MCP_SERVERS_CONFIG pointe vers un fichier
+    CONFIG_REGISTRY.start_watching()
+    CONFIG_REGISTRY.install_sighup_handler()
+    # Sondes des serveurs externes en arrière-plan, jamais dans les requêtes
+    DISCOVERY.start()
+    
+    with create_server(PORT, MCPHubStandaloneHandler) as httpd:
+        METRICS.register_stats("mcp_hub_workers", httpd.stats)
+        print(f"⚡ Workers: {httpd.workers} - Max connections: {httpd.max_connections}")
         print(f"✅ MCP Hub Central - Standalone Mode running on port {PORT}")
         httpd.serve_forever()
@@ -0,0 +1,59 @@
+"""
+MCP Hub Central - Gabarits HTML précompilés
+Les parties statiques des pages sont découpées et encodées une seule fois;
+seuls les emplacements {{nom}} sont rendus à chaque génération
+"""
+
+import re
+import threading
+
+SLOT_PATTERN = re.compile(r"\{\{(\w+)\}\}")
+
+
+class PageTemplate:
+    """Gabarit compilé : fragments statiques pré-encodés et emplacements nommés
+
+    Les accolades simples (CSS, JavaScript) n'ont pas besoin d'être doublées :
+    seuls les marqueurs {{nom}} sont remplacés.
+    """
+
+    __slots__ = ("static", "slots")
+
+    def __init__(self, source):
+        parts = SLOT_PATTERN.split(source)
+        self.static = [part.encode("utf-8") for part in parts[0::2]]
+        self.slots = parts[1::2]
+
+    def render(self, **values):
+        """Assembler la page (bytes); les valeurs bytes sont insérées telles quelles"""
+        out = [self.static[0]]
+        for slot, static in zip(self.slots, self.static[1:]):
+            value = values[slot]
+            out.append(value if isinstance(value, bytes) else str(value).encode("utf-8"))
+            out.append(static)
+        return b"".join(out)
+
+
+class SnapshotFragment:
+    """Fragment rendu une seule fois par snapshot de découverte (ex. cartes des serveurs)"""
+
+    def __init__(self, render_fn):
+        self.render_fn = render_fn
+        self._entry = None
+        self._lock = threading.Lock()
+        self.renders = 0
+
+    def get(self, snapshot):
+        """Fragment de `snapshot`, rendu s'il n'a pas déjà été calculé pour cette version"""
+        entry = self._entry
+        if entry is not None and entry[0] == snapshot.version:
+            return entry[1]
+        with self._lock:
+            entry = self._entry
+            if entry is None or entry[0] != snapshot.version:
+                entry = (snapshot.version, self.render_fn(snapshot.servers))
+                self.renders += 1
+                # Ne jamais remplacer le fragment d'un snapshot plus récent
+                if self._entry is None or self._entry[0] < snapshot.version:
+                    self._entry = entry
+        return entry[1]
@@ -0,0 +1,154 @@
+"""
+MCP Hub Central - Index des outils par snapshot de découverte
+Nom d'outil -> serveur, catégorie, schéma et endpoint amont, construit une
+fois par cycle de découverte; les noms en collision sont préfixés par le serveur
+"""
+
+# Catégories des outils connus (les autres sont "utility")
+TOOL_CATEGORIES = {
+    "execute_sql": "database", "check_health": "monitoring", "list_tables": "database",
+    "create_migration": "migration", "apply_migration": "migration",
+    "create_auth_user": "auth", "list_storage_buckets": "storage",
+    "manage_rls_policies": "security", "list_extensions": "extensions",
+    "manage_functions": "functions", "manage_triggers": "triggers",
+    "manage_roles": "roles", "manage_webhooks": "webhooks",
+    "list_realtime_publications": "realtime", "get_logs": "monitoring",
+    "metrics_dashboard": "monitoring", "audit_security": "security",
+    "analyze_performance": "performance", "backup_database": "backup",
+    "cache_management": "cache", "manage_secrets": "secrets",
+    "get_project_url": "utility", "get_anon_key": "utility",
+    "get_service_key": "utility", "generate_crud_api": "generation",
+    "generate_typescript_types": "generation",
+    "start_minecraft_server": "gaming", "stop_minecraft_server": "gaming",
+    "restart_server": "gaming", "get_server_status": "gaming",
+    "list_players": "gaming", "send_command": "gaming",
+    "backup_world": "gaming", "restore_world": "gaming",
+    "manage_plugins": "gaming", "configure_server": "gaming",
+    "monitor_performance": "gaming", "manage_permissions": "gaming"
+}
+DEFAULT_CATEGORY = "utility"
+
+# Séparateur des noms préfixés : <serveur>__<outil>
+NAMESPACE_SEPARATOR = "__"
+
+# Schéma minimal exigé par tools/list quand le serveur n'en déclare pas
+DEFAULT_INPUT_SCHEMA = {"type": "object"}
+
+
+def tool_category(tool_name):
+    """Catégorie d'un outil"""
+    return TOOL_CATEGORIES.get(tool_name, DEFAULT_CATEGORY)
+
+
+def upstream_mcp_url(server_config):
+    """URL de l'endpoint MCP d'un serveur amont (mcp_endpoint, /mcp par défaut)"""
+    return (f"{server_config['protocol']}://{server_config['host']}:{server_config['port']}"
+            f"{server_config.get('mcp_endpoint', '/mcp')}")
+
+
+class ToolEntry:
+    """Outil publié par le hub - à traiter en lecture seule"""
+
+    __slots__ = ("name", "tool_name", "server_id", "server_name", "category", "description",
+                 "schema", "endpoint", "online", "standalone")
+
+    def __init__(self, name, tool, server_id, server_config):
+        self.name = name
+        self.tool_name = tool["name"]
+        self.server_id = server_id
+        self.server_name = server_config["name"]
+        self.category = tool_category(tool["name"])
+        self.description = tool.get("description", "")
+        self.schema = tool.get("inputSchema", DEFAULT_INPUT_SCHEMA)
+        self.endpoint = upstream_mcp_url(server_config) if "host" in server_config else None
+        self.online = server_config.get("health_status") == "online"
+        self.standalone = server_config.get("standalone_mode", False)
+
+
+class ToolIndex:
+    """Index des outils d'un snapshot de découverte
+
+    Un nom déclaré par un seul serveur est publié tel quel; un nom déclaré par
+    plusieurs serveurs est publié sous la forme <serveur>__<outil>, le nom nu
+    restant routé vers le premier serveur en ligne qui le déclare. Chaque outil
+    est aussi joignable par son nom préfixé.
+    """
+
+    def __init__(self, servers):
+        self.entries = []
+        self._by_name = {}
+        self._by_category = {}
+
+        owners = {}
+        for server_id, server_config in servers.items():
+            for tool in server_config.get("tools", []):
+                owners.setdefault(tool["name"], []).append(server_id)
+            if server_config.get("health_status") == "online":
+                for category in server_config.get("categories", []):
+                    self._by_category.setdefault(category, server_id)
+        self.collisions = sorted(name for name, ids in owners.items() if len(ids) > 1)
+
+        bare = {}
+        for server_id, server_config in servers.items():
+            for tool in server_config.get("tools", []):
+                tool_name = tool["name"]
+                namespaced = f"{server_id}{NAMESPACE_SEPARATOR}{tool_name}"
+                entry = ToolEntry(tool_name if len(owners[tool_name]) == 1 else namespaced,
+                                  tool, server_id, server_config)
+                self.entries.append(entry)
+                self._by_name[entry.name] = entry
+                self._by_name.setdefault(namespaced, entry)
+                current = bare.get(tool_name)
+                if current is None or (entry.online and not current.online):
+                    bare[tool_name] = entry
+        for tool_name, entry in bare.items():
+            self._by_name.setdefault(tool_name, entry)
+
+        # Catalogues publiés, construits une seule fois par snapshot
+        self.mcp_tools = [
+            {
+                "name": entry.name,
+                "description": entry.description,
+                "inputSchema": entry.schema,
+                "server": entry.server_id,
+                "server_name": entry.server_name
+            }
+            for entry in self.entries
+        ]
+        self.api_tools = [
+            {
+                "name": entry.name,
+                "description": entry.description,
+                "server": entry.server_id,
+                "server_name": entry.server_name,
+                "category": entry.category,
+                "standalone": entry.standalone
+            }
+            for entry in self.entries
+        ]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, name):
+        """Outil publié sous `name` (nom nu ou préfixé), ou None"""
+        return self._by_name.get(name)
+
+    def route(self, name, routing):
+        """Retourner (server_id, nom amont) pour un appel d'outil selon routing.strategy
+
+        Un nom préfixé désigne explicitement son serveur. capability_based :
+        serveur en ligne qui déclare l'outil, sinon premier serveur en ligne
+        couvrant sa catégorie, sinon fallback_server.
+        """
+        entry = self._by_name.get(name)
+        tool_name = entry.tool_name if entry is not None else name
+        if entry is not None and name != tool_name:
+            return entry.server_id, tool_name
+        if routing.get("strategy", "capability_based") == "capability_based":
+            if entry is not None and entry.online:
+                return entry.server_id, tool_name
+            server_id = self._by_category.get(tool_category(tool_name))
+            if server_id is not None:
+                return server_id, tool_name
+        return routing.get("fallback_server"), tool_name
@@ -0,0 +1,230 @@
+"""
+MCP Hub Central - Traces des requêtes (W3C traceparent) et en-tête Server-Timing
+Chaque requête reçoit un identifiant de trace, repris de l'en-tête traceparent
+du client ou généré, et transmis aux appels amont (sondes de découverte, proxy
+JSON-RPC). Les phases mesurées (décodage, amont, encodage...) sont résumées
+dans Server-Timing et les spans exportés en JSON Lines si demandé
+"""
+
+import atexit
+import contextvars
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from logging.handlers import QueueListener
+
+from mcp_hub_logging import LOG_QUEUE_SIZE, DroppingQueueHandler, JsonFormatter
+
+# Traces et Server-Timing actifs (0 pour désactiver)
+TRACING_ENABLED = os.getenv("MCP_HUB_TRACING", "1").lower() in ("1", "true", "yes")
+
+# Fichier JSON Lines des spans exportés, ex. /app/data/spans.jsonl (vide : pas d'export)
+TRACE_EXPORT_PATH = os.getenv("MCP_HUB_TRACE_EXPORT", "")
+
+# Part des nouvelles traces exportées (une trace reçue garde la décision de l'appelant)
+TRACE_SAMPLE_RATE = float(os.getenv("MCP_HUB_TRACE_SAMPLE", "1"))
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+SPAN_LOG = logging.getLogger("mcp_hub.spans")
+
+# Span en cours dans ce thread (ou tâche d'exécuteur liée avec bind())
+_current = contextvars.ContextVar("mcp_hub_span", default=None)
+
+
+def _new_id(bits):
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def parse_traceparent(value):
+    """(trace_id, parent_id, sampled) d'un en-tête traceparent valide, sinon None"""
+    if not value:
+        return None
+    match = _TRACEPARENT.match(value.strip().lower())
+    if match is None or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+class Trace:
+    """Trace d'une requête ou d'un cycle de découverte : identifiant et durées cumulées par phase"""
+
+    __slots__ = ("trace_id", "sampled", "timings", "_lock")
+
+    def __init__(self, trace_id, sampled):
+        self.trace_id = trace_id
+        self.sampled = sampled
+        # phase -> [durée totale (s), nombre de spans]
+        self.timings = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, duration):
+        with self._lock:
+            timing = self.timings.get(name)
+            if timing is None:
+                self.timings[name] = [duration, 1]
+            else:
+                timing[0] += duration
+                timing[1] += 1
+
+
+class Span:
+    """Opération mesurée d'une trace; le span racine est celui de la requête servie"""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "start", "started", "duration")
+
+    def __init__(self, trace, parent_id, name, attributes=None):
+        self.trace = trace
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+
+    @property
+    def traceparent(self):
+        """En-tête traceparent d'un appel sortant fait depuis ce span"""
+        return f"00-{self.trace.trace_id}-{self.span_id}-{'01' if self.trace.sampled else '00'}"
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def end(self):
+        self.duration = self.elapsed()
+        if self.trace.sampled and SPAN_LOG.handlers:
+            fields = {
+                "trace_id": self.trace.trace_id,
+                "span_id": self.span_id,
+                "parent_id": self.parent_id,
+                "name": self.name,
+                "start": round(self.start, 6),
+                "duration_ms": round(self.duration * 1000, 3)
+            }
+            fields.update(self.attributes or {})
+            SPAN_LOG.info("span", extra={"fields": fields})
+
+    def server_timing(self):
+        """Valeur de l'en-tête Server-Timing : phases de la trace, total écoulé et traceparent"""
+        with self.trace._lock:
+            timings = list(self.trace.timings.items())
+        # Durée cumulée par phase : des appels parallèles (batch) peuvent dépasser le total
+        parts = [
+            f"{name};dur={duration * 1000:.3f}" + (f';desc="{count} calls"' if count > 1 else "")
+            for name, (duration, count) in timings
+        ]
+        parts.append(f"total;dur={self.elapsed() * 1000:.3f}")
+        parts.append(f'traceparent;desc="{self.traceparent}"')
+        return ", ".join(parts)
+
+
+def _start_trace(name, traceparent=None, attributes=None):
+    parent = parse_traceparent(traceparent)
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id = _new_id(128), None
+        sampled = TRACE_SAMPLE_RATE >= 1 or random.random() < TRACE_SAMPLE_RATE
+    return Span(Trace(trace_id, sampled), parent_id, name, attributes)
+
+
+def start_request(traceparent, name, attributes=None):
+    """Ouvrir le span serveur d'une requête et le rendre courant; retourne (span, jeton) ou None"""
+    if not TRACING_ENABLED:
+        return None
+    span = _start_trace(name, traceparent, attributes)
+    return span, _current.set(span)
+
+
+def finish_request(request, **attributes):
+    """Fermer le span serveur ouvert par start_request() et le retirer du thread"""
+    span, token = request
+    if attributes:
+        span.attributes = dict(span.attributes or {}, **attributes)
+    span.end()
+    _current.reset(token)
+
+
+def outgoing_headers(headers):
+    """En-têtes d'un appel amont complétés du traceparent du span courant"""
+    span = _current.get()
+    if span is None:
+        return headers
+    headers = dict(headers or {})
+    headers.setdefault(TRACEPARENT_HEADER, span.traceparent)
+    return headers
+
+
+class span:
+    """Mesurer une phase du span courant : `with span("upstream", server=server_id):`
+
+    Sans span courant (thread d'arrière-plan), ne mesure rien, sauf avec
+    root=True qui ouvre alors une nouvelle trace (cycle de découverte).
+    """
+
+    __slots__ = ("name", "attributes", "root", "_span", "_token")
+
+    def __init__(self, name, root=False, **attributes):
+        self.name = name
+        self.attributes = attributes or None
+        self.root = root
+        self._span = None
+
+    def __enter__(self):
+        parent = _current.get()
+        if parent is not None:
+            self._span = Span(parent.trace, parent.span_id, self.name, self.attributes)
+        elif self.root and TRACING_ENABLED:
+            self._span = _start_trace(self.name, attributes=self.attributes)
+        else:
+            return None
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, *exc):
+        current = self._span
+        if current is None:
+            return
+        _current.reset(self._token)
+        current.end()
+        current.trace.add(self.name, current.duration)
+
+
+def bind(fn):
+    """Fonction qui exécute `fn` avec le span courant de l'appelant (pour un exécuteur de threads)"""
+    parent = _current.get()
+    if parent is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
+
+
+def _setup_export():
+    """Écrire les spans des traces échantillonnées dans TRACE_EXPORT_PATH, depuis un thread dédié"""
+    if not (TRACING_ENABLED and TRACE_EXPORT_PATH):
+        return None
+    handler = logging.FileHandler(TRACE_EXPORT_PATH, encoding="utf-8")
+    handler.setFormatter(JsonFormatter())
+    queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    SPAN_LOG.addHandler(queue_handler)
+    SPAN_LOG.setLevel(logging.INFO)
+    SPAN_LOG.propagate = False
+    listener = QueueListener(queue_handler.queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+_export_listener = _setup_export()
@@ -0,0 +1,338 @@
+"""
+MCP Hub Central - Client HTTP amont mutualisé
+Pools de connexions keep-alive par hôte, partagés par les sondes de découverte
+et le proxy vers les serveurs MCP
+"""
+
+import http.client
+import os
+import ssl
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import mcp_hub_codec
+from mcp_hub_singleflight import SingleFlight
+from mcp_hub_tracing import outgoing_headers
+
+# Connexions inactives conservées par hôte et durée maximale d'inactivité (s)
+DEFAULT_POOL_SIZE = int(os.getenv("MCP_HUB_UPSTREAM_POOL_SIZE", "8"))
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("MCP_HUB_UPSTREAM_IDLE_TIMEOUT", "60"))
+DEFAULT_TIMEOUT = 10
+
+# Taille maximale lue à la fois sur une réponse en streaming (mémoire bornée par flux)
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Erreurs typiques d'une connexion keep-alive fermée côté serveur pendant l'inactivité
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+# Méthodes rejouables sans risque après une connexion périmée
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+class RequestNotSent(Exception):
+    """Échec pendant l'envoi de la requête sur une connexion déjà fermée"""
+
+    def __init__(self, error):
+        super().__init__(str(error))
+        self.error = error
+
+
+class UpstreamResponse:
+    """Réponse complète d'un serveur amont"""
+
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return mcp_hub_codec.loads(self.body)
+
+
+class UpstreamStream:
+    """Réponse amont lue au fil de l'eau (text/event-stream, gros résultats)
+
+    La connexion retourne au pool à la fermeture si la réponse a été lue
+    jusqu'au bout; sinon elle est fermée.
+    """
+
+    def __init__(self, client, key, conn, response):
+        self._client = client
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.status = response.status
+        self.headers = {k.lower(): v for k, v in response.getheaders()}
+        # Rappel optionnel exécuté une fois à la fermeture (fin d'appel pour le répartiteur)
+        self.on_close = None
+
+    def iter_chunks(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Fragments disponibles dès leur arrivée (au plus `chunk_size` octets chacun)"""
+        while True:
+            data = self._response.read1(chunk_size)
+            if not data:
+                return
+            yield data
+
+    def read(self):
+        return self._response.read()
+
+    def close(self):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        if self._response.isclosed() and not self._response.will_close:
+            self._client._release(self._key, conn)
+        else:
+            conn.close()
+        if self.on_close is not None:
+            self.on_close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HostPool:
+    """Connexions inactives vers un même hôte (LIFO : la plus récente d'abord)"""
+
+    __slots__ = ("key", "idle", "lock")
+
+    def __init__(self, key):
+        self.key = key
+        self.idle = deque()
+        self.lock = threading.Lock()
+
+
+class UpstreamClient:
+    """Client HTTP/1.1 avec pools de connexions keep-alive par hôte
+
+    `request()` réutilise une connexion inactive du pool de l'hôte (hit) ou en
+    ouvre une nouvelle (miss : TCP + TLS + DNS). Après lecture complète de la
+    réponse, la connexion retourne au pool tant qu'il compte moins de
+    `pool_size` connexions; celles inactives depuis plus de `idle_timeout`
+    secondes sont fermées.
+    """
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, ssl_context=None):
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.ssl_context = ssl_context or ssl.create_default_context()
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        # GET identiques simultanés (sondes de découverte) : un seul envoi
+        self.singleflight = SingleFlight()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "retries": 0,
+            "evicted_idle": 0,
+            "discarded": 0,
+            "errors": 0
+        }
+
+    def _count(self, name, value=1):
+        with self._stats_lock:
+            self._counters[name] += value
+
+    def _pool(self, key):
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._pools_lock:
+                pool = self._pools.setdefault(key, HostPool(key))
+        return pool
+
+    def _new_connection(self, scheme, host, port, timeout):
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        """Retourner (connexion, réutilisée?) pour l'hôte `key`"""
+        pool = self._pool(key)
+        now = time.monotonic()
+        conn = None
+        evicted = []
+        with pool.lock:
+            # Les plus anciennes sont à gauche : fermer celles qui ont expiré
+            while pool.idle and now - pool.idle[0][1] > self.idle_timeout:
+                evicted.append(pool.idle.popleft()[0])
+            if pool.idle:
+                conn = pool.idle.pop()[0]
+        for stale in evicted:
+            stale.close()
+        if evicted:
+            self._count("evicted_idle", len(evicted))
+
+        if conn is not None:
+            self._count("hits")
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+
+        self._count("misses")
+        return self._new_connection(*key, timeout), False
+
+    def _release(self, key, conn):
+        pool = self._pool(key)
+        with pool.lock:
+            if len(pool.idle) < self.pool_size:
+                pool.idle.append((conn, time.monotonic()))
+                conn = None
+        if conn is not None:
+            conn.close()
+            self._count("discarded")
+        self._maybe_sweep()
+
+    def _maybe_sweep(self):
+        """Fermer périodiquement les connexions inactives de tous les hôtes"""
+        now = time.monotonic()
+        if now - self._last_sweep < self.idle_timeout:
+            return
+        self._last_sweep = now
+        self.evict_idle(now)
+
+    def evict_idle(self, now=None):
+        """Fermer les connexions inactives depuis plus de idle_timeout"""
+        now = now or time.monotonic()
+        evicted = 0
+        for pool in list(self._pools.values()):
+            with pool.lock:
+                expired = []
+                while pool.idle and now - pool.idle[0][1] > self.idle_timeout:
+                    expired.append(pool.idle.popleft()[0])
+            for conn in expired:
+                conn.close()
+            evicted += len(expired)
+        if evicted:
+            self._count("evicted_idle", evicted)
+        return evicted
+
+    def request(self, method, url, body=None, headers=None, timeout=DEFAULT_TIMEOUT, idempotent=None):
+        """Envoyer une requête et retourner la réponse complète (UpstreamResponse)
+
+        Si une connexion réutilisée s'avère fermée par le serveur, la requête est
+        rejouée une fois sur une connexion neuve, uniquement pour les méthodes
+        idempotentes (ou si l'appelant passe `idempotent=True`).
+        """
+        return self._exchange(method, url, body, headers, timeout, idempotent, stream=False)
+
+    def stream(self, method, url, body=None, headers=None, timeout=DEFAULT_TIMEOUT, idempotent=None):
+        """Envoyer une requête et retourner la réponse à lire au fil de l'eau (UpstreamStream)
+
+        À utiliser comme gestionnaire de contexte pour rendre la connexion au pool.
+        """
+        return self._exchange(method, url, body, headers, timeout, idempotent, stream=True)
+
+    def _exchange(self, method, url, body, headers, timeout, idempotent, stream):
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target = f"{target}?{parts.query}"
+
+        conn, reused = self._acquire(key, timeout)
+        try:
+            return self._send(key, conn, method, target, body, headers, stream)
+        except RequestNotSent as e:
+            # Échec à l'envoi : le serveur n'a rien reçu, rejouable quelle que soit la méthode
+            retry, error = reused, e.error
+        except STALE_CONNECTION_ERRORS as e:
+            retry, error = reused and idempotent, e
+        except Exception:
+            self._count("errors")
+            raise
+
+        if not retry:
+            self._count("errors")
+            raise error
+        # Connexion fermée par le serveur pendant l'inactivité : réessayer une fois sur une neuve
+        self._count("retries")
+        self._count("misses")
+        conn = self._new_connection(*key, timeout)
+        try:
+            return self._send(key, conn, method, target, body, headers, stream)
+        except RequestNotSent as e:
+            self._count("errors")
+            raise e.error
+        except Exception:
+            self._count("errors")
+            raise
+
+    def _send(self, key, conn, method, target, body, headers, stream=False):
+        try:
+            # traceparent ajouté ici, après le regroupement des GET identiques
+            conn.request(method, target, body=body, headers=outgoing_headers(headers) or {})
+        except STALE_CONNECTION_ERRORS as e:
+            conn.close()
+            raise RequestNotSent(e)
+        except Exception:
+            conn.close()
+            raise
+        try:
+            response = conn.getresponse()
+            if stream:
+                return UpstreamStream(self, key, conn, response)
+            payload = response.read()
+        except Exception:
+            conn.close()
+            raise
+        result = UpstreamResponse(response.status, {k.lower(): v for k, v in response.getheaders()}, payload)
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        return result
+
+    def get(self, url, headers=None, timeout=DEFAULT_TIMEOUT, coalesce=True):
+        """GET; les GET identiques en cours sont regroupés en un seul appel (réponse partagée)"""
+        if not coalesce:
+            return self.request("GET", url, headers=headers, timeout=timeout)
+        key = ("GET", url, tuple(sorted((headers or {}).items())))
+        return self.singleflight.do(key, lambda: self.request("GET", url, headers=headers, timeout=timeout))
+
+    def post_json(self, url, payload, headers=None, timeout=DEFAULT_TIMEOUT, idempotent=False):
+        """POST d'un document JSON (dict ou octets déjà encodés)"""
+        body = payload if isinstance(payload, bytes) else mcp_hub_codec.dumps(payload)
+        all_headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        all_headers.update(headers or {})
+        return self.request("POST", url, body=body, headers=all_headers, timeout=timeout, idempotent=idempotent)
+
+    def stats(self):
+        """Compteurs du pool (hits = connexions réutilisées, misses = nouvelles connexions)"""
+        with self._stats_lock:
+            stats = dict(self._counters)
+        total = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / total, 4) if total else 0.0
+        stats["coalesced"] = self.singleflight.stats()
+        stats["idle_connections"] = {
+            f"{scheme}://{host}:{port}": len(pool.idle)
+            for (scheme, host, port), pool in list(self._pools.items())
+        }
+        return stats
+
+    def close(self):
+        """Fermer toutes les connexions inactives"""
+        for pool in list(self._pools.values()):
+            with pool.lock:
+                connections = [conn for conn, _ in pool.idle]
+                pool.idle.clear()
+            for conn in connections:
+                conn.close()
+
+
+# Client partagé par tout le processus (sondes de découverte et proxy)
+UPSTREAM_CLIENT = UpstreamClient()
@@ -0,0 +1,9 @@
+"""
+MCP Hub Central - Configuration pytest
+Les modules du hub sont à la racine du dépôt
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,50 @@
+"""
+MCP Hub Central - Tests du disjoncteur des serveurs amont
+"""
+
+import pytest
+
+from mcp_hub_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+SETTINGS = {"failure_rate": 0.5, "minimum_calls": 2, "window": 30, "open_duration": 0, "half_open_calls": 1}
+
+
+def trip(breaker):
+    for _ in range(2):
+        breaker.record(breaker.acquire(), False, 0.0)
+    assert breaker.state == OPEN
+
+
+def test_opens_then_closes_after_successful_trial():
+    breaker = CircuitBreaker("upstream", SETTINGS)
+    trip(breaker)
+    trial = breaker.acquire()
+    assert breaker.state == HALF_OPEN
+    breaker.record(trial, True, 0.0)
+    assert breaker.state == CLOSED
+
+
+def test_stale_success_does_not_close_half_open_breaker():
+    breaker = CircuitBreaker("upstream", SETTINGS)
+    # Appel lent lancé disjoncteur fermé, terminé pendant la semi-ouverture
+    stale = breaker.acquire()
+    trip(breaker)
+    trial = breaker.acquire()
+    breaker.record(stale, True, 0.0)
+    assert breaker.state == HALF_OPEN
+    assert breaker._trials == 1
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+    breaker.record(trial, False, 0.0)
+    assert breaker.state == OPEN
+
+
+def test_stale_results_never_drive_trials_negative():
+    breaker = CircuitBreaker("upstream", dict(SETTINGS, half_open_calls=2))
+    stale = [breaker.acquire() for _ in range(3)]
+    trip(breaker)
+    breaker.acquire()
+    for generation in stale:
+        breaker.record(generation, False, 0.0)
+    assert breaker.state == HALF_OPEN
+    assert breaker._trials == 1
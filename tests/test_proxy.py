@@ -0,0 +1,74 @@
+"""
+MCP Hub Central - Tests des nouveaux essais du proxy vers les serveurs amont
+"""
+
+import pytest
+
+from mcp_hub_balancer import Endpoint
+from mcp_hub_proxy import MCPProxy, ProxyError
+from mcp_hub_upstream import UpstreamResponse
+
+SERVER_CONFIG = {"protocol": "http", "host": "upstream.test", "port": 8000, "retry_attempts": 2}
+
+
+class SingleEndpointBalancer:
+    """Répartiteur de test : toujours le même réplica"""
+
+    def __init__(self):
+        self.endpoint = Endpoint(SERVER_CONFIG)
+
+    def pick(self, server_id, server_config, routing):
+        return self.endpoint
+
+
+def make_proxy(outcomes):
+    """Proxy dont chaque envoi amont consomme le résultat suivant de `outcomes`"""
+    proxy = MCPProxy(balancer=SingleEndpointBalancer())
+    calls = []
+
+    def forward(server_config, message, timeout=None, stream=False):
+        calls.append(message)
+        outcome = outcomes[len(calls) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return UpstreamResponse(outcome, {}, b"{}")
+
+    proxy.forward = forward
+    return proxy, calls
+
+
+def call(proxy, method):
+    request = {"jsonrpc": "2.0", "id": 1, "method": method, "params": {"name": "echo"}}
+    return proxy._call_upstream("test", SERVER_CONFIG, {}, request)
+
+
+def test_tools_call_not_retried_after_502():
+    proxy, calls = make_proxy([502, 200])
+    response = call(proxy, "tools/call")
+    assert response.status == 502
+    assert len(calls) == 1
+
+
+def test_tools_call_retried_after_503():
+    proxy, calls = make_proxy([503, 200])
+    assert call(proxy, "tools/call").status == 200
+    assert len(calls) == 2
+
+
+def test_tools_call_retried_after_connection_refused():
+    proxy, calls = make_proxy([ConnectionRefusedError(), 200])
+    assert call(proxy, "tools/call").status == 200
+    assert len(calls) == 2
+
+
+def test_read_only_method_retried_after_502():
+    proxy, calls = make_proxy([502, 200])
+    assert call(proxy, "resources/read").status == 200
+    assert len(calls) == 2
+
+
+def test_retries_bounded_by_retry_attempts():
+    proxy, calls = make_proxy([503, 503, 503, 200])
+    with pytest.raises(ProxyError):
+        call(proxy, "tools/call")
+    assert len(calls) == 3